@@ -1,11 +1,15 @@
 import os
 import json
+import time
+import asyncio
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
+from pydantic import ValidationError
 from pydantic_ai.agent import Agent
 from pydantic_ai.exceptions import UserError
-from .schemas import FeedbackAnalysis, PromptConfig
+from .schemas import FeedbackAnalysis, BatchAnalysisItem, PromptConfig
+from .analysis_cache import analysis_cache_key, get_cached_analysis, store_analysis
 
 logger = logging.getLogger(__name__)
 
@@ -61,11 +65,59 @@ agent = Agent(
     instructions=SYSTEM_PROMPT,
 )
 
+# Micro-batching: analyze messages arriving close together in a single LLM call
+ANALYSIS_BATCHING_ENABLED = os.getenv("ANALYSIS_BATCHING_ENABLED", "false").lower() == "true"
+ANALYSIS_BATCH_WINDOW_MS = float(os.getenv("ANALYSIS_BATCH_WINDOW_MS", "50"))
+ANALYSIS_BATCH_MAX_ITEMS = int(os.getenv("ANALYSIS_BATCH_MAX_ITEMS", "20"))
 
-async def analyze_message(message: str, request_id: str = "unknown") -> tuple[Optional[FeedbackAnalysis], Optional[str]]:
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+
+You will receive a JSON array of customer messages, each with an integer "index".
+Analyze every message independently and return a JSON array with exactly one object per message,
+containing its "index" plus the fields above."""
+
+batch_agent = Agent(
+    model=LLM_MODEL,
+    output_type=List[BatchAnalysisItem],
+    instructions=BATCH_SYSTEM_PROMPT,
+)
+
+AnalysisResult = tuple[Optional[FeedbackAnalysis], Optional[str]]
+
+
+async def analyze_message(message: str, request_id: str = "unknown") -> AnalysisResult:
     """
     Analyze customer feedback message using PydanticAI agent.
 
+    Duplicate messages are served from the analysis cache. When batching is
+    enabled, the message is analyzed together with others that arrive within
+    the batch window.
+
+    Returns:
+        tuple: (FeedbackAnalysis or None, error_message or None)
+    """
+    # Serve duplicate messages from the analysis cache
+    cache_key = analysis_cache_key(message, LLM_MODEL, prompt_config.version)
+    cached = await get_cached_analysis(cache_key)
+    if cached is not None:
+        logger.info(f"[{request_id}] AI analysis served from cache (key {cache_key[:12]})")
+        return cached, None
+
+    if ANALYSIS_BATCHING_ENABLED:
+        analysis, error = await batcher.submit(message, request_id)
+    else:
+        analysis, error = await analyze_single_message(message, request_id)
+
+    if analysis is not None:
+        await store_analysis(cache_key, analysis, LLM_MODEL, prompt_config.version)
+
+    return analysis, error
+
+
+async def analyze_single_message(message: str, request_id: str = "unknown") -> AnalysisResult:
+    """
+    Analyze one message in its own LLM call, retrying on validation errors.
+
     Returns:
         tuple: (FeedbackAnalysis or None, error_message or None)
     """
@@ -111,3 +163,142 @@ async def analyze_message(message: str, request_id: str = "unknown") -> tuple[Op
             return None, f"Unexpected error: {str(e)}"
 
     return None, "Analysis failed"
+
+
+class AnalysisBatcher:
+    """
+    Collects messages submitted within a short window and analyzes them in
+    one LLM call, fanning the results back out to the waiting callers.
+
+    Items missing from the batch output or failing FeedbackAnalysis
+    validation fall back to individual analyze_single_message calls.
+    """
+
+    def __init__(
+        self,
+        window_ms: float = ANALYSIS_BATCH_WINDOW_MS,
+        max_items: int = ANALYSIS_BATCH_MAX_ITEMS,
+    ):
+        self.window_ms = window_ms
+        self.max_items = max_items
+        self._pending: List[tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "fallbacks": 0,
+            "failed_batches": 0,
+            "total_latency_ms": 0.0,
+            "last_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        }
+
+    async def submit(self, message: str, request_id: str = "unknown") -> AnalysisResult:
+        """Queue a message for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message, request_id, future))
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Send the pending messages as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[tuple[str, str, asyncio.Future]]):
+        """Analyze a batch and resolve each caller's future."""
+        if len(batch) == 1:
+            message, request_id, future = batch[0]
+            result = await analyze_single_message(message, request_id)
+            if not future.done():
+                future.set_result(result)
+            return
+
+        request_ids = ",".join(request_id for _, request_id, _ in batch)
+        logger.info(f"[batch {request_ids}] Starting batched AI analysis of {len(batch)} messages")
+
+        prompt = json.dumps([
+            {"index": index, "message": message}
+            for index, (message, _, _) in enumerate(batch)
+        ])
+
+        by_index: Dict[int, FeedbackAnalysis] = {}
+        start = time.perf_counter()
+        try:
+            result = await batch_agent.run(prompt)
+            for item in result.output:
+                if not 0 <= item.index < len(batch) or item.index in by_index:
+                    continue
+                try:
+                    by_index[item.index] = FeedbackAnalysis(**item.model_dump(exclude={"index"}))
+                except ValidationError as e:
+                    logger.warning(f"[{batch[item.index][1]}] Batched analysis item failed validation: {e}")
+        except Exception as e:
+            self._stats["failed_batches"] += 1
+            logger.warning(f"[batch {request_ids}] Batched AI analysis failed, falling back: {e}")
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        self._record(len(batch), latency_ms)
+        logger.info(
+            f"[batch {request_ids}] Batched AI analysis: {len(by_index)}/{len(batch)} items "
+            f"in {latency_ms:.0f}ms"
+        )
+
+        fallbacks = []
+        for index, (message, request_id, future) in enumerate(batch):
+            if index in by_index:
+                if not future.done():
+                    future.set_result((by_index[index], None))
+            else:
+                fallbacks.append(self._fallback(message, request_id, future))
+
+        if fallbacks:
+            self._stats["fallbacks"] += len(fallbacks)
+            await asyncio.gather(*fallbacks)
+
+    async def _fallback(self, message: str, request_id: str, future: asyncio.Future):
+        """Analyze an item the batch could not, in its own LLM call."""
+        result = await analyze_single_message(message, request_id)
+        if not future.done():
+            future.set_result(result)
+
+    def _record(self, items: int, latency_ms: float):
+        self._stats["batches"] += 1
+        self._stats["items"] += items
+        self._stats["total_latency_ms"] += latency_ms
+        self._stats["last_latency_ms"] = latency_ms
+        self._stats["max_latency_ms"] = max(self._stats["max_latency_ms"], latency_ms)
+
+    def stats(self) -> dict:
+        """Return batch counters and per-batch latency (this process only)."""
+        batches = self._stats["batches"]
+        return {
+            "enabled": ANALYSIS_BATCHING_ENABLED,
+            "window_ms": self.window_ms,
+            "max_items": self.max_items,
+            "batches": batches,
+            "items": self._stats["items"],
+            "fallbacks": self._stats["fallbacks"],
+            "failed_batches": self._stats["failed_batches"],
+            "avg_batch_size": self._stats["items"] / batches if batches else 0.0,
+            "avg_latency_ms": self._stats["total_latency_ms"] / batches if batches else 0.0,
+            "last_latency_ms": self._stats["last_latency_ms"],
+            "max_latency_ms": self._stats["max_latency_ms"],
+        }
+
+
+batcher = AnalysisBatcher()
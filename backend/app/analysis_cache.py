@@ -0,0 +1,120 @@
+"""
+Content-addressed cache for AI analysis results.
+
+Duplicate messages (form resubmits, copy-pasted complaints) are served from
+cache instead of paying for another LLM call. Results are keyed by a hash of
+the normalized message, the LLM model and the prompt config version, so
+changing either naturally invalidates earlier results.
+
+Two tiers:
+- In-process LRU with TTL (per API/worker process)
+- MongoDB `analysis_cache` collection with a TTL index (shared)
+"""
+import os
+import re
+import hashlib
+import logging
+from datetime import datetime
+from typing import Optional
+from pymongo.errors import PyMongoError
+from .cache import TTLCache
+from .db import get_database, get_analysis_cache_collection
+from .schemas import FeedbackAnalysis
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "2048"))
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "3600"))
+ANALYSIS_CACHE_DB_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_DB_TTL_SECONDS", str(7 * 24 * 3600)))
+
+_memory_cache = TTLCache(ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_TTL_SECONDS)
+_db_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a message so whitespace and case variants share a cache key."""
+    return _WHITESPACE_RE.sub(" ", message).strip().lower()
+
+
+def analysis_cache_key(message: str, model: str, prompt_version: str) -> str:
+    """Build the content-addressed cache key for a message."""
+    payload = "\x00".join([model, prompt_version, normalize_message(message)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def get_cached_analysis(key: str) -> Optional[FeedbackAnalysis]:
+    """
+    Look up a cached analysis, checking memory first and then MongoDB.
+
+    Returns:
+        FeedbackAnalysis on a hit, None on a miss
+    """
+    if not ANALYSIS_CACHE_ENABLED:
+        return None
+
+    analysis = _memory_cache.get(key)
+    if analysis is not None:
+        return analysis.model_copy()
+
+    if get_database() is None:
+        return None
+
+    try:
+        doc = await get_analysis_cache_collection().find_one({"_id": key})
+    except PyMongoError as e:
+        _db_stats["errors"] += 1
+        logger.warning(f"Analysis cache lookup failed: {e}")
+        return None
+
+    if doc is None:
+        _db_stats["misses"] += 1
+        return None
+
+    _db_stats["hits"] += 1
+    analysis = FeedbackAnalysis(**doc["analysis"])
+    _memory_cache.set(key, analysis)
+    return analysis.model_copy()
+
+
+async def store_analysis(key: str, analysis: FeedbackAnalysis, model: str, prompt_version: str):
+    """Store a successful analysis in both cache tiers."""
+    if not ANALYSIS_CACHE_ENABLED:
+        return
+
+    _memory_cache.set(key, analysis)
+
+    if get_database() is None:
+        return
+
+    try:
+        # Expiry is handled by the analysis_cache_ttl index (see app.indexes)
+        await get_analysis_cache_collection().replace_one(
+            {"_id": key},
+            {
+                "analysis": analysis.model_dump(),
+                "model": model,
+                "prompt_version": prompt_version,
+                "created_at": datetime.utcnow(),
+            },
+            upsert=True,
+        )
+    except PyMongoError as e:
+        _db_stats["errors"] += 1
+        logger.warning(f"Analysis cache write failed: {e}")
+
+
+def get_cache_stats() -> dict:
+    """Return hit/miss/eviction counters for both tiers (this process only)."""
+    return {
+        "enabled": ANALYSIS_CACHE_ENABLED,
+        "memory": _memory_cache.stats(),
+        "database": dict(_db_stats),
+    }
+
+
+def clear_memory_cache():
+    """Drop all in-process entries (used by tests)."""
+    _memory_cache.clear()
@@ -0,0 +1,54 @@
+"""
+Admin API routes.
+Operational endpoints for inspecting the database layer.
+"""
+from fastapi import APIRouter, HTTPException, status
+from typing import Any, Dict, List
+from ..indexes import explain_query_shapes, ensure_indexes
+from ..counters import reconcile_counters
+from ..schemas import QueryPlanReport
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get("/indexes/explain", response_model=List[QueryPlanReport])
+async def get_query_plans():
+    """
+    Report the explain() plan of each registered query shape.
+
+    Shapes whose winning plan contains a COLLSCAN are flagged with
+    collscan=true.
+    """
+    return await explain_query_shapes()
+
+
+@router.post("/indexes/ensure", response_model=List[str])
+async def post_ensure_indexes():
+    """
+    Create any missing registered indexes.
+
+    Returns the names of indexes that are in place.
+    """
+    return await ensure_indexes()
+
+
+@router.post("/metrics-counters/reconcile")
+async def post_reconcile_metrics_counters(repair: bool = False) -> Dict[str, Any]:
+    """
+    Compare the materialized metrics counters with the feedbacks collection.
+
+    Args:
+        repair: Correct drifted counters from the source data
+
+    Returns the number of counters checked and the drifted ones.
+
+    Raises:
+        409: repair requested while another process is building the counters
+    """
+    result = await reconcile_counters(repair=repair)
+    if repair and not result["claimed"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Metrics counters are being built by another process, try again later"
+        )
+    return result
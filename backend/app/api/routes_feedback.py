@@ -1,68 +1,78 @@
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Query
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from pydantic import ValidationError
+from datetime import datetime, timezone
+from typing import Literal, Optional, List, Union
+import os
 import logging
 import json
-from ..schemas import FeedbackCreate, FeedbackResponse, FeedbackListResponse
-from ..services import create_feedback, get_feedbacks, get_feedback_by_id
-from ..models import serialize_feedback
+from ..schemas import (
+    FeedbackCreate,
+    FeedbackResponse,
+    FeedbackListResponse,
+    FeedbackChangesResponse,
+    FeedbackSummaryListResponse,
+    FeedbackBatchCreate,
+    FeedbackBatchItemResult,
+    FeedbackBatchResponse,
+    FeedbackSubscription,
+)
+from ..services import (
+    build_feedback_query,
+    create_feedback,
+    create_feedback_batch,
+    current_changes_watermark,
+    get_feedback_changes,
+    get_feedback_documents,
+    get_feedback_by_id,
+    iter_feedback_documents,
+    search_feedbacks,
+    MIN_OBJECT_ID,
+)
+from ..export import EXPORT_BATCH_SIZE, csv_chunks, gzip_chunks, ndjson_chunks
+from ..realtime import manager, subscription_key
+from ..versions import etag_headers, not_modified, resource_etag
+from ..models import (
+    serialize_feedback,
+    feedback_doc_to_response,
+    feedback_summary_doc_to_response,
+    encode_cursor,
+    decode_cursor,
+    encode_search_cursor,
+    decode_search_cursor,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["feedback"])
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+# Maximum number of items accepted by POST /api/feedback/batch
+FEEDBACK_BATCH_MAX_ITEMS = int(os.getenv("FEEDBACK_BATCH_MAX_ITEMS", "1000"))
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+# Whether GET /api/feedback includes the total count when with_total is not given
+FEEDBACK_LIST_WITH_TOTAL = os.getenv("FEEDBACK_LIST_WITH_TOTAL", "true").lower() == "true"
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-        logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
 
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients."""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
-
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.active_connections.remove(conn)
-
-
-manager = ConnectionManager()
-
-
-@router.post("/feedback", response_model=FeedbackResponse, status_code=201)
+@router.post("/feedback", response_model=FeedbackResponse, status_code=202)
 async def create_feedback_endpoint(feedback: FeedbackCreate):
     """
     Create a new feedback entry.
 
     - Validates input
-    - Runs AI analysis
-    - Saves to database
+    - Saves to database with analysis_status "pending"
     - Broadcasts to WebSocket clients
+    - AI analysis runs in the analysis worker; clients receive a
+      "feedbacks:updated" event when it completes
     """
     try:
-        # Create feedback with AI analysis
+        # Create feedback queued for AI analysis
         saved_feedback = await create_feedback(feedback)
 
         # Serialize for response
         response_data = serialize_feedback(saved_feedback.model_dump())
 
-        # Broadcast to WebSocket clients
-        await manager.broadcast({
-            "type": "feedbacks:new",
-            "data": response_data
-        })
+        # Broadcast to WebSocket clients (pending, so unfiltered subscribers only)
+        manager.publish("feedbacks:new", response_data)
 
         return response_data
 
@@ -71,50 +81,316 @@ async def create_feedback_endpoint(feedback: FeedbackCreate):
         raise HTTPException(status_code=500, detail=f"Failed to create feedback: {str(e)}")
 
 
-@router.get("/feedback", response_model=FeedbackListResponse)
+@router.post("/feedback/batch", response_model=FeedbackBatchResponse, status_code=202)
+async def create_feedback_batch_endpoint(batch: FeedbackBatchCreate):
+    """
+    Create many feedback entries in one request.
+
+    - Validates each item; invalid items are reported without failing the batch
+    - Saves valid items with a single insert_many, queued for AI analysis
+    - Broadcasts one "feedbacks:new_batch" event to WebSocket clients
+    - Returns per-item success/error results in input order
+    """
+    if len(batch.items) > FEEDBACK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.items)} items (max {FEEDBACK_BATCH_MAX_ITEMS})"
+        )
+
+    results: List[Optional[FeedbackBatchItemResult]] = [None] * len(batch.items)
+    valid_indexes: List[int] = []
+    valid_items: List[FeedbackCreate] = []
+
+    for index, item in enumerate(batch.items):
+        try:
+            valid_items.append(FeedbackCreate(**item))
+            valid_indexes.append(index)
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            results[index] = FeedbackBatchItemResult(index=index, success=False, error=errors)
+
+    saved_feedbacks = []
+    if valid_items:
+        try:
+            created = await create_feedback_batch(valid_items)
+        except Exception as e:
+            logger.error(f"Error creating feedback batch: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to create feedback batch: {str(e)}")
+
+        for index, (feedback, error) in zip(valid_indexes, created):
+            if feedback is None:
+                results[index] = FeedbackBatchItemResult(index=index, success=False, error=error)
+            else:
+                results[index] = FeedbackBatchItemResult(index=index, success=True, id=feedback.id)
+                saved_feedbacks.append(serialize_feedback(feedback.model_dump()))
+
+    if saved_feedbacks:
+        manager.publish_batch("feedbacks:new_batch", saved_feedbacks)
+
+    return FeedbackBatchResponse(
+        results=results,
+        accepted=len(saved_feedbacks),
+        failed=len(batch.items) - len(saved_feedbacks),
+    )
+
+
+@router.get("/feedback", response_model=Union[FeedbackListResponse, FeedbackSummaryListResponse])
 async def list_feedbacks(
+    request: Request,
     limit: int = Query(50, ge=1, le=100),
     skip: int = Query(0, ge=0),
     urgency: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
+    category_match: Literal["exact", "prefix"] = Query("exact", description="Match category exactly or by prefix"),
     sentiment: Optional[str] = Query(None),
     unresolved_only: bool = Query(False),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    with_total: Optional[bool] = Query(None, description="Include the total count (default configurable)"),
+    view: Literal["full", "summary"] = Query("full", description="summary omits message, recommended action and overrides"),
 ):
     """
     List feedbacks with optional filters.
 
-    - Supports pagination (limit/skip)
+    - Supports keyset pagination (cursor/next_cursor); limit/skip still works
     - Filters: urgency, category, sentiment, unresolved_only
+    - category is case/whitespace-insensitive and alias-aware, matched
+      exactly or as a prefix (category_match=prefix)
+    - total is omitted (null) when with_total=false
+    - view=summary returns lightweight rows (projection pushed down to MongoDB)
+    - Rows are encoded directly from MongoDB documents; the response models
+      document the shape
+    - Sends a weak ETag; If-None-Match is answered with 304 while no
+      feedback has been written (see app.versions)
     """
     try:
-        feedbacks, total = await get_feedbacks(
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    etag = resource_etag(request, "feedbacks")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
+    try:
+        docs, total = await get_feedback_documents(
             limit=limit,
             skip=skip,
             urgency=urgency,
             category=category,
+            category_match=category_match,
             sentiment=sentiment,
             unresolved_only=unresolved_only,
+            after=after,
+            with_total=FEEDBACK_LIST_WITH_TOTAL if with_total is None else with_total,
+            view=view,
         )
 
-        # Serialize feedbacks
-        serialized = [serialize_feedback(f.model_dump()) for f in feedbacks]
+        # A full page may have more rows after it
+        next_cursor = None
+        if len(docs) == limit:
+            next_cursor = encode_cursor(docs[-1]["created_at"], str(docs[-1]["_id"]))
 
-        return FeedbackListResponse(feedbacks=serialized, total=total)
+        # Trusted-read fast path: documents are shaped once and encoded
+        # straight to JSON bytes, skipping model validation of every row
+        to_response = feedback_summary_doc_to_response if view == "summary" else feedback_doc_to_response
+        body = {
+            "feedbacks": [to_response(doc) for doc in docs],
+            "total": total,
+            "next_cursor": next_cursor,
+        }
+        return Response(content=to_json(body), media_type="application/json", headers=etag_headers(etag))
 
     except Exception as e:
         logger.error(f"Error listing feedbacks: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to list feedbacks: {str(e)}")
 
 
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, as stored in MongoDB (naive values are taken as UTC)."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@router.get("/feedback/export")
+async def export_feedbacks(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    urgency: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    category_match: Literal["exact", "prefix"] = Query("exact", description="Match category exactly or by prefix"),
+    sentiment: Optional[str] = Query(None),
+    unresolved_only: bool = Query(False),
+    created_from: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at"),
+    gzip: bool = Query(False, description="Gzip the file (served as a .gz download)"),
+):
+    """
+    Stream every matching feedback as NDJSON or CSV, newest first.
+
+    - Same filters as GET /api/feedback, plus a created_at range
+    - NDJSON lines use the FeedbackResponse shape; CSV flattens the
+      analysis and reports override_count instead of the override history
+    - Rows are read from a MongoDB cursor (EXPORT_BATCH_SIZE per batch) and
+      streamed, so memory does not grow with the result size
+    """
+    created_from, created_to = naive_utc(created_from), naive_utc(created_to)
+    if created_from and created_to and created_from >= created_to:
+        raise HTTPException(status_code=400, detail="created_from must be before created_to")
+
+    query = build_feedback_query(
+        urgency=urgency,
+        category=category,
+        sentiment=sentiment,
+        unresolved_only=unresolved_only,
+        category_match=category_match,
+        created_from=created_from,
+        created_to=created_to,
+    )
+
+    docs = iter_feedback_documents(query, batch_size=EXPORT_BATCH_SIZE)
+    if format == "csv":
+        chunks, media_type = csv_chunks(docs), "text/csv; charset=utf-8"
+    else:
+        chunks, media_type = ndjson_chunks(docs), "application/x-ndjson"
+
+    filename = f"feedback.{format}"
+    if gzip:
+        chunks, media_type, filename = gzip_chunks(chunks), "application/gzip", f"{filename}.gz"
+
+    logger.info(f"Exporting feedback as {filename}: {query}")
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def parse_changes_since(since: str):
+    """
+    Parse ?since= as a watermark, or as an ISO-8601 timestamp (UTC if naive).
+
+    Raises:
+        ValueError: If it is neither
+    """
+    try:
+        return decode_cursor(since)
+    except ValueError:
+        pass
+    try:
+        timestamp = datetime.fromisoformat(since)
+    except ValueError:
+        raise ValueError(f"Invalid watermark: {since}")
+    return naive_utc(timestamp), MIN_OBJECT_ID
+
+
+@router.get("/feedback/changes", response_model=FeedbackChangesResponse)
+async def list_feedback_changes(
+    since: Optional[str] = Query(None, description="watermark from the previous response, or an ISO-8601 timestamp"),
+    limit: int = Query(500, ge=1, le=1000),
+):
+    """
+    Feedback created or modified after a watermark, for catching up after
+    a WebSocket reconnect.
+
+    - Call without since to get a starting watermark (no rows), before
+      loading a page
+    - Rows use the FeedbackResponse shape, oldest change first; creation,
+      analysis progress and overrides all count as changes
+    - Returns the watermark to pass next time; while has_more is true,
+      call again straight away
+    - Rows near the watermark may be returned twice; upsert them by id
+    """
+    if since is None:
+        watermark = current_changes_watermark()
+        return FeedbackChangesResponse(
+            feedbacks=[],
+            watermark=encode_cursor(watermark[0], str(watermark[1])),
+            has_more=False,
+        )
+
+    try:
+        after = parse_changes_since(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        docs, watermark, has_more = await get_feedback_changes(after, limit=limit)
+
+        body = {
+            "feedbacks": [feedback_doc_to_response(doc) for doc in docs],
+            "watermark": encode_cursor(watermark[0], str(watermark[1])),
+            "has_more": has_more,
+        }
+        return Response(content=to_json(body), media_type="application/json")
+
+    except Exception as e:
+        logger.error(f"Error listing feedback changes: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to list feedback changes: {str(e)}")
+
+
+@router.get("/feedback/search", response_model=FeedbackListResponse)
+async def search_feedbacks_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Words or \"phrases\" to search for"),
+    limit: int = Query(50, ge=1, le=100),
+    urgency: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    sentiment: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
+    """
+    Full-text search over message, summary and recommended action.
+
+    - Ranked by relevance (text score), best first
+    - Combinable with the urgency, category and sentiment filters
+    - Keyset pagination via cursor/next_cursor; total is not computed
+    """
+    try:
+        after = decode_search_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        results = await search_feedbacks(
+            q,
+            limit=limit,
+            urgency=urgency,
+            category=category,
+            sentiment=sentiment,
+            after=after,
+        )
+
+        serialized = [serialize_feedback(feedback.model_dump()) for feedback, _ in results]
+
+        next_cursor = None
+        if len(results) == limit:
+            last_feedback, last_score = results[-1]
+            next_cursor = encode_search_cursor(last_score, last_feedback.id)
+
+        return FeedbackListResponse(feedbacks=serialized, total=None, next_cursor=next_cursor)
+
+    except Exception as e:
+        logger.error(f"Error searching feedbacks: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to search feedbacks: {str(e)}")
+
+
 @router.get("/feedback/{feedback_id}", response_model=FeedbackResponse)
-async def get_feedback(feedback_id: str):
-    """Get a single feedback by ID."""
+async def get_feedback(feedback_id: str, request: Request, response: Response):
+    """Get a single feedback by ID (weak ETag; 304 while no feedback has been written)."""
+    etag = resource_etag(request, "feedbacks")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
     try:
         feedback = await get_feedback_by_id(feedback_id)
 
         if not feedback:
             raise HTTPException(status_code=404, detail="Feedback not found")
 
+        response.headers.update(etag_headers(etag))
         return serialize_feedback(feedback.model_dump())
 
     except HTTPException:
@@ -129,15 +405,36 @@ async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for realtime feedback updates.
 
-    Clients receive new feedback as it's created.
+    Clients receive new feedback as it's created and again when its analysis
+    completes. To receive only some feedback, send
+    {"type": "subscribe", "urgency": [...], "sentiment": [...], "category": [...]}
+    (any subset of fields; {"type": "subscribe"} resets to everything). The
+    server replies with "subscribed" or "error". Filtered subscribers only
+    receive analyzed feedback; override events go to every client. Any
+    other message is answered with a pong.
     """
     await manager.connect(websocket)
     try:
         while True:
             # Keep connection alive and listen for client messages
             data = await websocket.receive_text()
-            # Echo back for heartbeat (optional)
-            await websocket.send_json({"type": "pong"})
+            try:
+                message = json.loads(data)
+            except ValueError:
+                message = None
+
+            if isinstance(message, dict) and message.get("type") == "subscribe":
+                try:
+                    subscription = FeedbackSubscription(**{k: v for k, v in message.items() if k != "type"})
+                except (ValidationError, TypeError) as e:
+                    manager.send(websocket, {"type": "error", "detail": f"Invalid subscription: {e}"})
+                    continue
+                manager.subscribe(websocket, subscription_key(subscription))
+                manager.send(websocket, {"type": "subscribed", "filter": subscription.model_dump()})
+                continue
+
+            # Echo back for heartbeat (optional); queued so only the sender task writes
+            manager.send(websocket, {"type": "pong"})
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
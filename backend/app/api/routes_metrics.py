@@ -2,45 +2,148 @@
 Phase 2: Metrics API routes.
 Endpoints for accessing AI agent performance metrics.
 """
-from fastapi import APIRouter, Query
+from datetime import datetime
+from fastapi import APIRouter, Query, Request, Response
 from typing import List
-from ..metrics import compute_accuracy, compute_urgency_breakdown, compute_sentiment_trend
-from ..schemas import AccuracyMetrics, UrgencyBreakdown, SentimentTrend
+from ..metrics import cached_metric, get_metrics_cache_stats
+from ..counters import read_accuracy, read_urgency_breakdown
+from ..sentiment_rollup import read_sentiment_trend
+from ..analysis_cache import get_cache_stats
+from ..ai_agent import batcher
+from ..integrations import slack_notifier
+from ..realtime import manager
+from ..versions import etag_headers, not_modified, resource_etag
+from ..schemas import (
+    AccuracyMetrics,
+    UrgencyBreakdown,
+    SentimentTrend,
+    AnalysisCacheStats,
+    AnalysisBatchingStats,
+    SlackDeliveryStats,
+    MetricsCacheStats,
+    WebSocketStats,
+)
 
 router = APIRouter(prefix="/api/metrics", tags=["metrics"])
 
 
 @router.get("/accuracy", response_model=AccuracyMetrics)
-async def get_accuracy_metrics():
+async def get_accuracy_metrics(request: Request, response: Response):
     """
     Get AI agent accuracy metrics.
 
     Returns overall accuracy and per-category accuracy.
     Accuracy = 1 - (overridden / processed)
+
+    Served from the materialized metrics counters (see app.counters) and
+    cached for METRICS_CACHE_TTL_SECONDS. Sends a weak ETag; If-None-Match
+    is answered with 304 until the counters change.
     """
-    return await compute_accuracy()
+    etag = resource_etag(request, "metrics_counters")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
+    response.headers.update(etag_headers(etag))
+    return await cached_metric("accuracy", read_accuracy)
 
 
 @router.get("/urgency-breakdown", response_model=UrgencyBreakdown)
-async def get_urgency_breakdown():
+async def get_urgency_breakdown(request: Request, response: Response):
     """
     Get breakdown of feedback by urgency level.
 
     Returns counts for low, medium, and high urgency feedback.
+    Served from the materialized metrics counters (see app.counters) and
+    cached for METRICS_CACHE_TTL_SECONDS. Sends a weak ETag; If-None-Match
+    is answered with 304 until the counters change.
     """
-    return await compute_urgency_breakdown()
+    etag = resource_etag(request, "metrics_counters")
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
+    response.headers.update(etag_headers(etag))
+    return await cached_metric("urgency-breakdown", read_urgency_breakdown)
 
 
 @router.get("/sentiment-trend", response_model=List[SentimentTrend])
 async def get_sentiment_trend(
-    days: int = Query(default=7, ge=1, le=90, description="Number of days to look back")
+    request: Request,
+    response: Response,
+    days: int = Query(default=7, ge=1, le=365, description="Number of days to look back"),
 ):
     """
     Get daily sentiment trend for the last N days.
 
     Args:
-        days: Number of days to look back (1-90, default 7)
+        days: Number of days to look back (1-365, default 7)
+
+    Returns list of daily sentiment counts (positive, neutral, negative),
+    read from the sentiment_daily rollup (one document per day) and cached
+    per `days` value for METRICS_CACHE_TTL_SECONDS. Sends a weak ETag that
+    changes with the rollup and with the (UTC) date, since the window moves
+    at midnight.
+    """
+    etag = resource_etag(request, "sentiment_daily", extra=datetime.utcnow().strftime("%Y-%m-%d"))
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
+    response.headers.update(etag_headers(etag))
+    return await cached_metric(("sentiment-trend", days), lambda: read_sentiment_trend(days=days))
+
+
+@router.get("/analysis-cache", response_model=AnalysisCacheStats)
+async def get_analysis_cache_stats():
+    """
+    Get analysis cache counters for this process.
+
+    Returns hits, misses, evictions and size for the in-process tier and
+    hits/misses for the MongoDB tier, for sizing the cache.
+    """
+    return get_cache_stats()
+
+
+@router.get("/analysis-batching", response_model=AnalysisBatchingStats)
+async def get_analysis_batching_stats():
+    """
+    Get LLM micro-batching counters for this process.
+
+    Returns batch counts, average batch size, single-call fallbacks and
+    per-batch latency, for tuning ANALYSIS_BATCH_WINDOW_MS / ANALYSIS_BATCH_MAX_ITEMS.
+    """
+    return batcher.stats()
+
+
+@router.get("/slack-delivery", response_model=SlackDeliveryStats)
+async def get_slack_delivery_stats():
+    """
+    Get Slack outbound queue depth and delivery metrics for this process.
+
+    Returns queued/delivered/failed/dropped counts, retries and
+    enqueue-to-delivery latency.
+    """
+    return slack_notifier.stats()
+
+
+@router.get("/metrics-cache", response_model=MetricsCacheStats)
+async def get_metrics_result_cache_stats():
+    """
+    Get metrics result cache counters for this process.
+
+    Returns hits, misses and size of the cache in front of the metrics
+    endpoints, plus the number of computations currently in flight.
+    """
+    return get_metrics_cache_stats()
+
+
+@router.get("/websocket", response_model=WebSocketStats)
+async def get_websocket_stats():
+    """
+    Get WebSocket fan-out metrics for this process.
 
-    Returns list of daily sentiment counts (positive, neutral, negative).
+    Returns connected clients, messages waiting in their send queues and
+    how many slow clients were disconnected.
     """
-    return await compute_sentiment_trend(days=days)
+    return manager.stats()
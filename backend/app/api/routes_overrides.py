@@ -2,13 +2,90 @@
 Phase 2: Override API routes.
 Endpoints for applying human corrections to AI analysis.
 """
+import os
+import logging
 from fastapi import APIRouter, HTTPException, status
 from typing import List
-from ..services import apply_override, get_feedback_by_id
-from ..schemas import OverrideCreate, FeedbackResponse, OverrideRecord
-
+from ..services import apply_override, apply_override_batch, find_override_targets, get_feedback_by_id
+from ..schemas import (
+    OverrideCreate,
+    FeedbackResponse,
+    OverrideRecord,
+    OverrideBatchCreate,
+    OverrideBatchItemResult,
+    OverrideBatchResponse,
+)
+from ..realtime import manager
+
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/feedback", tags=["overrides"])
 
+# Maximum number of overrides applied by one POST /api/feedback/overrides/batch
+OVERRIDE_BATCH_MAX_ITEMS = int(os.getenv("OVERRIDE_BATCH_MAX_ITEMS", "1000"))
+
+
+@router.post("/overrides/batch", response_model=OverrideBatchResponse, status_code=status.HTTP_200_OK)
+async def create_override_batch(batch: OverrideBatchCreate):
+    """
+    Apply many human overrides in one request.
+
+    Accepts either explicit items (feedback_id plus override fields), or a
+    filter plus one override applied to every feedback whose current
+    analysis matches (e.g. category "technical" -> "billing").
+
+    - Executes as a single bulk_write, recording an audit entry per override
+    - Skips feedback changed since it was selected (reported as failed items)
+    - Invalidates list counts and metrics caches once
+    - Broadcasts one compact "feedbacks:overridden" event
+
+    Raises:
+        413: More overrides than OVERRIDE_BATCH_MAX_ITEMS
+        500: Failed to apply overrides
+    """
+    filters = None
+    if batch.items is not None:
+        overrides = [
+            (item.feedback_id, OverrideCreate(**item.model_dump(exclude={"feedback_id"})))
+            for item in batch.items
+        ]
+    else:
+        filters = batch.filter.model_dump(exclude_none=True)
+        feedback_ids = await find_override_targets(filters, limit=OVERRIDE_BATCH_MAX_ITEMS + 1)
+        overrides = [(feedback_id, batch.override) for feedback_id in feedback_ids]
+
+    if len(overrides) > OVERRIDE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: more than {OVERRIDE_BATCH_MAX_ITEMS} overrides, narrow the filter or split the batch"
+        )
+
+    try:
+        errors = await apply_override_batch(overrides, filters=filters)
+    except Exception as e:
+        logger.error(f"Error applying override batch: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to apply overrides: {str(e)}"
+        )
+
+    results = [
+        OverrideBatchItemResult(index=index, feedback_id=feedback_id, success=error is None, error=error)
+        for index, ((feedback_id, _), error) in enumerate(zip(overrides, errors))
+    ]
+    changes = [
+        {"id": feedback_id, "field": override_data.field, "new_value": override_data.new_value}
+        for (feedback_id, override_data), error in zip(overrides, errors)
+        if error is None
+    ]
+
+    if changes:
+        manager.broadcast({
+            "type": "feedbacks:overridden",
+            "data": changes
+        })
+
+    return OverrideBatchResponse(results=results, applied=len(changes), failed=len(overrides) - len(changes))
+
 
 @router.post("/{feedback_id}/override", response_model=FeedbackResponse, status_code=status.HTTP_200_OK)
 async def create_override(feedback_id: str, override_data: OverrideCreate):
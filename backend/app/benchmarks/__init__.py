@@ -0,0 +1 @@
+# Benchmark scripts (run against a scratch MongoDB database)
@@ -0,0 +1,87 @@
+"""
+Benchmark: compute_accuracy, N+1 count_documents vs single aggregation.
+
+Seeds a scratch collection (default 1M documents) and times the previous
+implementation (two counts + distinct + two counts per category) against
+the current single-pass $group aggregation, checking both agree.
+
+Run with:
+    python -m app.benchmarks.bench_accuracy --docs 1000000
+"""
+import asyncio
+import argparse
+from typing import Dict
+from ..db import close_mongo_connection, get_feedbacks_collection
+from ..indexes import ensure_indexes
+from ..metrics import compute_accuracy
+from ..schemas import AccuracyMetrics
+from ..utils import setup_logging
+from .common import connect_bench_db, seed_feedbacks, time_async, print_results
+
+
+async def compute_accuracy_n_plus_one() -> AccuracyMetrics:
+    """The previous compute_accuracy: 3 queries plus 2 counts per category."""
+    collection = get_feedbacks_collection()
+
+    processed = await collection.count_documents({"agent_success": {"$ne": None}})
+    overridden = await collection.count_documents({
+        "agent_success": {"$ne": None},
+        "overrides": {"$exists": True, "$ne": []}
+    })
+    overall_accuracy = 1.0 if processed == 0 else (1.0 - (overridden / processed))
+
+    by_category: Dict[str, float] = {}
+    categories = await collection.distinct("analysis.category", {"agent_success": {"$ne": None}})
+
+    for category in categories:
+        if not category:
+            continue
+        cat_processed = await collection.count_documents({
+            "agent_success": {"$ne": None},
+            "analysis.category": category
+        })
+        cat_overridden = await collection.count_documents({
+            "agent_success": {"$ne": None},
+            "analysis.category": category,
+            "overrides": {"$exists": True, "$ne": []}
+        })
+        if cat_processed > 0:
+            by_category[category] = 1.0 - (cat_overridden / cat_processed)
+
+    return AccuracyMetrics(
+        total_processed=processed,
+        total_overridden=overridden,
+        overall_accuracy=overall_accuracy,
+        by_category=by_category,
+    )
+
+
+async def main(docs: int, repeat: int, reset: bool):
+    setup_logging()
+    await connect_bench_db()
+    try:
+        await seed_feedbacks(docs, reset=reset)
+        await ensure_indexes()
+
+        old = await compute_accuracy_n_plus_one()
+        new = await compute_accuracy()
+        assert (old.total_processed, old.total_overridden) == (new.total_processed, new.total_overridden)
+        assert old.by_category.keys() == new.by_category.keys()
+
+        results = {
+            "n+1 count_documents": await time_async(compute_accuracy_n_plus_one, repeat=repeat),
+            "single aggregation": await time_async(compute_accuracy, repeat=repeat),
+        }
+        print_results(f"compute_accuracy on {docs} documents, {len(new.by_category)} categories", results)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark compute_accuracy implementations")
+    parser.add_argument("--docs", type=int, default=1_000_000, help="Documents to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant")
+    parser.add_argument("--reset", action="store_true", help="Drop and reseed the benchmark collection")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.docs, args.repeat, args.reset))
@@ -0,0 +1,146 @@
+"""
+Benchmark: WebSocket broadcast fan-out to many simulated clients.
+
+Compares the previous ConnectionManager.broadcast (sequential send_json to
+each client, serializing the message every time, awaited by the POST
+handler) with the current one (serialize once, enqueue per client, per-client
+sender tasks) on in-process fake WebSockets. A few clients are slow, so the
+cost of one stalled browser on the request path is visible. No database or
+network is needed.
+
+Run with:
+    python -m app.benchmarks.bench_broadcast --clients 1000 --slow 5
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from datetime import datetime
+from typing import List
+from pydantic_core import to_json
+from ..realtime import ConnectionManager
+from ..models import feedback_doc_to_response
+from .common import make_feedback_doc
+
+
+class SimulatedClient:
+    """Fake WebSocket with a fixed per-send latency; counts deliveries."""
+
+    def __init__(self, latency: float, delivered: "DeliveryCounter"):
+        self.latency = latency
+        self.delivered = delivered
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+        self.delivered.add(self)
+
+    async def send_json(self, data: dict):
+        # What Starlette does: encode per call, then send text
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+class DeliveryCounter:
+    """Signals when every fast client has received the current message."""
+
+    def __init__(self, fast_clients: int):
+        self.fast_clients = fast_clients
+        self.count = 0
+        self.done = asyncio.Event()
+
+    def reset(self):
+        self.count = 0
+        self.done.clear()
+
+    def add(self, client: SimulatedClient):
+        if client.latency == 0:
+            self.count += 1
+            if self.count == self.fast_clients:
+                self.done.set()
+
+
+async def previous_broadcast(clients: List[SimulatedClient], message: dict):
+    """The broadcast before per-client queues: sequential, awaited by the caller."""
+    for client in clients:
+        await client.send_json(message)
+
+
+async def run_previous(clients, counter, message, repeat) -> tuple:
+    call_ms, delivered_ms = [], []
+    for _ in range(repeat):
+        counter.reset()
+        started = time.perf_counter()
+        await previous_broadcast(clients, message)
+        elapsed = (time.perf_counter() - started) * 1000
+        call_ms.append(elapsed)
+        delivered_ms.append(elapsed)
+    return call_ms, delivered_ms
+
+
+async def run_current(clients, counter, message, repeat, max_queue) -> tuple:
+    manager = ConnectionManager(max_queue=max_queue, send_timeout=60)
+    for client in clients:
+        await manager.connect(client)
+
+    call_ms, delivered_ms = [], []
+    try:
+        for _ in range(repeat):
+            counter.reset()
+            started = time.perf_counter()
+            manager.broadcast(message)
+            call_ms.append((time.perf_counter() - started) * 1000)
+            await counter.done.wait()
+            delivered_ms.append((time.perf_counter() - started) * 1000)
+    finally:
+        stats = manager.stats()
+        await manager.shutdown()
+    return call_ms, delivered_ms, stats
+
+
+def summarize(samples: List[float]) -> str:
+    return f"{statistics.median(samples):10.2f} {max(samples):10.2f}"
+
+
+async def main(clients: int, slow: int, slow_latency: float, repeat: int, max_queue: int):
+    rng = random.Random(42)
+    doc = make_feedback_doc(rng, datetime.utcnow())
+    # JSON-safe payload, as the routes broadcast it
+    message = {"type": "feedbacks:updated", "data": json.loads(to_json(feedback_doc_to_response(doc)))}
+
+    counter = DeliveryCounter(clients - slow)
+    simulated = [SimulatedClient(0, counter) for _ in range(clients - slow)]
+    simulated += [SimulatedClient(slow_latency, counter) for _ in range(slow)]
+    rng.shuffle(simulated)
+
+    print(f"\nBroadcast to {clients} clients ({slow} with {slow_latency * 1000:.0f} ms sends), {repeat} messages, in ms")
+    print(f"{'variant':28} {'call med':>10} {'call max':>10} {'fast med':>10} {'fast max':>10}")
+    print("(call: time the broadcasting request waits; fast: until every fast client has the message)")
+
+    prev_call, prev_delivered = await run_previous(simulated, counter, message, repeat)
+    print(f"{'previous (sequential)':28} {summarize(prev_call)} {summarize(prev_delivered)}")
+
+    call, delivered, stats = await run_current(simulated, counter, message, repeat, max_queue)
+    print(f"{'per-client queues':28} {summarize(call)} {summarize(delivered)}")
+    print(f"Slow clients disconnected: {stats['dropped_clients']} (queue bound {max_queue})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket broadcast fan-out")
+    parser.add_argument("--clients", type=int, default=1000, help="Simulated WebSocket clients")
+    parser.add_argument("--slow", type=int, default=5, help="Clients with slow sends")
+    parser.add_argument("--slow-latency", type=float, default=0.2, help="Seconds per send for slow clients")
+    parser.add_argument("--repeat", type=int, default=20, help="Messages broadcast per variant")
+    parser.add_argument("--max-queue", type=int, default=256, help="Per-client send queue bound")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.clients, args.slow, args.slow_latency, args.repeat, args.max_queue))
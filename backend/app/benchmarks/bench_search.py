@@ -0,0 +1,67 @@
+"""
+Benchmark: full-text search vs scanning messages with a regex.
+
+Seeds a scratch collection (default 1M documents) and times
+search_feedbacks (feedback_text index, ranked by text score) against the
+client-side alternative it replaces, an unanchored case-insensitive regex
+over message and summary, for a few representative terms with and without
+an urgency filter.
+
+Run with:
+    python -m app.benchmarks.bench_search --docs 1000000
+"""
+import asyncio
+import argparse
+import re
+from typing import List, Optional
+from ..db import close_mongo_connection, get_feedbacks_collection
+from ..indexes import ensure_indexes
+from ..services import search_feedbacks
+from ..utils import setup_logging
+from .common import connect_bench_db, seed_feedbacks, time_async, print_results
+
+TERMS = ["refund", "timeout export", "webhook"]
+
+
+async def search_by_regex(q: str, limit: int, urgency: Optional[str] = None) -> List[dict]:
+    """Substring match over message and summary, newest first."""
+    pattern = {"$regex": re.escape(q), "$options": "i"}
+    query = {"$or": [{"message": pattern}, {"analysis.summary": pattern}]}
+    if urgency:
+        query["analysis.urgency_level"] = urgency
+    cursor = get_feedbacks_collection().find(query).sort([("created_at", -1), ("_id", -1)]).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def main(docs: int, repeat: int, limit: int, reset: bool):
+    setup_logging()
+    await connect_bench_db()
+    try:
+        await seed_feedbacks(docs, reset=reset)
+        # Building the text index on a large collection takes a while on first run
+        await ensure_indexes()
+
+        for urgency in (None, "high"):
+            results = {}
+            for term in TERMS:
+                results[f"regex '{term}'"] = await time_async(
+                    lambda: search_by_regex(term, limit, urgency), repeat=repeat
+                )
+                results[f"$text '{term}'"] = await time_async(
+                    lambda: search_feedbacks(term, limit=limit, urgency=urgency), repeat=repeat
+                )
+            label = f"urgency={urgency}" if urgency else "no filter"
+            print_results(f"Search latency, first page of {limit}, {docs} documents, {label}", results)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark full-text search")
+    parser.add_argument("--docs", type=int, default=1_000_000, help="Documents to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant")
+    parser.add_argument("--limit", type=int, default=50, help="Page size")
+    parser.add_argument("--reset", action="store_true", help="Drop and reseed the benchmark collection")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.docs, args.repeat, args.limit, args.reset))
@@ -0,0 +1,76 @@
+"""
+Microbenchmark: per-row cost of serializing GET /api/feedback pages.
+
+Compares the previous response path (feedback_to_dict -> FeedbackDB
+validation -> model_dump -> serialize_feedback -> FeedbackListResponse
+validation -> FastAPI response validation and JSON encoding) with the
+trusted-read fast path (feedback_doc_to_response -> pydantic_core.to_json)
+on synthetic 100-row pages. No database is needed.
+
+Run with:
+    python -m app.benchmarks.bench_serialization --rows 100 --pages 200
+"""
+import json
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime
+from typing import Callable, List
+from pydantic_core import to_json
+from ..models import feedback_to_dict, serialize_feedback, feedback_doc_to_response
+from ..schemas import FeedbackDB, FeedbackListResponse
+from .common import make_feedback_doc
+
+
+def previous_path(docs: List[dict]) -> bytes:
+    """The response path before the fast path, including FastAPI's own work."""
+    feedbacks = [FeedbackDB(**feedback_to_dict(dict(doc))) for doc in docs]
+    serialized = [serialize_feedback(f.model_dump()) for f in feedbacks]
+    response = FeedbackListResponse(feedbacks=serialized, total=len(docs), next_cursor=None)
+    # FastAPI re-validates the returned object against response_model, then encodes it
+    validated = FeedbackListResponse.model_validate(response.model_dump())
+    return json.dumps(validated.model_dump(mode="json")).encode("utf-8")
+
+
+def fast_path(docs: List[dict]) -> bytes:
+    """Shape each document once and encode straight to JSON bytes."""
+    return to_json({
+        "feedbacks": [feedback_doc_to_response(doc) for doc in docs],
+        "total": len(docs),
+        "next_cursor": None,
+    })
+
+
+def time_page(fn: Callable[[List[dict]], bytes], docs: List[dict], pages: int) -> List[float]:
+    """Serialize the page `pages` times, returning per-row microseconds per run."""
+    fn(docs)
+    samples = []
+    for _ in range(pages):
+        started = time.perf_counter()
+        fn(docs)
+        samples.append((time.perf_counter() - started) * 1_000_000 / len(docs))
+    return samples
+
+
+def main(rows: int, pages: int):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    docs = [make_feedback_doc(rng, now) for _ in range(rows)]
+
+    assert json.loads(previous_path(docs)) == json.loads(fast_path(docs)), "paths disagree"
+
+    print(f"\nSerialization cost per row, {rows}-row pages, {pages} runs")
+    print(f"{'variant':32} {'min us':>10} {'median us':>10} {'max us':>10}")
+    for name, fn in (("previous (4 transformations)", previous_path), ("fast path", fast_path)):
+        samples = time_page(fn, docs, pages)
+        print(f"{name:32} {min(samples):10.1f} {statistics.median(samples):10.1f} {max(samples):10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument("--rows", type=int, default=100, help="Rows per page")
+    parser.add_argument("--pages", type=int, default=200, help="Timed pages per variant")
+    args = parser.parse_args()
+
+    main(args.rows, args.pages)
@@ -0,0 +1,115 @@
+"""
+Benchmark: write-path round trips in create_feedback and apply_override.
+
+Times the previous implementations (insert_one + find_one; find_one +
+update_one + find_one) against the current ones (insert_one only; one
+find_one_and_update with a pipeline update). Each sample is one write, so
+the difference is dominated by network round trips to MongoDB; run against
+a remote MONGODB_URI to see realistic numbers.
+
+Run with:
+    python -m app.benchmarks.bench_writes --docs 10000 --repeat 200
+"""
+import asyncio
+import argparse
+import random
+from datetime import datetime
+from bson import ObjectId
+from ..db import close_mongo_connection, get_feedbacks_collection
+from ..counters import record_feedback_change
+from ..indexes import ensure_indexes
+from ..models import feedback_from_dict, feedback_to_dict
+from ..schemas import FeedbackCreate, FeedbackDB, OverrideCreate
+from ..services import create_feedback, apply_override
+from ..utils import setup_logging
+from .common import CATEGORIES, connect_bench_db, seed_feedbacks, time_async, print_results
+
+
+async def create_feedback_read_back(feedback_data: FeedbackCreate) -> FeedbackDB:
+    """The previous create path: insert, then read the document back."""
+    collection = get_feedbacks_collection()
+    doc = feedback_from_dict({
+        "customer_name": feedback_data.customer_name,
+        "email": feedback_data.email,
+        "message": feedback_data.message,
+        "analysis_status": "pending",
+    })
+    result = await collection.insert_one(doc)
+    saved_doc = await collection.find_one({"_id": result.inserted_id})
+    return FeedbackDB(**feedback_to_dict(saved_doc))
+
+
+async def apply_override_three_trips(feedback_id: str, override_data: OverrideCreate) -> FeedbackDB:
+    """The previous override path: find_one, update_one, find_one."""
+    collection = get_feedbacks_collection()
+
+    feedback = await collection.find_one({"_id": ObjectId(feedback_id)})
+    old_value = feedback["analysis"].get(override_data.field)
+    await collection.update_one(
+        {"_id": ObjectId(feedback_id)},
+        {
+            "$push": {"overrides": {
+                "field": override_data.field,
+                "old_value": str(old_value) if old_value is not None else None,
+                "new_value": override_data.new_value,
+                "reason": override_data.reason,
+                "overridden_by": override_data.overridden_by,
+                "overridden_at": datetime.utcnow(),
+            }},
+            "$set": {f"analysis.{override_data.field}": override_data.new_value},
+        },
+    )
+    updated_feedback = await collection.find_one({"_id": ObjectId(feedback_id)})
+    await record_feedback_change(feedback, updated_feedback)
+    return FeedbackDB(**feedback_to_dict(updated_feedback))
+
+
+async def main(docs: int, repeat: int, reset: bool):
+    setup_logging()
+    await connect_bench_db()
+    try:
+        await seed_feedbacks(docs, reset=reset)
+        await ensure_indexes()
+
+        rng = random.Random(7)
+        ids = [str(doc["_id"]) async for doc in get_feedbacks_collection().find({}, {"_id": 1}).limit(repeat * 4)]
+
+        feedback_data = FeedbackCreate(
+            customer_name="Bench Customer",
+            email="bench@example.com",
+            message="The export button times out on large reports",
+        )
+
+        def override() -> OverrideCreate:
+            return OverrideCreate(
+                field="category",
+                new_value=rng.choice(CATEGORIES),
+                reason="Benchmark override",
+                overridden_by="bench@example.com",
+            )
+
+        results = {
+            "create: insert + find_one": await time_async(
+                lambda: create_feedback_read_back(feedback_data), repeat=repeat
+            ),
+            "create: insert only": await time_async(lambda: create_feedback(feedback_data), repeat=repeat),
+            "override: find + update + find": await time_async(
+                lambda: apply_override_three_trips(rng.choice(ids), override()), repeat=repeat
+            ),
+            "override: find_one_and_update": await time_async(
+                lambda: apply_override(rng.choice(ids), override()), repeat=repeat
+            ),
+        }
+        print_results(f"Write latency per operation ({repeat} runs each, {docs} documents)", results)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark write-path round trips")
+    parser.add_argument("--docs", type=int, default=10_000, help="Documents to seed")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed writes per variant")
+    parser.add_argument("--reset", action="store_true", help="Drop and reseed the benchmark collection")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.docs, args.repeat, args.reset))
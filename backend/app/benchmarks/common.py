@@ -0,0 +1,135 @@
+"""
+Shared helpers for benchmark scripts.
+
+Benchmarks run against a scratch database (BENCH_DATABASE_NAME, default
+"feedback_triage_bench") on MONGODB_URI, never the application database.
+"""
+import os
+import time
+import random
+import logging
+import statistics
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+from bson import ObjectId
+from .. import db
+from ..categories import normalize_category
+from ..models import feedback_from_dict
+
+logger = logging.getLogger(__name__)
+
+BENCH_DATABASE_NAME = os.getenv("BENCH_DATABASE_NAME", "feedback_triage_bench")
+
+SENTIMENTS = ["positive", "neutral", "negative"]
+URGENCIES = ["low", "medium", "high"]
+# A realistic long tail of LLM-invented category strings
+CATEGORIES = [
+    "billing", "technical", "product", "account", "shipping", "feature request",
+    "performance", "login", "refund", "integration", "mobile app", "api", "security",
+    "onboarding", "pricing", "documentation", "support", "subscription", "data export",
+    "notifications", "ui", "sync", "outage", "privacy", "Billing", "Technical Issue",
+    "account access", "payment", "delivery", "bug report",
+]
+WORDS = (
+    "invoice charge refund login password crash slow export sync dashboard api token "
+    "error timeout outage feature dark mode mobile shipping tracking delivery account "
+    "subscription upgrade downgrade cancel support ticket integration webhook report"
+).split()
+
+
+async def connect_bench_db():
+    """Connect and point the app's db module at the scratch benchmark database."""
+    await db.connect_to_mongo()
+    db.database = db.client[BENCH_DATABASE_NAME]
+    logger.info(f"Using benchmark database {BENCH_DATABASE_NAME}")
+
+
+def make_feedback_doc(rng: random.Random, now: datetime, days: int = 365) -> dict:
+    """Build one synthetic, analyzed feedback document."""
+    message = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 60)))
+    category = rng.choice(CATEGORIES)
+    doc = feedback_from_dict({
+        "customer_name": f"Customer {rng.randint(1, 100000)}",
+        "email": f"user{rng.randint(1, 100000)}@example.com",
+        "message": message,
+        "analysis": {
+            "sentiment": rng.choice(SENTIMENTS),
+            "urgency_level": rng.choice(URGENCIES),
+            "category": category,
+            "summary": f"Customer reports {message[:60]}",
+            "recommended_action": "Follow up with the customer",
+            "category_key": normalize_category(category),
+        },
+        "agent_success": True,
+        "analysis_status": "completed",
+    })
+    doc["created_at"] = now - timedelta(seconds=rng.randint(0, days * 86400))
+    doc["_id"] = ObjectId()
+    if rng.random() < 0.08:
+        doc["overrides"] = [{
+            "field": "category",
+            "old_value": category,
+            "new_value": rng.choice(CATEGORIES),
+            "reason": "Benchmark override",
+            "overridden_by": "bench@example.com",
+            "overridden_at": doc["created_at"] + timedelta(hours=1),
+        }]
+    del doc["lease_expires_at"]
+    return doc
+
+
+async def seed_feedbacks(count: int, batch_size: int = 10000, seed: int = 42, reset: bool = False):
+    """
+    Ensure the benchmark feedbacks collection holds `count` documents.
+
+    Existing documents are reused unless reset is True, so repeated runs
+    against a 1M-document collection do not reseed every time.
+    """
+    collection = db.get_feedbacks_collection()
+
+    if reset:
+        await collection.drop()
+
+    existing = await collection.estimated_document_count()
+    if existing >= count:
+        logger.info(f"Benchmark collection already has {existing} documents")
+        return
+
+    rng = random.Random(seed + existing)
+    now = datetime.utcnow()
+    remaining = count - existing
+    started = time.perf_counter()
+
+    while remaining > 0:
+        batch = [make_feedback_doc(rng, now) for _ in range(min(batch_size, remaining))]
+        await collection.insert_many(batch, ordered=False)
+        remaining -= len(batch)
+        logger.info(f"Seeded {count - remaining}/{count} documents")
+
+    logger.info(f"Seeding took {time.perf_counter() - started:.1f}s")
+
+
+async def time_async(fn: Callable[[], Awaitable], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """Run an async callable repeatedly and return latency statistics in ms."""
+    for _ in range(warmup):
+        await fn()
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "max_ms": max(samples),
+    }
+
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]):
+    """Print a small comparison table."""
+    print(f"\n{title}")
+    print(f"{'variant':32} {'min ms':>10} {'median ms':>10} {'max ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:32} {stats['min_ms']:10.1f} {stats['median_ms']:10.1f} {stats['max_ms']:10.1f}")
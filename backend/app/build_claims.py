@@ -0,0 +1,61 @@
+"""
+Exclusive claims on rebuilds of derived metrics data.
+
+Building the metrics counters or the sentiment rollup from feedbacks must
+not run in two processes at once (e.g. several API replicas starting
+together). A build first inserts a claim document into metrics_counters
+(kind "marker", _id "building:<name>"); the unique _id lets exactly one
+process succeed. A claim left behind by a crashed process can be taken over
+once it expires after BUILD_CLAIM_SECONDS.
+"""
+import os
+import uuid
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator
+from pymongo.errors import DuplicateKeyError
+from .db import get_metrics_counters_collection
+
+logger = logging.getLogger(__name__)
+
+# How long a claim blocks other builders if its owner never releases it
+BUILD_CLAIM_SECONDS = int(os.getenv("BUILD_CLAIM_SECONDS", "3600"))
+
+
+@asynccontextmanager
+async def build_claim(name: str) -> AsyncIterator[bool]:
+    """
+    Claim the build of name for the duration of the block.
+
+    Yields:
+        True if this process holds the claim, False if another one does
+    """
+    collection = get_metrics_counters_collection()
+    claim_id = f"building:{name}"
+    owner = uuid.uuid4().hex
+    now = datetime.utcnow()
+    claim = {
+        "kind": "marker",
+        "owner": owner,
+        "claimed_at": now,
+        "expires_at": now + timedelta(seconds=BUILD_CLAIM_SECONDS),
+    }
+
+    try:
+        await collection.insert_one({"_id": claim_id, **claim})
+        claimed = True
+    except DuplicateKeyError:
+        # Take over a claim whose owner died
+        expired = await collection.find_one_and_update(
+            {"_id": claim_id, "expires_at": {"$lte": now}}, {"$set": claim}
+        )
+        claimed = expired is not None
+        if claimed:
+            logger.warning(f"Took over expired {name} build claim from {expired.get('owner')}")
+
+    try:
+        yield claimed
+    finally:
+        if claimed:
+            await collection.delete_one({"_id": claim_id, "owner": owner})
@@ -0,0 +1,165 @@
+"""
+Normalized category keys.
+
+The LLM returns free-form category strings ("Billing", " billing ",
+"Billing Issue"), so the list filter used to match them with an unanchored
+case-insensitive regex, which cannot use an index. Every analysis now also
+stores analysis.category_key: the category lowercased, trimmed,
+whitespace-collapsed and mapped through CATEGORY_ALIASES. Filters match the
+key exactly or by anchored prefix, both of which use the
+category_key_created_at_id index.
+
+Backfill keys on existing documents with:
+    python -m app.categories                # documents without a key
+    python -m app.categories --all          # recompute every key (after alias changes)
+"""
+import os
+import re
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+from pymongo import UpdateOne
+from .db import connect_to_mongo, close_mongo_connection, get_feedbacks_collection
+from .utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Built-in aliases for common LLM spelling variants (normalized form -> key)
+DEFAULT_CATEGORY_ALIASES = {
+    "billing issue": "billing",
+    "payment": "billing",
+    "payments": "billing",
+    "technical issue": "technical",
+    "tech support": "technical",
+    "bug report": "bug",
+    "bugs": "bug",
+    "feature request": "feature",
+    "feature requests": "feature",
+    "account access": "account",
+}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _parse_aliases(value: str) -> Dict[str, str]:
+    """Parse CATEGORY_ALIASES, e.g. "billing issue=billing,tech=technical"."""
+    aliases = {}
+    for pair in value.split(","):
+        if "=" in pair:
+            alias, key = pair.split("=", 1)
+            aliases[_WHITESPACE_RE.sub(" ", alias).strip().lower()] = key.strip().lower()
+    return aliases
+
+
+CATEGORY_ALIASES = {**DEFAULT_CATEGORY_ALIASES, **_parse_aliases(os.getenv("CATEGORY_ALIASES", ""))}
+
+
+def normalize_category(category: Optional[str]) -> Optional[str]:
+    """Build the category_key for a category string (None for empty input)."""
+    if category is None:
+        return None
+    key = _WHITESPACE_RE.sub(" ", category).strip().lower()
+    if not key:
+        return None
+    return CATEGORY_ALIASES.get(key, key)
+
+
+def analysis_document(analysis: Any) -> Dict[str, Any]:
+    """
+    Build the stored analysis subdocument, including category_key.
+
+    Args:
+        analysis: FeedbackAnalysis or an analysis dict
+    """
+    doc = analysis.model_dump() if hasattr(analysis, "model_dump") else dict(analysis)
+    doc["category_key"] = normalize_category(doc.get("category"))
+    return doc
+
+
+def category_filter(category: str, match: str = "exact") -> Any:
+    """
+    Build the analysis.category_key condition for a category filter.
+
+    Args:
+        category: Category as typed by the user
+        match: "exact" or "prefix" (anchored, so it still uses the index)
+    """
+    if match == "prefix":
+        # Aliases map whole categories, so a prefix matches the normalized text
+        prefix = _WHITESPACE_RE.sub(" ", category).strip().lower()
+        return {"$regex": f"^{re.escape(prefix)}"}
+    return normalize_category(category)
+
+
+async def backfill_category_keys(batch_size: int = 1000, recompute: bool = False) -> int:
+    """
+    Write analysis.category_key on existing documents in _id-ordered batches.
+
+    Args:
+        batch_size: Documents updated per bulk_write
+        recompute: Recompute keys that already exist (e.g. after alias changes)
+
+    Returns:
+        Number of documents updated
+    """
+    collection = get_feedbacks_collection()
+    query: Dict[str, Any] = {"analysis.category": {"$type": "string"}}
+    if not recompute:
+        query["analysis.category_key"] = {"$exists": False}
+
+    updated = 0
+    last_id = None
+
+    while True:
+        page_query = dict(query)
+        if last_id is not None:
+            page_query["_id"] = {"$gt": last_id}
+
+        cursor = (
+            collection.find(page_query, {"analysis.category": 1, "analysis.category_key": 1})
+            .sort("_id", 1)
+            .limit(batch_size)
+        )
+        docs = await cursor.to_list(length=batch_size)
+        if not docs:
+            break
+
+        operations = []
+        for doc in docs:
+            key = normalize_category(doc["analysis"]["category"])
+            if doc["analysis"].get("category_key", ...) != key:
+                operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"analysis.category_key": key}}))
+
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+
+        last_id = docs[-1]["_id"]
+        logger.info(f"Category key backfill: {updated} updated, last _id {last_id}")
+
+    return updated
+
+
+async def main(batch_size: int = 1000, recompute: bool = False):
+    setup_logging()
+    await connect_to_mongo()
+    try:
+        updated = await backfill_category_keys(batch_size=batch_size, recompute=recompute)
+        print(f"Updated category_key on {updated} documents")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill analysis.category_key on existing feedback")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per bulk_write")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Recompute existing keys too (after changing CATEGORY_ALIASES)"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(batch_size=args.batch_size, recompute=args.all))
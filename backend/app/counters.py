@@ -0,0 +1,405 @@
+"""
+Materialized metrics counters maintained on write.
+
+The `metrics_counters` collection holds small counter documents updated
+with atomic $inc whenever a feedback's analysis or overrides change, so the
+accuracy and urgency endpoints read a handful of documents instead of
+scanning the feedbacks collection:
+
+- "global":              processed, overridden, urgency.{low,medium,high}
+- "category:<name>":     processed, overridden for one category
+
+Per-day sentiment counts live in the sentiment_daily rollup (see
+app.sentiment_rollup), which record_feedback_change keeps up to date too.
+
+Counter changes are derived by diffing the before/after state of a
+feedback document (see counter_deltas), so every transition - analysis
+completed, category overridden, first override recorded - is handled the
+same way. Drift (e.g. from writes that bypass the service layer) is
+repaired with:
+
+    python -m app.counters            # report drift
+    python -m app.counters --repair   # correct counters from feedbacks
+
+A repair also writes the "built:counters" marker document. Until it
+exists, the endpoints aggregate feedbacks instead of trusting counters
+that only hold deltas since deploy; the API builds the counters in the
+background at startup when the marker is missing (ensure_counters_built).
+
+Repairs take an exclusive build claim (see app.build_claims), so replicas
+starting together build once. A repair applies its corrections with $inc
+rather than overwriting counters, so deltas written meanwhile are kept.
+Feedback written while the recount aggregation runs may still be counted
+once too few or too many times; repeat the repair at a quiet time to
+settle such drift.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from .build_claims import build_claim
+from .db import (
+    connect_to_mongo,
+    close_mongo_connection,
+    get_database,
+    get_feedbacks_collection,
+    get_metrics_counters_collection,
+)
+from .metrics import build_accuracy_metrics, compute_accuracy, compute_urgency_breakdown, invalidate_metrics_cache
+from .metrics_updates import metrics_updates
+from .realtime import manager
+from .schemas import AccuracyMetrics, UrgencyBreakdown
+from .sentiment_rollup import SentimentDeltas, apply_sentiment_deltas, sentiment_deltas
+from .utils import setup_logging
+from .versions import record_writes
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_ID = "global"
+# Written once the counters have been built from feedbacks (kind "marker")
+BUILT_ID = "built:counters"
+URGENCY_LEVELS = ("low", "medium", "high")
+
+CounterDeltas = Dict[str, Dict[str, int]]
+
+
+def _counter_meta(counter_id: str) -> Dict[str, Any]:
+    """Descriptive fields stored alongside a counter document."""
+    if counter_id.startswith("category:"):
+        return {"kind": "category", "name": counter_id[len("category:"):]}
+    return {"kind": "global"}
+
+
+def _contribute(doc: dict, sign: int, deltas: CounterDeltas):
+    """Add (sign=1) or remove (sign=-1) one feedback document's counts."""
+    analysis = doc.get("analysis") or {}
+
+    # Processed by AI (agent_success is not None), overridden if any overrides
+    if doc.get("agent_success") is not None:
+        overridden = sign if doc.get("overrides") else 0
+        deltas[GLOBAL_ID]["processed"] += sign
+        deltas[GLOBAL_ID]["overridden"] += overridden
+
+        category = analysis.get("category")
+        if category:
+            deltas[f"category:{category}"]["processed"] += sign
+            deltas[f"category:{category}"]["overridden"] += overridden
+
+    urgency = analysis.get("urgency_level")
+    if urgency in URGENCY_LEVELS:
+        deltas[GLOBAL_ID][f"urgency.{urgency}"] += sign
+
+
+def counter_deltas(before: Optional[dict], after: Optional[dict]) -> CounterDeltas:
+    """
+    Compute the $inc deltas for a feedback document changing from before to after.
+
+    Either side may be None (document created / deleted).
+    """
+    deltas: CounterDeltas = defaultdict(lambda: defaultdict(int))
+
+    if before is not None:
+        _contribute(before, -1, deltas)
+    if after is not None:
+        _contribute(after, 1, deltas)
+
+    return {
+        counter_id: {field: value for field, value in fields.items() if value}
+        for counter_id, fields in deltas.items()
+        if any(fields.values())
+    }
+
+
+async def apply_counter_deltas(deltas: CounterDeltas):
+    """
+    Apply counter deltas with a single bulk_write of upserting $inc updates.
+
+    Failures are logged rather than raised so a counter problem never fails
+    the write that triggered it; run a reconcile to repair drift.
+    """
+    if not deltas or get_database() is None:
+        return
+
+    try:
+        await get_metrics_counters_collection().bulk_write(_counter_operations(deltas), ordered=False)
+    except PyMongoError as e:
+        logger.error(f"Failed to update metrics counters: {e}")
+
+
+def _counter_operations(deltas: CounterDeltas) -> List[UpdateOne]:
+    """Upserting $inc updates applying deltas to counter documents."""
+    return [
+        UpdateOne(
+            {"_id": counter_id},
+            {"$inc": fields, "$setOnInsert": _counter_meta(counter_id)},
+            upsert=True,
+        )
+        for counter_id, fields in deltas.items()
+    ]
+
+
+async def record_feedback_change(before: Optional[dict], after: Optional[dict]):
+    """
+    Update counters and the sentiment rollup for a feedback document changing
+    from before to after, and queue the deltas for the next metrics:update push.
+    """
+    deltas = counter_deltas(before, after)
+    daily = sentiment_deltas(before, after)
+    await apply_counter_deltas(deltas)
+    await apply_sentiment_deltas(daily)
+    _record_metrics_writes(deltas, daily)
+    metrics_updates.add(counter_deltas=deltas, sentiment_deltas=daily)
+
+
+def _record_metrics_writes(deltas: CounterDeltas, daily: SentimentDeltas):
+    """Bump the write versions of the metrics collections that changed."""
+    changed = [name for name, changes in (("metrics_counters", deltas), ("sentiment_daily", daily)) if changes]
+    if changed:
+        record_writes(*changed)
+
+
+def _merge_deltas(all_deltas: List[CounterDeltas]) -> CounterDeltas:
+    """Sum several delta sets, dropping fields that cancel out."""
+    merged: CounterDeltas = defaultdict(lambda: defaultdict(int))
+    for deltas in all_deltas:
+        for key, fields in deltas.items():
+            for field, value in fields.items():
+                merged[key][field] += value
+
+    return {
+        key: {field: value for field, value in fields.items() if value}
+        for key, fields in merged.items()
+        if any(fields.values())
+    }
+
+
+async def record_feedback_changes(changes: List[Tuple[Optional[dict], Optional[dict]]]):
+    """
+    Update counters and the sentiment rollup for many document changes at once.
+
+    Deltas are summed first, so each collection gets a single bulk_write.
+    """
+    deltas = _merge_deltas([counter_deltas(before, after) for before, after in changes])
+    daily = _merge_deltas([sentiment_deltas(before, after) for before, after in changes])
+    await apply_counter_deltas(deltas)
+    await apply_sentiment_deltas(daily)
+    _record_metrics_writes(deltas, daily)
+    metrics_updates.add(counter_deltas=deltas, sentiment_deltas=daily)
+
+
+async def read_accuracy() -> AccuracyMetrics:
+    """
+    Read accuracy metrics from counters.
+
+    Falls back to the aggregation (compute_accuracy) until the counters have
+    been built (BUILT_ID marker), since before that they only hold deltas
+    applied since deploy.
+    """
+    collection = get_metrics_counters_collection()
+    docs = await collection.find({"kind": {"$in": ["global", "category", "marker"]}}).to_list(length=None)
+
+    if not any(doc["_id"] == BUILT_ID for doc in docs):
+        logger.warning("Metrics counters not built, computing accuracy from feedbacks (run python -m app.counters --repair)")
+        return await compute_accuracy()
+
+    global_doc = next((doc for doc in docs if doc["_id"] == GLOBAL_ID), {})
+
+    # Uncategorized processed feedback counts toward the overall totals only
+    categorized_processed = 0
+    categorized_overridden = 0
+    groups: List[Dict[str, Any]] = []
+    for doc in docs:
+        if doc.get("kind") == "category" and doc.get("processed", 0) > 0:
+            groups.append({"_id": doc["name"], "processed": doc["processed"], "overridden": doc.get("overridden", 0)})
+            categorized_processed += doc["processed"]
+            categorized_overridden += doc.get("overridden", 0)
+
+    groups.append({
+        "_id": None,
+        "processed": global_doc.get("processed", 0) - categorized_processed,
+        "overridden": global_doc.get("overridden", 0) - categorized_overridden,
+    })
+
+    return build_accuracy_metrics(groups)
+
+
+async def read_urgency_breakdown() -> UrgencyBreakdown:
+    """
+    Read the urgency breakdown from the global counter document.
+
+    Falls back to compute_urgency_breakdown until the counters have been built.
+    """
+    cursor = get_metrics_counters_collection().find({"_id": {"$in": [GLOBAL_ID, BUILT_ID]}})
+    docs = {doc["_id"]: doc for doc in await cursor.to_list(length=None)}
+    if BUILT_ID not in docs:
+        logger.warning("Metrics counters not built, computing urgency breakdown from feedbacks")
+        return await compute_urgency_breakdown()
+
+    global_doc = docs.get(GLOBAL_ID, {})
+
+    urgency = global_doc.get("urgency", {})
+    counts = {level: urgency.get(level, 0) for level in URGENCY_LEVELS}
+    return UrgencyBreakdown(**counts, total=sum(counts.values()))
+
+
+async def compute_counters_from_source() -> Dict[str, Dict[str, int]]:
+    """Recompute every counter document from the feedbacks collection."""
+    collection = get_feedbacks_collection()
+    counters: CounterDeltas = defaultdict(lambda: defaultdict(int))
+
+    accuracy_pipeline = [
+        {"$match": {"agent_success": {"$ne": None}}},
+        {
+            "$group": {
+                "_id": "$analysis.category",
+                "processed": {"$sum": 1},
+                "overridden": {
+                    "$sum": {
+                        "$cond": [{"$gt": [{"$size": {"$ifNull": ["$overrides", []]}}, 0]}, 1, 0]
+                    }
+                },
+            }
+        },
+    ]
+    async for group in collection.aggregate(accuracy_pipeline):
+        counters[GLOBAL_ID]["processed"] += group["processed"]
+        counters[GLOBAL_ID]["overridden"] += group["overridden"]
+        if group["_id"]:
+            counters[f"category:{group['_id']}"]["processed"] += group["processed"]
+            counters[f"category:{group['_id']}"]["overridden"] += group["overridden"]
+
+    urgency_pipeline = [
+        {"$match": {"analysis.urgency_level": {"$in": list(URGENCY_LEVELS)}}},
+        {"$group": {"_id": "$analysis.urgency_level", "count": {"$sum": 1}}},
+    ]
+    async for group in collection.aggregate(urgency_pipeline):
+        counters[GLOBAL_ID][f"urgency.{group['_id']}"] += group["count"]
+
+    return {counter_id: dict(fields) for counter_id, fields in counters.items()}
+
+
+def _stored_fields(doc: dict) -> Dict[str, int]:
+    """Flatten a stored counter document into dotted counter fields."""
+    fields = {}
+    for key, value in doc.items():
+        if key in ("_id", "kind", "name"):
+            continue
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                fields[f"{key}.{sub_key}"] = sub_value
+        else:
+            fields[key] = value
+    return fields
+
+
+async def reconcile_counters(repair: bool = False) -> Dict[str, Any]:
+    """
+    Compare stored counters with values recomputed from feedbacks.
+
+    Args:
+        repair: Correct drifted counters (by $inc, keeping concurrent
+            deltas) and mark the counters as built. Nothing is checked if
+            another process holds the build claim ("claimed" is False).
+
+    Returns:
+        Summary with the number of counters checked and the drifted ones
+    """
+    if not repair:
+        return await _reconcile(repair=False)
+
+    async with build_claim("counters") as claimed:
+        if not claimed:
+            logger.warning("Metrics counters are being built by another process, not repairing")
+            return {"checked": 0, "drifted": 0, "drift": {}, "repaired": False, "claimed": False}
+        return await _reconcile(repair=True)
+
+
+async def _reconcile(repair: bool) -> Dict[str, Any]:
+    expected = await compute_counters_from_source()
+    collection = get_metrics_counters_collection()
+    # Read right after the recount, so deltas written since are part of the stored side
+    stored = {doc["_id"]: _stored_fields(doc) async for doc in collection.find({"kind": {"$ne": "marker"}})}
+
+    drift = {}
+    corrections: CounterDeltas = {}
+    for counter_id in set(expected) | set(stored):
+        want = {field: value for field, value in expected.get(counter_id, {}).items() if value}
+        have = {field: value for field, value in stored.get(counter_id, {}).items() if value}
+        if want != have:
+            drift[counter_id] = {"expected": want, "stored": have}
+            corrections[counter_id] = {
+                field: want.get(field, 0) - have.get(field, 0)
+                for field in set(want) | set(have)
+                if want.get(field, 0) != have.get(field, 0)
+            }
+
+    if repair:
+        if corrections:
+            await collection.bulk_write(_counter_operations(corrections), ordered=False)
+            logger.info(f"Repaired {len(corrections)} metrics counters")
+        await collection.replace_one(
+            {"_id": BUILT_ID}, {"kind": "marker", "built_at": datetime.utcnow()}, upsert=True
+        )
+        record_writes("metrics_counters")
+
+    return {
+        "checked": len(set(expected) | set(stored)),
+        "drifted": len(drift),
+        "drift": drift,
+        "repaired": repair,
+        "claimed": repair,
+    }
+
+
+async def ensure_counters_built() -> bool:
+    """
+    Build the counters from feedbacks unless the BUILT_ID marker exists
+    (startup of an existing deployment) or another process is building them.
+
+    Returns:
+        True if the counters were built
+    """
+    if await get_metrics_counters_collection().find_one({"_id": BUILT_ID}):
+        return False
+    logger.info("Metrics counters not built yet, building them from feedbacks")
+    result = await reconcile_counters(repair=True)
+    if not result["repaired"]:
+        return False
+    invalidate_metrics_cache()
+    logger.info(f"Built metrics counters ({result['drifted']} corrected)")
+    return True
+
+
+async def main(repair: bool = False):
+    setup_logging()
+    await connect_to_mongo()
+    try:
+        result = await reconcile_counters(repair=repair)
+        if repair and not result["claimed"]:
+            print("Another process is building the counters, try again later")
+            return
+        for counter_id, diff in sorted(result["drift"].items()):
+            print(f"{counter_id}: stored={diff['stored']} expected={diff['expected']}")
+        action = "repaired" if result["repaired"] else "found"
+        print(f"Checked {result['checked']} counters, {action} {result['drifted']} with drift")
+    finally:
+        # Deliver the write-version bump so API processes stop serving cached metrics
+        await manager.bus.stop()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reconcile materialized metrics counters")
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Correct drifted counters from the feedbacks collection"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(repair=args.repair))
@@ -43,3 +43,23 @@ def get_database():
 def get_feedbacks_collection():
     """Get feedbacks collection."""
     return database.feedbacks
+
+
+def get_analysis_cache_collection():
+    """Get analysis cache collection."""
+    return database.analysis_cache
+
+
+def get_metrics_counters_collection():
+    """Get materialized metrics counters collection."""
+    return database.metrics_counters
+
+
+def get_sentiment_daily_collection():
+    """Get daily sentiment rollup collection."""
+    return database.sentiment_daily
+
+
+def get_realtime_events_collection():
+    """Get realtime events collection (cross-process WebSocket fan-out)."""
+    return database.realtime_events
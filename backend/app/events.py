@@ -0,0 +1,216 @@
+"""
+Event bus behind the realtime WebSocket fan-out.
+
+Each process's ConnectionManager only knows its own WebSocket clients. To
+let every client see every event when the API runs as several uvicorn
+workers or replicas (and when analysis runs in standalone workers), events
+are published to a bus and every process delivers what it receives from the
+bus to its local clients. Publishers never deliver directly, so each client
+receives each event exactly once.
+
+Backends (EVENT_BUS_BACKEND):
+- "memory": delivers within the process. The default, and what tests use;
+  only correct for a single API process with an embedded worker.
+- "mongo": publishers insert events into the realtime_events collection and
+  every API process tails it with a change stream, resuming from its last
+  token after errors (or from now, logging the gap, if the token can no
+  longer be resumed from). Requires MongoDB running as a replica set (a
+  single-node replica set is enough).
+"""
+import os
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from .db import get_realtime_events_collection
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUS_BACKEND = os.getenv("EVENT_BUS_BACKEND", "memory").lower()
+
+# Mongo backend: local publish queue bound, and how long events are kept
+EVENT_BUS_QUEUE_MAX = int(os.getenv("EVENT_BUS_QUEUE_MAX", "10000"))
+EVENT_BUS_TTL_SECONDS = int(os.getenv("EVENT_BUS_TTL_SECONDS", "3600"))
+EVENT_BUS_RETRY_SECONDS = float(os.getenv("EVENT_BUS_RETRY_SECONDS", "2"))
+
+# InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost: the stream cannot be resumed
+NON_RESUMABLE_ERROR_CODES = {260, 280, 286}
+
+EventHandler = Callable[[Dict[str, Any]], None]
+
+
+class EventBus(ABC):
+    """Publish events to every process; deliver received events to one handler."""
+
+    name = "base"
+
+    def __init__(self):
+        self._handler: Optional[EventHandler] = None
+        self._stats = {"published": 0, "received": 0, "dropped": 0}
+
+    def set_handler(self, handler: EventHandler):
+        """Set the callback that receives every event (once per process)."""
+        self._handler = handler
+
+    @abstractmethod
+    def publish(self, event: Dict[str, Any]) -> bool:
+        """Publish an event without blocking. Returns False if it was dropped."""
+
+    async def start(self):
+        """Start receiving events from other processes."""
+
+    async def stop(self):
+        """Stop receiving and flush anything still being published."""
+
+    def _deliver(self, event: Dict[str, Any]):
+        self._stats["received"] += 1
+        if self._handler is None:
+            return
+        try:
+            self._handler(event)
+        except Exception as e:
+            logger.error(f"Error delivering {event.get('type')} event: {e}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend name and event counters (this process only)."""
+        return {"backend": self.name, **self._stats}
+
+
+class InMemoryEventBus(EventBus):
+    """Delivers synchronously within the current process."""
+
+    name = "memory"
+
+    def publish(self, event: Dict[str, Any]) -> bool:
+        self._stats["published"] += 1
+        self._deliver(event)
+        return True
+
+
+class MongoChangeStreamEventBus(EventBus):
+    """
+    Fans events out across processes through a MongoDB change stream.
+
+    publish() puts the event on a bounded local queue; a background task
+    inserts queued events in batches, so callers never wait on MongoDB.
+    start() tails inserts into realtime_events. Only processes that call
+    start() receive events, so standalone workers can publish without
+    watching.
+    """
+
+    name = "mongo"
+
+    def __init__(self, max_queue: int = EVENT_BUS_QUEUE_MAX, retry_seconds: float = EVENT_BUS_RETRY_SECONDS):
+        super().__init__()
+        self.max_queue = max_queue
+        self.retry_seconds = retry_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._publisher: Optional[asyncio.Task] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._resume_token: Optional[Dict[str, Any]] = None
+        self.watching = asyncio.Event()
+
+    def _ensure_publisher(self):
+        """Start the publish task, or restart it on the same queue if it died."""
+        if self._publisher is not None and not self._publisher.done():
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        elif self._publisher is not None and not self._publisher.cancelled():
+            logger.error(
+                f"Event bus publisher stopped ({self._publisher.exception()!r}), "
+                f"restarting with {self._queue.qsize()} queued events"
+            )
+        self._publisher = asyncio.create_task(self._publish_loop())
+
+    def publish(self, event: Dict[str, Any]) -> bool:
+        self._ensure_publisher()
+        try:
+            self._queue.put_nowait({"created_at": datetime.utcnow(), "event": event})
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            logger.error(f"Event bus queue full ({self.max_queue}), dropping {event.get('type')} event")
+            return False
+        return True
+
+    async def _publish_loop(self):
+        """Insert queued events in order, batching whatever has accumulated."""
+        while True:
+            docs: List[Dict[str, Any]] = [await self._queue.get()]
+            while not self._queue.empty() and len(docs) < 100:
+                docs.append(self._queue.get_nowait())
+            try:
+                await get_realtime_events_collection().insert_many(docs, ordered=True)
+                self._stats["published"] += len(docs)
+            except PyMongoError as e:
+                self._stats["dropped"] += len(docs)
+                logger.error(f"Failed to publish {len(docs)} realtime events: {e}")
+            finally:
+                for _ in docs:
+                    self._queue.task_done()
+
+    async def start(self):
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch_loop())
+
+    async def _watch_loop(self):
+        """Deliver inserted events, reopening the change stream after errors."""
+        while True:
+            try:
+                async with get_realtime_events_collection().watch(
+                    [{"$match": {"operationType": "insert"}}],
+                    resume_after=self._resume_token,
+                ) as stream:
+                    self.watching.set()
+                    logger.info("Event bus change stream open")
+                    async for change in stream:
+                        self._resume_token = stream.resume_token
+                        self._deliver(change["fullDocument"]["event"])
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                self.watching.clear()
+                if self._resume_token is None or e.code not in NON_RESUMABLE_ERROR_CODES:
+                    logger.error(f"Event bus change stream failed, retrying in {self.retry_seconds}s: {e}")
+                    await asyncio.sleep(self.retry_seconds)
+                    continue
+                # e.g. the oplog rolled over while disconnected: start again from now
+                logger.error(f"Event bus change stream cannot resume, events since the last one received were missed: {e}")
+                self._resume_token = None
+            except PyMongoError as e:
+                self.watching.clear()
+                logger.error(f"Event bus change stream failed, retrying in {self.retry_seconds}s: {e}")
+                await asyncio.sleep(self.retry_seconds)
+
+    async def stop(self, timeout: float = 5.0):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+            self.watching.clear()
+
+        if self._publisher is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Event bus queue not flushed within {timeout}s, {self._queue.qsize()} events dropped")
+            self._publisher.cancel()
+            try:
+                await self._publisher
+            except asyncio.CancelledError:
+                pass
+            self._publisher = None
+
+
+def create_event_bus(backend: str = EVENT_BUS_BACKEND) -> EventBus:
+    """Build the configured event bus backend."""
+    if backend == "mongo":
+        return MongoChangeStreamEventBus()
+    if backend != "memory":
+        logger.warning(f"Unknown EVENT_BUS_BACKEND '{backend}', using the in-memory bus")
+    return InMemoryEventBus()
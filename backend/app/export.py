@@ -0,0 +1,99 @@
+"""
+Streaming feedback export.
+
+GET /api/feedback/export writes the whole filtered corpus as NDJSON or CSV.
+Documents come from a MongoDB cursor (see services.iter_feedback_documents)
+and are encoded into chunks of roughly EXPORT_CHUNK_BYTES, optionally
+gzip-compressed on the fly, so server memory stays flat whatever the
+result size.
+"""
+import io
+import os
+import csv
+import zlib
+from typing import AsyncIterator, List
+from pydantic_core import to_json
+from .models import feedback_doc_to_response
+
+# Documents fetched per MongoDB getMore
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Encoded bytes buffered before a chunk is sent to the client
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", str(64 * 1024)))
+
+CSV_COLUMNS = [
+    "id",
+    "created_at",
+    "customer_name",
+    "email",
+    "message",
+    "analysis_status",
+    "agent_success",
+    "sentiment",
+    "urgency_level",
+    "category",
+    "summary",
+    "recommended_action",
+    "analysis_error",
+    "override_count",
+]
+
+
+def csv_row(doc: dict) -> List:
+    """Flatten a feedback document into CSV_COLUMNS order."""
+    analysis = doc.get("analysis") or {}
+    created_at = doc.get("created_at")
+    return [
+        str(doc["_id"]),
+        created_at.isoformat() if created_at else "",
+        doc.get("customer_name"),
+        doc.get("email"),
+        doc.get("message"),
+        doc.get("analysis_status"),
+        doc.get("agent_success"),
+        analysis.get("sentiment"),
+        analysis.get("urgency_level"),
+        analysis.get("category"),
+        analysis.get("summary"),
+        analysis.get("recommended_action"),
+        doc.get("analysis_error"),
+        len(doc.get("overrides") or []),
+    ]
+
+
+async def ndjson_chunks(docs: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Encode documents as newline-delimited JSON (one FeedbackResponse per line)."""
+    buffer = bytearray()
+    async for doc in docs:
+        buffer += to_json(feedback_doc_to_response(doc))
+        buffer += b"\n"
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def csv_chunks(docs: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Encode documents as CSV with a header row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    async for doc in docs:
+        writer.writerow(csv_row(doc))
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip a byte stream incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,298 @@
+"""
+Declarative MongoDB index registry.
+
+INDEXES lists every index the application relies on, matched to the query
+shapes in services.py, metrics.py and the analysis worker. ensure_indexes()
+creates them idempotently at startup; explain_query_shapes() runs explain()
+for each entry in QUERY_SHAPES and flags plans that fall back to COLLSCAN.
+
+Run from the command line with:
+    python -m app.indexes            # ensure indexes, then report plans
+    python -m app.indexes --explain  # report plans only
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+from .db import connect_to_mongo, close_mongo_connection, get_database
+from .analysis_cache import ANALYSIS_CACHE_DB_TTL_SECONDS
+from .events import EVENT_BUS_TTL_SECONDS
+from .utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """An index to maintain on a collection."""
+    collection: str
+    keys: List[tuple]
+    name: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """
+    A representative query issued by the application, for explain().
+
+    kind is "find" (filter + sort), "count" (filter) or "aggregate" (pipeline).
+    """
+    name: str
+    collection: str
+    kind: str
+    filter: Dict[str, Any] = field(default_factory=dict)
+    sort: Optional[List[tuple]] = None
+    pipeline: Optional[List[Dict[str, Any]]] = None
+
+
+INDEXES: List[IndexSpec] = [
+    # GET /api/feedback keyset ordering (created_at, _id); sentiment trend date range
+    IndexSpec("feedbacks", [("created_at", -1), ("_id", -1)], "created_at_id_desc"),
+    # GET /api/feedback filters (equality + keyset sort), urgency breakdown counts
+    IndexSpec(
+        "feedbacks",
+        [("analysis.urgency_level", 1), ("created_at", -1), ("_id", -1)],
+        "urgency_created_at_id",
+    ),
+    IndexSpec(
+        "feedbacks",
+        [("analysis.sentiment", 1), ("created_at", -1), ("_id", -1)],
+        "sentiment_created_at_id",
+    ),
+    # Category filter on the normalized key (see app.categories), exact or prefix
+    IndexSpec(
+        "feedbacks",
+        [("analysis.category_key", 1), ("created_at", -1), ("_id", -1)],
+        "category_key_created_at_id",
+    ),
+    # GET /api/feedback/search (one text index per collection)
+    IndexSpec(
+        "feedbacks",
+        [("message", "text"), ("analysis.summary", "text"), ("analysis.recommended_action", "text")],
+        "feedback_text",
+        {"weights": {"message": 1, "analysis.summary": 2, "analysis.recommended_action": 1}},
+    ),
+    # Accuracy metrics: processed counts overall and per category
+    IndexSpec("feedbacks", [("agent_success", 1), ("analysis.category", 1)], "agent_success_category"),
+    # GET /api/feedback/changes keyset on (updated_at, _id)
+    IndexSpec("feedbacks", [("updated_at", 1), ("_id", 1)], "updated_at_id"),
+    # Analysis worker leasing (see app.worker.lease_next)
+    IndexSpec("feedbacks", [("analysis_status", 1), ("lease_expires_at", 1)], "analysis_queue"),
+    # Materialized metrics counters (see app.counters.read_accuracy)
+    IndexSpec("metrics_counters", [("kind", 1)], "metrics_counters_kind"),
+    # Analysis cache expiry
+    IndexSpec(
+        "analysis_cache",
+        [("created_at", 1)],
+        "analysis_cache_ttl",
+        {"expireAfterSeconds": ANALYSIS_CACHE_DB_TTL_SECONDS},
+    ),
+    # Realtime event bus expiry (see app.events; only used by the mongo backend)
+    IndexSpec(
+        "realtime_events",
+        [("created_at", 1)],
+        "realtime_events_ttl",
+        {"expireAfterSeconds": EVENT_BUS_TTL_SECONDS},
+    ),
+]
+
+
+def _sample_time_range(days: int = 7) -> Dict[str, datetime]:
+    end = datetime.utcnow()
+    return {"$gte": end - timedelta(days=days), "$lte": end}
+
+
+LIST_SORT = [("created_at", -1), ("_id", -1)]
+
+QUERY_SHAPES: List[QueryShape] = [
+    QueryShape("list_recent", "feedbacks", "find", sort=LIST_SORT),
+    QueryShape(
+        "list_keyset_page", "feedbacks", "find",
+        filter={"$or": [
+            {"created_at": {"$lt": datetime.utcnow()}},
+            {"created_at": datetime.utcnow(), "_id": {"$lt": ObjectId()}},
+        ]},
+        sort=LIST_SORT,
+    ),
+    QueryShape(
+        "list_by_urgency", "feedbacks", "find",
+        filter={"analysis.urgency_level": "high"}, sort=LIST_SORT,
+    ),
+    QueryShape(
+        "list_by_sentiment", "feedbacks", "find",
+        filter={"analysis.sentiment": "negative"}, sort=LIST_SORT,
+    ),
+    QueryShape(
+        "list_by_category", "feedbacks", "find",
+        filter={"analysis.category_key": "billing"}, sort=LIST_SORT,
+    ),
+    QueryShape(
+        "list_by_category_prefix", "feedbacks", "find",
+        filter={"analysis.category_key": {"$regex": "^bill"}}, sort=LIST_SORT,
+    ),
+    QueryShape(
+        "export_by_urgency_date_range", "feedbacks", "find",
+        filter={"analysis.urgency_level": "high", "created_at": _sample_time_range()}, sort=LIST_SORT,
+    ),
+    QueryShape(
+        "changes_since_watermark", "feedbacks", "find",
+        filter={"$or": [
+            {"updated_at": {"$gt": datetime.utcnow()}},
+            {"updated_at": datetime.utcnow(), "_id": {"$gt": ObjectId()}},
+        ]},
+        sort=[("updated_at", 1), ("_id", 1)],
+    ),
+    QueryShape(
+        "search_text", "feedbacks", "aggregate",
+        pipeline=[
+            {"$match": {"$text": {"$search": "refund"}, "analysis.urgency_level": "high"}},
+            {"$addFields": {"_score": {"$meta": "textScore"}}},
+            {"$sort": {"_score": -1, "_id": -1}},
+            {"$limit": 50},
+        ],
+    ),
+    QueryShape(
+        "accuracy_by_category", "feedbacks", "aggregate",
+        pipeline=[
+            {"$match": {"agent_success": {"$ne": None}}},
+            {"$group": {"_id": "$analysis.category", "processed": {"$sum": 1}}},
+        ],
+    ),
+    QueryShape("count_by_urgency", "feedbacks", "count", filter={"analysis.urgency_level": "high"}),
+    QueryShape(
+        "sentiment_trend", "feedbacks", "aggregate",
+        pipeline=[
+            {"$match": {"created_at": _sample_time_range(), "analysis.sentiment": {"$exists": True}}},
+            {"$group": {"_id": "$analysis.sentiment", "count": {"$sum": 1}}},
+        ],
+    ),
+    QueryShape(
+        "sentiment_trend_rollup", "sentiment_daily", "find",
+        filter={"_id": {"$gte": (datetime.utcnow() - timedelta(days=365)).strftime("%Y-%m-%d")}},
+        sort=[("_id", 1)],
+    ),
+    QueryShape(
+        "analysis_queue_lease", "feedbacks", "find",
+        filter={"analysis_status": {"$in": ["pending", "processing"]}, "lease_expires_at": {"$lte": datetime.utcnow()}},
+        sort=[("lease_expires_at", 1)],
+    ),
+]
+
+
+async def ensure_indexes() -> List[str]:
+    """
+    Create every registered index (idempotent).
+
+    Existing indexes with matching keys and options are left alone. An index
+    whose options changed (e.g. a new TTL) is logged and skipped; drop it to
+    have it rebuilt.
+
+    Returns:
+        Names of indexes that are in place
+    """
+    database = get_database()
+    ensured = []
+
+    for spec in INDEXES:
+        try:
+            await database[spec.collection].create_index(spec.keys, name=spec.name, **spec.options)
+            ensured.append(spec.name)
+        except OperationFailure as e:
+            logger.warning(f"Could not ensure index {spec.collection}.{spec.name}: {e}")
+
+    logger.info(f"Ensured {len(ensured)}/{len(INDEXES)} indexes")
+    return ensured
+
+
+def _collect_plan(node: Any, stages: List[str], indexes: List[str], in_plan: bool = False):
+    """Walk an explain() document collecting winning-plan stages and index names."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ("rejectedPlans", "allPlansExecution"):
+                continue
+            inside = in_plan or key == "winningPlan"
+            if inside and key == "stage" and isinstance(value, str):
+                stages.append(value)
+            elif inside and key == "indexName" and isinstance(value, str):
+                indexes.append(value)
+            else:
+                _collect_plan(value, stages, indexes, inside)
+    elif isinstance(node, list):
+        for item in node:
+            _collect_plan(item, stages, indexes, in_plan)
+
+
+async def explain_query_shape(shape: QueryShape) -> Dict[str, Any]:
+    """Run explain() for one query shape and summarize its winning plan."""
+    database = get_database()
+
+    if shape.kind == "find":
+        command: Dict[str, Any] = {"find": shape.collection, "filter": shape.filter, "limit": 50}
+        if shape.sort:
+            command["sort"] = dict(shape.sort)
+    elif shape.kind == "count":
+        command = {"count": shape.collection, "query": shape.filter}
+    else:
+        command = {"aggregate": shape.collection, "pipeline": shape.pipeline, "cursor": {}}
+
+    explain = await database.command("explain", command, verbosity="queryPlanner")
+
+    stages: List[str] = []
+    indexes: List[str] = []
+    _collect_plan(explain, stages, indexes)
+
+    return {
+        "name": shape.name,
+        "collection": shape.collection,
+        "kind": shape.kind,
+        "stages": stages,
+        "indexes_used": sorted(set(indexes)),
+        "collscan": "COLLSCAN" in stages,
+    }
+
+
+async def explain_query_shapes() -> List[Dict[str, Any]]:
+    """Explain every registered query shape, logging any COLLSCAN."""
+    reports = []
+    for shape in QUERY_SHAPES:
+        try:
+            report = await explain_query_shape(shape)
+        except OperationFailure as e:
+            logger.error(f"explain() failed for query shape {shape.name}: {e}")
+            continue
+        if report["collscan"]:
+            logger.warning(f"Query shape {shape.name} uses a COLLSCAN")
+        reports.append(report)
+    return reports
+
+
+async def main(explain_only: bool = False):
+    setup_logging()
+    await connect_to_mongo()
+    try:
+        if not explain_only:
+            await ensure_indexes()
+        for report in await explain_query_shapes():
+            flag = "COLLSCAN" if report["collscan"] else "ok"
+            indexes = ", ".join(report["indexes_used"]) or "-"
+            print(f"{flag:9} {report['name']:24} {' > '.join(report['stages']):40} indexes: {indexes}")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ensure MongoDB indexes and report query plans")
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Only report explain() plans, do not create indexes"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(explain_only=args.explain))
@@ -1,10 +1,17 @@
 """
 Phase 2: Slack webhook integration.
 Send alerts for high urgency feedback and weekly summary reports.
+
+Messages are queued and delivered by a background task over a shared,
+pooled HTTP client, so a slow webhook never blocks the event loop.
 """
 import os
+import time
+import asyncio
 import logging
-import requests
+import httpx
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from .schemas import FeedbackDB, AccuracyMetrics, UrgencyBreakdown
 
@@ -12,16 +19,209 @@ logger = logging.getLogger(__name__)
 
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 
+# Delivery configuration
+SLACK_QUEUE_MAX = int(os.getenv("SLACK_QUEUE_MAX", "1000"))
+SLACK_TIMEOUT_SECONDS = float(os.getenv("SLACK_TIMEOUT_SECONDS", "10"))
+SLACK_MAX_RETRIES = int(os.getenv("SLACK_MAX_RETRIES", "5"))
+SLACK_BACKOFF_BASE_SECONDS = float(os.getenv("SLACK_BACKOFF_BASE_SECONDS", "1"))
+SLACK_BACKOFF_MAX_SECONDS = float(os.getenv("SLACK_BACKOFF_MAX_SECONDS", "60"))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class SlackNotifier:
+    """
+    Bounded outbound queue of Slack webhook messages.
+
+    A single background task drains the queue over a pooled httpx client,
+    retrying 429 and 5xx responses (and transport errors) with exponential
+    backoff that honors Retry-After. When the queue is full new messages are
+    dropped rather than blocking the caller.
+    """
+
+    def __init__(
+        self,
+        webhook_url: Optional[str] = None,
+        max_queue: int = SLACK_QUEUE_MAX,
+        max_retries: int = SLACK_MAX_RETRIES,
+        backoff_base: float = SLACK_BACKOFF_BASE_SECONDS,
+        backoff_max: float = SLACK_BACKOFF_MAX_SECONDS,
+        timeout: float = SLACK_TIMEOUT_SECONDS,
+    ):
+        self.webhook_url = webhook_url
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "enqueued": 0,
+            "delivered": 0,
+            "failed": 0,
+            "dropped": 0,
+            "retries": 0,
+            "total_latency_ms": 0.0,
+            "last_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        }
+
+    def _ensure_started(self):
+        """Start the queue, HTTP client and drain task on the running loop."""
+        if self._task is not None and not self._task.done():
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+        self._task = asyncio.create_task(self._drain())
+
+    def enqueue(self, payload: Dict[str, Any], description: str = "message") -> bool:
+        """
+        Queue a webhook payload for delivery.
+
+        Must be called from a running event loop.
+
+        Returns:
+            True if queued, False if not configured or the queue is full
+        """
+        if not self.webhook_url:
+            logger.warning(f"SLACK_WEBHOOK_URL not configured, skipping {description}")
+            return False
+
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait((payload, description, time.perf_counter()))
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            logger.error(f"Slack queue full ({self.max_queue}), dropping {description}")
+            return False
+
+        self._stats["enqueued"] += 1
+        return True
+
+    async def _drain(self):
+        """Deliver queued messages until a stop sentinel is received."""
+        while True:
+            item = await self._queue.get()
+            try:
+                if item is None:
+                    return
+                payload, description, enqueued_at = item
+                if await self._deliver(payload, description):
+                    latency_ms = (time.perf_counter() - enqueued_at) * 1000
+                    self._stats["delivered"] += 1
+                    self._stats["total_latency_ms"] += latency_ms
+                    self._stats["last_latency_ms"] = latency_ms
+                    self._stats["max_latency_ms"] = max(self._stats["max_latency_ms"], latency_ms)
+                else:
+                    self._stats["failed"] += 1
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.error(f"Unexpected error delivering Slack message: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, payload: Dict[str, Any], description: str) -> bool:
+        """POST one payload, retrying transient failures with backoff."""
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = await self._client.post(self.webhook_url, json=payload)
+                if response.is_success:
+                    logger.info(f"Slack {description} delivered")
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    logger.error(f"Slack rejected {description}: HTTP {response.status_code}")
+                    return False
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                reason = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                reason = str(e) or e.__class__.__name__
+
+            if attempt == self.max_retries:
+                logger.error(f"Failed to send Slack {description} after {attempt + 1} attempts: {reason}")
+                return False
+
+            delay = retry_after if retry_after is not None else self.backoff_base * (2 ** attempt)
+            delay = min(delay, self.backoff_max)
+            self._stats["retries"] += 1
+            logger.warning(f"Slack {description} failed ({reason}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        return False
+
+    async def flush(self):
+        """Wait until every queued message has been delivered or given up on."""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+
+    async def stop(self, timeout: float = 10.0):
+        """Deliver what is queued (up to timeout), then stop the drain task."""
+        if self._task is None:
+            return
+        if not self._task.done():
+            try:
+                await asyncio.wait_for(self.flush(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Slack queue not drained within {timeout}s, {self._queue.qsize()} messages dropped")
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._client.aclose()
+        self._task = None
+        self._client = None
+
+    def stats(self) -> dict:
+        """Return queue depth and delivery counters (this process only)."""
+        delivered = self._stats["delivered"]
+        return {
+            "configured": bool(self.webhook_url),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_max": self.max_queue,
+            "enqueued": self._stats["enqueued"],
+            "delivered": delivered,
+            "failed": self._stats["failed"],
+            "dropped": self._stats["dropped"],
+            "retries": self._stats["retries"],
+            "avg_delivery_latency_ms": self._stats["total_latency_ms"] / delivered if delivered else 0.0,
+            "last_delivery_latency_ms": self._stats["last_latency_ms"],
+            "max_delivery_latency_ms": self._stats["max_latency_ms"],
+        }
+
+
+# Shared notifier used by alerts and the weekly job
+slack_notifier = SlackNotifier(SLACK_WEBHOOK_URL)
+
 
 def send_slack_notification(feedback: FeedbackDB) -> bool:
     """
-    Send Slack notification for high urgency feedback.
+    Queue Slack notification for high urgency feedback.
 
     Args:
         feedback: FeedbackDB object with analysis
 
     Returns:
-        True if sent successfully, False otherwise
+        True if queued for delivery, False otherwise
     """
     if not SLACK_WEBHOOK_URL:
         logger.warning("SLACK_WEBHOOK_URL not configured, skipping notification")
@@ -95,18 +295,7 @@ def send_slack_notification(feedback: FeedbackDB) -> bool:
         ]
     }
 
-    try:
-        response = requests.post(
-            SLACK_WEBHOOK_URL,
-            json=message,
-            timeout=10
-        )
-        response.raise_for_status()
-        logger.info(f"Slack notification sent for feedback {feedback.id}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send Slack notification: {e}")
-        return False
+    return slack_notifier.enqueue(message, f"notification for feedback {feedback.id}")
 
 
 def send_weekly_summary_to_slack(
@@ -115,7 +304,7 @@ def send_weekly_summary_to_slack(
     report_path: Optional[str] = None
 ) -> bool:
     """
-    Send weekly summary report to Slack.
+    Queue weekly summary report for Slack.
 
     Args:
         accuracy: AccuracyMetrics object
@@ -123,7 +312,7 @@ def send_weekly_summary_to_slack(
         report_path: Optional path to JSON report file
 
     Returns:
-        True if sent successfully, False otherwise
+        True if queued for delivery, False otherwise
     """
     if not SLACK_WEBHOOK_URL:
         logger.warning("SLACK_WEBHOOK_URL not configured, skipping summary")
@@ -211,15 +400,4 @@ def send_weekly_summary_to_slack(
             ]
         })
 
-    try:
-        response = requests.post(
-            SLACK_WEBHOOK_URL,
-            json=message,
-            timeout=10
-        )
-        response.raise_for_status()
-        logger.info("Weekly summary sent to Slack")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send weekly summary to Slack: {e}")
-        return False
+    return slack_notifier.enqueue(message, "weekly summary")
@@ -1,4 +1,5 @@
 import os
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -6,7 +7,16 @@ from .db import connect_to_mongo, close_mongo_connection
 from .api.routes_feedback import router as feedback_router
 from .api.routes_metrics import router as metrics_router  # Phase 2
 from .api.routes_overrides import router as overrides_router  # Phase 2
+from .api.routes_admin import router as admin_router
 from .jobs import start_scheduler, stop_scheduler  # Phase 2
+from .worker import AnalysisWorker
+from .indexes import ensure_indexes
+from .counters import ensure_counters_built
+from .sentiment_rollup import ensure_sentiment_rollup_built
+from .integrations import slack_notifier
+from .realtime import manager, publish_analysis_complete
+from .metrics_updates import metrics_updates
+from .compression import CompressionMiddleware
 from .utils import setup_logging
 import logging
 
@@ -14,6 +24,21 @@ import logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Run an analysis worker inside the API process (disable when running `python -m app.worker`)
+ANALYSIS_WORKER_EMBEDDED = os.getenv("ANALYSIS_WORKER_EMBEDDED", "true").lower() == "true"
+
+
+async def build_metrics_stores():
+    """Build the metrics counters and sentiment rollup from feedbacks if they have never been built."""
+    try:
+        await ensure_counters_built()
+    except Exception as e:
+        logger.error(f"Failed to build metrics counters (run python -m app.counters --repair): {e}")
+    try:
+        await ensure_sentiment_rollup_built()
+    except Exception as e:
+        logger.error(f"Failed to build sentiment rollup (run python -m app.sentiment_rollup): {e}")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -22,6 +47,15 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up application...")
     await connect_to_mongo()
 
+    # Ensure indexes in the background so startup is not delayed by index builds
+    index_task = asyncio.create_task(ensure_indexes())
+
+    # Build the materialized metrics on first start of an existing deployment
+    metrics_build_task = asyncio.create_task(build_metrics_stores())
+
+    # Receive realtime events published by every API process and worker
+    await manager.start()
+
     # Phase 2: Start background job scheduler
     try:
         start_scheduler()
@@ -29,11 +63,21 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to start scheduler: {e}")
 
+    worker = None
+    if ANALYSIS_WORKER_EMBEDDED:
+        worker = AnalysisWorker(on_complete=publish_analysis_complete)
+        worker.start()
+        logger.info("Embedded analysis worker started")
+
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
 
+    if worker:
+        await worker.stop()
+        logger.info("Embedded analysis worker stopped")
+
     # Phase 2: Stop scheduler
     try:
         stop_scheduler()
@@ -41,6 +85,18 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping scheduler: {e}")
 
+    if not index_task.done():
+        index_task.cancel()
+    if not metrics_build_task.done():
+        metrics_build_task.cancel()
+
+    # Send pending metrics deltas, then stop the event bus and WebSocket sender tasks
+    metrics_updates.flush()
+    await manager.shutdown()
+
+    # Deliver queued Slack messages before exiting
+    await slack_notifier.stop()
+
     await close_mongo_connection()
 
 
@@ -60,10 +116,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Brotli/gzip for large JSON bodies and streamed exports
+app.add_middleware(CompressionMiddleware)
+
 # Include routers
 app.include_router(feedback_router)
 app.include_router(metrics_router)  # Phase 2
 app.include_router(overrides_router)  # Phase 2
+app.include_router(admin_router)
 
 
 @app.get("/")
@@ -90,5 +150,6 @@ async def health():
             "metrics": True,  # Phase 2
             "slack_alerts": bool(os.getenv("SLACK_WEBHOOK_URL")),  # Phase 2
             "weekly_jobs": True,  # Phase 2
+            "embedded_analysis_worker": ANALYSIS_WORKER_EMBEDDED,
         }
     }
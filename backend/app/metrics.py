@@ -2,62 +2,155 @@
 Phase 2: Metrics computation functions.
 Compute accuracy, urgency breakdown, sentiment trends from feedback data.
 """
+import os
+import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple, TypeVar
+from .cache import TTLCache
 from .db import get_feedbacks_collection
 from .schemas import AccuracyMetrics, UrgencyBreakdown, SentimentTrend
+from .versions import write_versions
 
 logger = logging.getLogger(__name__)
 
+# Metrics result cache: dashboards in many tabs poll the same endpoints
+METRICS_CACHE_TTL_SECONDS = float(os.getenv("METRICS_CACHE_TTL_SECONDS", "15"))
+
+_metrics_cache = TTLCache(max_entries=128, ttl_seconds=METRICS_CACHE_TTL_SECONDS)
+# key -> (cache generation it started in, shared computation)
+_inflight: Dict[Hashable, Tuple[int, "asyncio.Future[Any]"]] = {}
+_cache_generation = 0
+
+T = TypeVar("T")
+
+
+async def cached_metric(key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+    """
+    Return a cached metrics result, computing it on a miss.
+
+    Concurrent misses for the same key share one computation (single-flight).
+    A result whose computation started before the last invalidation is
+    returned to the waiters that joined it then but not cached; later misses
+    start a new computation rather than joining it.
+
+    Args:
+        key: Endpoint name plus parameters, e.g. ("sentiment-trend", 7)
+        compute: Coroutine function producing the result
+
+    Returns:
+        The cached or freshly computed result
+    """
+    if METRICS_CACHE_TTL_SECONDS <= 0:
+        return await compute()
+
+    value = _metrics_cache.get(key)
+    if value is not None:
+        return value
+
+    generation, future = _inflight.get(key, (None, None))
+    if future is None or generation != _cache_generation:
+        future = asyncio.ensure_future(_compute_and_store(key, compute, _cache_generation))
+        _inflight[key] = (_cache_generation, future)
+        future.add_done_callback(lambda done: _forget_inflight(key, done))
+
+    # Shield so one cancelled request does not cancel the shared computation
+    return await asyncio.shield(future)
+
+
+async def _compute_and_store(key: Hashable, compute: Callable[[], Awaitable[T]], generation: int) -> T:
+    value = await compute()
+    if generation == _cache_generation:
+        _metrics_cache.set(key, value)
+    return value
+
+
+def _forget_inflight(key: Hashable, future: "asyncio.Future[Any]"):
+    # A newer computation may have replaced this one after an invalidation
+    if key in _inflight and _inflight[key][1] is future:
+        del _inflight[key]
+
+
+def invalidate_metrics_cache():
+    """Drop cached metrics results after feedback is created, analyzed or overridden."""
+    global _cache_generation
+    _cache_generation += 1
+    _metrics_cache.clear()
+
+
+def _invalidate_on_remote_writes(collections: List[str]):
+    # Metrics are read from the counters and the sentiment rollup
+    if "metrics_counters" in collections or "sentiment_daily" in collections:
+        invalidate_metrics_cache()
+
+
+write_versions.on_remote_writes(_invalidate_on_remote_writes)
+
+
+def get_metrics_cache_stats() -> dict:
+    """Return hit/miss counters for the metrics result cache (this process only)."""
+    return {**_metrics_cache.stats(), "inflight": len(_inflight)}
+
 
 async def compute_accuracy() -> AccuracyMetrics:
     """
     Compute AI agent accuracy metrics.
 
     Accuracy = 1 - (overridden_count / processed_count)
-    Overall and per-category accuracy.
+    Overall and per-category accuracy, computed in a single aggregation
+    that groups processed feedback by category with a conditional sum for
+    overridden documents.
 
     Returns:
         AccuracyMetrics with overall and category-specific accuracy
     """
     collection = get_feedbacks_collection()
 
-    # Get all feedbacks that were processed by AI (agent_success is not None)
-    processed = await collection.count_documents({"agent_success": {"$ne": None}})
+    pipeline = [
+        # Feedbacks processed by AI (agent_success is not None)
+        {"$match": {"agent_success": {"$ne": None}}},
+        {
+            "$group": {
+                "_id": "$analysis.category",
+                "processed": {"$sum": 1},
+                # Overridden: overrides array is not empty
+                "overridden": {
+                    "$sum": {
+                        "$cond": [{"$gt": [{"$size": {"$ifNull": ["$overrides", []]}}, 0]}, 1, 0]
+                    }
+                },
+            }
+        },
+    ]
+
+    results = await collection.aggregate(pipeline).to_list(length=None)
 
-    # Get feedbacks that have been overridden (overrides array is not empty)
-    overridden = await collection.count_documents({
-        "agent_success": {"$ne": None},
-        "overrides": {"$exists": True, "$ne": []}
-    })
+    return build_accuracy_metrics(results)
 
-    overall_accuracy = 1.0 if processed == 0 else (1.0 - (overridden / processed))
 
-    # Compute per-category accuracy
-    by_category: Dict[str, float] = {}
+def build_accuracy_metrics(groups: List[Dict[str, Any]]) -> AccuracyMetrics:
+    """
+    Build AccuracyMetrics from per-category counts.
 
-    # Get all unique categories
-    categories_cursor = collection.distinct("analysis.category", {"agent_success": {"$ne": None}})
-    categories = await categories_cursor
+    Args:
+        groups: Dicts with "_id" (category or None), "processed" and "overridden"
 
-    for category in categories:
-        if not category:
-            continue
+    Returns:
+        AccuracyMetrics with overall and category-specific accuracy
+    """
+    processed = 0
+    overridden = 0
+    by_category: Dict[str, float] = {}
 
-        cat_processed = await collection.count_documents({
-            "agent_success": {"$ne": None},
-            "analysis.category": category
-        })
+    for group in groups:
+        processed += group["processed"]
+        overridden += group["overridden"]
 
-        cat_overridden = await collection.count_documents({
-            "agent_success": {"$ne": None},
-            "analysis.category": category,
-            "overrides": {"$exists": True, "$ne": []}
-        })
+        category = group["_id"]
+        if category and group["processed"] > 0:
+            by_category[category] = 1.0 - (group["overridden"] / group["processed"])
 
-        if cat_processed > 0:
-            by_category[category] = 1.0 - (cat_overridden / cat_processed)
+    overall_accuracy = 1.0 if processed == 0 else (1.0 - (overridden / processed))
 
     logger.info(
         f"Accuracy computed: {overall_accuracy:.2%} overall, "
@@ -0,0 +1,147 @@
+"""
+Live metrics deltas pushed over the WebSocket ("metrics:update").
+
+Every change that moves the metrics counters (analysis completed, override
+applied) and every feedback creation adds its deltas to a per-process
+coalescer. At most one "metrics:update" frame per
+METRICS_PUSH_INTERVAL_SECONDS carries the summed deltas, so clients can keep
+charts current without polling /api/metrics/*:
+
+    {
+      "received": 3,                            # feedback created
+      "processed": 2, "overridden": 1,          # accuracy denominator / numerator
+      "urgency": {"high": 1},
+      "sentiment": {"negative": 1},
+      "categories": {"billing": {"processed": 1, "overridden": 1}},
+      "sentiment_trend": {"2025-01-15": {"negative": 1}}
+    }
+
+Fields with no change are omitted. Frames are broadcast through the event
+bus, so with several processes each one publishes its own coalesced frames.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+from .realtime import manager
+from .sentiment_rollup import SENTIMENTS
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between metrics:update frames from this process (0 disables)
+METRICS_PUSH_INTERVAL_SECONDS = float(os.getenv("METRICS_PUSH_INTERVAL_SECONDS", "1"))
+
+Emit = Callable[[Dict[str, Any]], None]
+
+
+def _broadcast_update(data: Dict[str, Any]):
+    manager.broadcast({"type": "metrics:update", "data": data})
+
+
+class MetricsUpdateCoalescer:
+    """Sums metrics deltas and emits them at most once per interval."""
+
+    def __init__(self, interval: float = METRICS_PUSH_INTERVAL_SECONDS, emit: Emit = _broadcast_update):
+        self.interval = interval
+        self.emit = emit
+        self._pending: Dict[str, Any] = self._empty()
+        self._dirty = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._last_emit = 0.0
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        return {
+            "received": 0,
+            "processed": 0,
+            "overridden": 0,
+            "urgency": defaultdict(int),
+            "sentiment": defaultdict(int),
+            "categories": defaultdict(lambda: defaultdict(int)),
+            "sentiment_trend": defaultdict(lambda: defaultdict(int)),
+        }
+
+    def add(
+        self,
+        received: int = 0,
+        counter_deltas: Optional[Dict[str, Dict[str, int]]] = None,
+        sentiment_deltas: Optional[Dict[str, Dict[str, int]]] = None,
+    ):
+        """
+        Add deltas to the next frame.
+
+        Args:
+            received: Feedback documents created
+            counter_deltas: Output of counters.counter_deltas (or a merged set)
+            sentiment_deltas: Output of sentiment_rollup.sentiment_deltas
+        """
+        if self.interval <= 0:
+            return
+
+        pending = self._pending
+        pending["received"] += received
+
+        for counter_id, fields in (counter_deltas or {}).items():
+            if counter_id.startswith("category:"):
+                category = pending["categories"][counter_id[len("category:"):]]
+                for field, value in fields.items():
+                    category[field] += value
+                continue
+            for field, value in fields.items():
+                if field.startswith("urgency."):
+                    pending["urgency"][field[len("urgency."):]] += value
+                else:
+                    pending[field] += value
+
+        for date, fields in (sentiment_deltas or {}).items():
+            for sentiment in SENTIMENTS:
+                if fields.get(sentiment):
+                    pending["sentiment"][sentiment] += fields[sentiment]
+                    pending["sentiment_trend"][date][sentiment] += fields[sentiment]
+
+        self._dirty = True
+        self._schedule()
+
+    def _schedule(self):
+        if self._timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        delay = max(0.0, self._last_emit + self.interval - time.monotonic())
+        self._timer = loop.call_later(delay, self.flush)
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Emit pending deltas now (if any). Returns the emitted frame data."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._dirty:
+            return None
+
+        pending, self._pending, self._dirty = self._pending, self._empty(), False
+        self._last_emit = time.monotonic()
+
+        data = _compact(pending)
+        if not data:
+            return None
+        try:
+            self.emit(data)
+        except Exception as e:
+            logger.error(f"Failed to publish metrics update: {e}")
+        return data
+
+
+def _compact(value: Any) -> Any:
+    """Drop zero counts and empty groups from a nested delta structure."""
+    if isinstance(value, dict):
+        compacted = {key: _compact(item) for key, item in value.items()}
+        return {key: item for key, item in compacted.items() if item}
+    return value
+
+
+# Shared coalescer for this process
+metrics_updates = MetricsUpdateCoalescer()
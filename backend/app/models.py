@@ -1,5 +1,9 @@
+import json
+import base64
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
 
 
 class OverrideRecord:
@@ -39,15 +43,22 @@ def feedback_to_dict(feedback: dict) -> dict:
 
 def feedback_from_dict(data: dict) -> dict:
     """Convert API request to MongoDB document format."""
+    created_at = datetime.utcnow()
     doc = {
         "customer_name": data["customer_name"],
         "email": data["email"],
         "message": data["message"],
-        "created_at": datetime.utcnow(),
+        "created_at": created_at,
         "analysis": data.get("analysis"),
         "analysis_error": data.get("analysis_error"),
         "agent_success": data.get("agent_success", None),  # Phase 2: Track if AI succeeded
         "overrides": data.get("overrides", []),  # Phase 2: Human corrections
+        "analysis_status": data.get("analysis_status", "pending"),  # Analysis queue state
+        "analysis_attempts": 0,
+        # Bumped by every write a client can see (see services.get_feedback_changes)
+        "updated_at": created_at,
+        # Pending documents become leasable once this time has passed (see app.worker)
+        "lease_expires_at": created_at,
     }
     return doc
 
@@ -55,11 +66,107 @@ def feedback_from_dict(data: dict) -> dict:
 def serialize_feedback(feedback: dict) -> dict:
     """Serialize feedback for JSON response."""
     result = feedback.copy()
-    if isinstance(result.get("created_at"), datetime):
-        result["created_at"] = result["created_at"].isoformat()
+    for field in ("created_at", "updated_at"):
+        if isinstance(result.get(field), datetime):
+            result[field] = result[field].isoformat()
     # Serialize override timestamps
     if "overrides" in result:
         for override in result["overrides"]:
             if isinstance(override.get("overridden_at"), datetime):
                 override["overridden_at"] = override["overridden_at"].isoformat()
     return result
+
+
+# Response fields, in FeedbackDB / FeedbackSummary order (see schemas.py)
+ANALYSIS_FIELDS = ("sentiment", "urgency_level", "category", "summary", "recommended_action")
+ANALYSIS_SUMMARY_FIELDS = ("sentiment", "urgency_level", "category", "summary")
+OVERRIDE_FIELDS = ("field", "old_value", "new_value", "reason", "overridden_by", "overridden_at")
+
+
+def feedback_doc_to_response(doc: dict) -> dict:
+    """
+    Build a FeedbackResponse-shaped dict straight from a MongoDB document.
+
+    Trusted-read fast path for list pages: documents written by this
+    service already match the schema, so rows skip Pydantic validation and
+    internal fields (queue lease state, category_key) are dropped here.
+    Datetimes are left for the JSON encoder.
+    """
+    analysis = doc.get("analysis")
+    return {
+        "id": str(doc["_id"]),
+        "customer_name": doc["customer_name"],
+        "email": doc["email"],
+        "message": doc["message"],
+        "created_at": doc["created_at"],
+        "analysis": {field: analysis.get(field) for field in ANALYSIS_FIELDS} if analysis else None,
+        "analysis_error": doc.get("analysis_error"),
+        "agent_success": doc.get("agent_success"),
+        "overrides": [
+            {field: override.get(field) for field in OVERRIDE_FIELDS}
+            for override in doc.get("overrides") or []
+        ],
+        "analysis_status": doc.get("analysis_status"),
+        "updated_at": doc.get("updated_at"),
+    }
+
+
+def feedback_summary_doc_to_response(doc: dict) -> dict:
+    """Build a FeedbackSummary-shaped dict from a summary-projected document."""
+    analysis = doc.get("analysis")
+    return {
+        "id": str(doc["_id"]),
+        "customer_name": doc["customer_name"],
+        "email": doc["email"],
+        "created_at": doc["created_at"],
+        "analysis": {field: analysis.get(field) for field in ANALYSIS_SUMMARY_FIELDS} if analysis else None,
+        "agent_success": doc.get("agent_success"),
+        "analysis_status": doc.get("analysis_status"),
+    }
+
+
+def encode_cursor(created_at: datetime, feedback_id: str) -> str:
+    """
+    Encode the (created_at, _id) of the last row of a page as an opaque cursor.
+
+    Change watermarks (GET /api/feedback/changes) use the same encoding with
+    (updated_at, _id).
+    """
+    payload = json.dumps({"t": created_at.isoformat(), "id": feedback_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def encode_search_cursor(score: float, feedback_id: str) -> str:
+    """Encode the (text score, _id) of the last row of a search page as an opaque cursor."""
+    payload = json.dumps({"s": score, "id": feedback_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, ObjectId]:
+    """
+    Decode a cursor produced by encode_search_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(payload["s"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
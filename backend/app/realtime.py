@@ -0,0 +1,302 @@
+"""
+Realtime fan-out of feedback events to WebSocket clients.
+
+Events go through the event bus (see app.events), so with several API
+processes each process delivers every event to its own clients. Each
+connection has a bounded send queue drained by its own sender task, so
+publishing never awaits a browser. Clients may subscribe to a filter
+(urgency, sentiment and/or category sets); connections are grouped by
+filter, so a feedback event is matched once per distinct filter and only
+reaches the matching groups.
+"""
+import os
+import asyncio
+import logging
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+from fastapi import WebSocket
+from pydantic_core import to_json
+from .categories import normalize_category
+from .events import EventBus, InMemoryEventBus, create_event_bus
+from .models import serialize_feedback
+from .schemas import FeedbackDB, FeedbackSubscription
+
+logger = logging.getLogger(__name__)
+
+# Per-client send queue bound and send timeout
+WS_SEND_QUEUE_MAX = int(os.getenv("WS_SEND_QUEUE_MAX", "256"))
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+
+# (urgency levels, sentiments, category keys); None means "any"
+FilterKey = Tuple[Optional[FrozenSet[str]], Optional[FrozenSet[str]], Optional[FrozenSet[str]]]
+# (urgency_level, sentiment, category_key) of one feedback
+Facets = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def subscription_key(subscription: FeedbackSubscription) -> Optional[FilterKey]:
+    """Build the grouping key for a subscription (None subscribes to everything)."""
+    urgency = frozenset(subscription.urgency) if subscription.urgency else None
+    sentiment = frozenset(subscription.sentiment) if subscription.sentiment else None
+    category = None
+    if subscription.category:
+        category = frozenset(key for key in map(normalize_category, subscription.category) if key) or None
+    if urgency is None and sentiment is None and category is None:
+        return None
+    return urgency, sentiment, category
+
+
+def feedback_facets(feedback: dict) -> Optional[Facets]:
+    """Extract the filterable fields of a serialized feedback (None until analyzed)."""
+    analysis = feedback.get("analysis")
+    if not analysis:
+        return None
+    return analysis.get("urgency_level"), analysis.get("sentiment"), normalize_category(analysis.get("category"))
+
+
+def key_matches(key: Optional[FilterKey], facets: Optional[Facets]) -> bool:
+    """Whether a feedback with these facets passes a subscription filter."""
+    if key is None:
+        return True
+    if facets is None:
+        # Filtered subscribers only see analyzed feedback
+        return False
+    return all(allowed is None or value in allowed for allowed, value in zip(key, facets))
+
+
+class ClientConnection:
+    """A connected WebSocket with its bounded send queue and sender task."""
+
+    def __init__(self, websocket: WebSocket, max_queue: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.sender: Optional[asyncio.Task] = None
+        self.filter_key: Optional[FilterKey] = None
+
+
+class ConnectionManager:
+    """
+    Fan-out of realtime events to WebSocket clients.
+
+    Messages are serialized once and put on each recipient's bounded queue
+    without awaiting delivery; a task per client drains its queue. A client
+    whose queue overflows (or whose send fails or times out) is
+    disconnected, so a stalled browser never delays requests or other
+    clients.
+
+    broadcast() reaches every client. publish() and publish_batch() carry
+    feedback events and only reach subscription groups whose filter matches.
+    All three go through the event bus and are delivered to local clients
+    by dispatch() when the bus hands them back. Other bus events (e.g.
+    write versions, see app.versions) go to handlers registered with
+    on_event().
+    """
+
+    def __init__(
+        self,
+        max_queue: int = WS_SEND_QUEUE_MAX,
+        send_timeout: float = WS_SEND_TIMEOUT_SECONDS,
+        bus: Optional[EventBus] = None,
+    ):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.bus = bus or InMemoryEventBus()
+        self.bus.set_handler(self.dispatch)
+        # Keyed by WebSocket for O(1) removal
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        # Connections grouped by subscription filter (None: unfiltered)
+        self._groups: Dict[Optional[FilterKey], Dict[WebSocket, ClientConnection]] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self._event_handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._stats = {"broadcasts": 0, "sent": 0, "dropped_clients": 0}
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        connection = ClientConnection(websocket, self.max_queue)
+        connection.sender = asyncio.create_task(self._send_loop(connection))
+        self.active_connections[websocket] = connection
+        self._groups.setdefault(None, {})[websocket] = connection
+        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+
+    def disconnect(self, websocket: WebSocket):
+        connection = self.active_connections.pop(websocket, None)
+        if connection is None:
+            return
+        self._leave_group(connection)
+        if connection.sender is not asyncio.current_task():
+            connection.sender.cancel()
+        logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
+
+    def subscribe(self, websocket: WebSocket, key: Optional[FilterKey]) -> bool:
+        """
+        Move a client to the group for a subscription filter.
+
+        Returns:
+            False if the client is no longer connected
+        """
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            return False
+        self._leave_group(connection)
+        connection.filter_key = key
+        self._groups.setdefault(key, {})[websocket] = connection
+        return True
+
+    def _leave_group(self, connection: ClientConnection):
+        group = self._groups.get(connection.filter_key)
+        if group is not None:
+            group.pop(connection.websocket, None)
+            if not group:
+                del self._groups[connection.filter_key]
+
+    def send(self, websocket: WebSocket, message: dict) -> bool:
+        """Queue a message for one client (False if it is gone or was dropped)."""
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            return False
+        return self._enqueue([connection], to_json(message).decode("utf-8")) == 1
+
+    def broadcast(self, message: dict):
+        """Send a message to every client of every process."""
+        self.bus.publish({"scope": "all", "type": message.get("type"), "message": message})
+
+    def publish(self, event_type: str, feedback: dict):
+        """Send a feedback event to matching subscribers of every process."""
+        self.bus.publish({"scope": "feedback", "type": event_type, "data": feedback})
+
+    def publish_batch(self, event_type: str, feedbacks: List[dict]):
+        """Send a batch event; each subscriber receives only the feedbacks it matches."""
+        self.bus.publish({"scope": "feedbacks", "type": event_type, "data": feedbacks})
+
+    def on_event(self, scope: str, handler: Callable[[Dict[str, Any]], None]):
+        """Handle bus events of a scope that is not delivered to WebSocket clients."""
+        self._event_handlers[scope] = handler
+
+    def dispatch(self, event: Dict[str, Any]) -> int:
+        """
+        Deliver an event received from the bus to this process's clients.
+
+        Returns:
+            Number of clients the event was queued for
+        """
+        handler = self._event_handlers.get(event["scope"])
+        if handler is not None:
+            handler(event)
+            return 0
+
+        self._stats["broadcasts"] += 1
+        if event["scope"] == "all":
+            return self._deliver_all(event["message"])
+        if event["scope"] == "feedbacks":
+            return self._deliver_batch(event["type"], event["data"])
+        return self._deliver_feedback(event["type"], event["data"])
+
+    def _deliver_all(self, message: dict) -> int:
+        return self._enqueue(list(self.active_connections.values()), to_json(message).decode("utf-8"))
+
+    def _deliver_feedback(self, event_type: str, feedback: dict) -> int:
+        """Queue a feedback event for groups whose filter matches it."""
+        facets = feedback_facets(feedback)
+        recipients = [
+            connection
+            for key, group in self._groups.items() if key_matches(key, facets)
+            for connection in group.values()
+        ]
+        if not recipients:
+            return 0
+        return self._enqueue(recipients, to_json({"type": event_type, "data": feedback}).decode("utf-8"))
+
+    def _deliver_batch(self, event_type: str, feedbacks: List[dict]) -> int:
+        """
+        Queue a batch event; each group receives only the feedbacks it matches.
+
+        Groups matching the same subset share one serialized message.
+        """
+        facets = [feedback_facets(feedback) for feedback in feedbacks]
+        encoded: Dict[Tuple[int, ...], str] = {}
+        queued = 0
+        for key, group in list(self._groups.items()):
+            subset = tuple(i for i, f in enumerate(facets) if key_matches(key, f))
+            if not subset:
+                continue
+            if subset not in encoded:
+                data = [feedbacks[i] for i in subset]
+                encoded[subset] = to_json({"type": event_type, "data": data}).decode("utf-8")
+            queued += self._enqueue(list(group.values()), encoded[subset])
+        return queued
+
+    def _enqueue(self, connections: List[ClientConnection], text: str) -> int:
+        """Put text on each connection's queue, dropping clients that overflow."""
+        queued = 0
+        overflowed = []
+        for connection in connections:
+            try:
+                connection.queue.put_nowait(text)
+                queued += 1
+            except asyncio.QueueFull:
+                overflowed.append(connection.websocket)
+
+        for websocket in overflowed:
+            logger.warning(f"WebSocket send queue full ({self.max_queue}), disconnecting slow client")
+            self._drop(websocket)
+
+        return queued
+
+    async def _send_loop(self, connection: ClientConnection):
+        """Deliver queued messages to one client until it disconnects."""
+        try:
+            while True:
+                text = await connection.queue.get()
+                await asyncio.wait_for(connection.websocket.send_text(text), self.send_timeout)
+                self._stats["sent"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket client, disconnecting: {e}")
+            self._drop(connection.websocket)
+
+    def _drop(self, websocket: WebSocket):
+        """Disconnect a client that cannot keep up and close its socket in the background."""
+        if websocket not in self.active_connections:
+            return
+        self._stats["dropped_clients"] += 1
+        self.disconnect(websocket)
+        task = asyncio.create_task(self._close(websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            # 1013 "try again later": the client should reconnect and refetch
+            await asyncio.wait_for(websocket.close(code=1013), self.send_timeout)
+        except Exception as e:
+            logger.debug(f"Error closing WebSocket: {e}")
+
+    async def start(self):
+        """Start receiving events from the bus (application startup)."""
+        await self.bus.start()
+
+    async def shutdown(self):
+        """Stop the bus and every sender task (application shutdown)."""
+        await self.bus.stop()
+        for websocket in list(self.active_connections):
+            self.disconnect(websocket)
+        for task in list(self._closing):
+            task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection count, queued messages and delivery counters."""
+        return {
+            "connections": len(self.active_connections),
+            "subscription_groups": len(self._groups),
+            "queued": sum(c.queue.qsize() for c in self.active_connections.values()),
+            "max_queue": self.max_queue,
+            **self._stats,
+            "event_bus": self.bus.stats(),
+        }
+
+
+manager = ConnectionManager(bus=create_event_bus())
+
+
+async def publish_analysis_complete(feedback: FeedbackDB):
+    """Publish a feedback whose queued analysis has finished (worker on_complete callback)."""
+    manager.publish("feedbacks:updated", serialize_feedback(feedback.model_dump()))
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Literal, Optional, List
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 
 class FeedbackCreate(BaseModel):
@@ -9,6 +9,11 @@ class FeedbackCreate(BaseModel):
     message: str = Field(..., min_length=1, max_length=8000)
 
 
+class FeedbackBatchCreate(BaseModel):
+    """Bulk ingestion request; items are validated individually as FeedbackCreate."""
+    items: List[dict] = Field(..., min_length=1)
+
+
 class FeedbackAnalysis(BaseModel):
     sentiment: Literal["positive", "neutral", "negative"]
     urgency_level: Literal["low", "medium", "high"]
@@ -17,6 +22,16 @@ class FeedbackAnalysis(BaseModel):
     recommended_action: str = Field(..., min_length=1, max_length=500)
 
 
+class BatchAnalysisItem(BaseModel):
+    """One entry of a batched LLM response; validated against FeedbackAnalysis per item."""
+    index: int
+    sentiment: str
+    urgency_level: str
+    category: str
+    summary: str
+    recommended_action: str
+
+
 # Phase 2: Override schemas
 class OverrideCreate(BaseModel):
     """Request to override AI analysis field."""
@@ -26,6 +41,57 @@ class OverrideCreate(BaseModel):
     overridden_by: str = Field(..., min_length=1, max_length=200)  # email or name
 
 
+class OverrideBatchItem(OverrideCreate):
+    """One override in a batch, addressed by feedback ID."""
+    feedback_id: str
+
+
+class OverrideBatchFilter(BaseModel):
+    """Select feedback by its current analysis values (exact match)."""
+    category: Optional[str] = None
+    urgency_level: Optional[Literal["low", "medium", "high"]] = None
+    sentiment: Optional[Literal["positive", "neutral", "negative"]] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if self.category is None and self.urgency_level is None and self.sentiment is None:
+            raise ValueError("filter must set at least one of category, urgency_level, sentiment")
+        return self
+
+
+class OverrideBatchCreate(BaseModel):
+    """
+    Bulk override request: either explicit items, or a filter plus one
+    override applied to every matching feedback.
+    """
+    items: Optional[List[OverrideBatchItem]] = Field(None, min_length=1)
+    filter: Optional[OverrideBatchFilter] = None
+    override: Optional[OverrideCreate] = None
+
+    @model_validator(mode="after")
+    def check_mode(self):
+        if self.items is not None:
+            if self.filter is not None or self.override is not None:
+                raise ValueError("use either items, or filter with override, not both")
+        elif self.filter is None or self.override is None:
+            raise ValueError("items, or filter with override, is required")
+        return self
+
+
+class OverrideBatchItemResult(BaseModel):
+    """Outcome of a single override in a batch."""
+    index: int
+    feedback_id: str
+    success: bool
+    error: Optional[str] = None
+
+
+class OverrideBatchResponse(BaseModel):
+    results: list[OverrideBatchItemResult]
+    applied: int
+    failed: int
+
+
 class OverrideRecord(BaseModel):
     """Record of a human override."""
     field: str
@@ -46,6 +112,10 @@ class FeedbackDB(BaseModel):
     analysis_error: Optional[str] = None
     agent_success: Optional[bool] = None  # Phase 2: True if AI succeeded, False if failed
     overrides: List[OverrideRecord] = []  # Phase 2: List of human corrections
+    # Analysis queue state; None for documents analyzed inline before the queue existed
+    analysis_status: Optional[Literal["pending", "processing", "completed", "failed"]] = None
+    # Last visible change; None for documents last written before it was tracked
+    updated_at: Optional[datetime] = None
 
 
 class FeedbackResponse(FeedbackDB):
@@ -54,7 +124,54 @@ class FeedbackResponse(FeedbackDB):
 
 class FeedbackListResponse(BaseModel):
     feedbacks: list[FeedbackResponse]
-    total: int
+    total: Optional[int] = None  # None when requested with with_total=false
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+
+
+class FeedbackChangesResponse(BaseModel):
+    """Feedback created or modified after a watermark, oldest change first."""
+    feedbacks: list[FeedbackResponse]
+    watermark: str  # Pass as ?since= to fetch later changes
+    has_more: bool  # True if more changes are waiting; fetch again with watermark
+
+
+class FeedbackAnalysisSummary(BaseModel):
+    """Triage fields of an analysis, for list views."""
+    sentiment: Literal["positive", "neutral", "negative"]
+    urgency_level: Literal["low", "medium", "high"]
+    category: str
+    summary: str
+
+
+class FeedbackSummary(BaseModel):
+    """Lightweight list row: no message, recommended action or override history."""
+    id: str
+    customer_name: str
+    email: str
+    created_at: datetime
+    analysis: Optional[FeedbackAnalysisSummary] = None
+    agent_success: Optional[bool] = None
+    analysis_status: Optional[Literal["pending", "processing", "completed", "failed"]] = None
+
+
+class FeedbackSummaryListResponse(BaseModel):
+    feedbacks: list[FeedbackSummary]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class FeedbackBatchItemResult(BaseModel):
+    """Outcome of a single item in a batch ingestion request."""
+    index: int
+    success: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class FeedbackBatchResponse(BaseModel):
+    results: list[FeedbackBatchItemResult]
+    accepted: int
+    failed: int
 
 
 # Phase 2: Metrics schemas
@@ -82,6 +199,96 @@ class SentimentTrend(BaseModel):
     negative: int
 
 
+class AnalysisCacheStats(BaseModel):
+    """Hit/miss/eviction counters for the analysis cache (per process)."""
+    enabled: bool
+    memory: dict[str, int]  # in-process LRU tier
+    database: dict[str, int]  # MongoDB analysis_cache tier
+
+
+class MetricsCacheStats(BaseModel):
+    """Hit/miss counters for the metrics result cache (per process)."""
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    max_entries: int
+    inflight: int  # computations currently shared by concurrent misses
+
+
+class FeedbackSubscription(BaseModel):
+    """
+    WebSocket subscribe message: {"type": "subscribe", "urgency": ["high"], ...}.
+
+    Each field is a set of accepted values (any when omitted); a subscriber
+    with any filter only receives feedback events once analysis is done.
+    """
+    urgency: Optional[List[Literal["low", "medium", "high"]]] = Field(None, max_length=3)
+    sentiment: Optional[List[Literal["positive", "neutral", "negative"]]] = Field(None, max_length=3)
+    category: Optional[List[str]] = Field(None, max_length=50)  # normalized like the list filter
+
+
+class EventBusStats(BaseModel):
+    """Realtime event bus counters (per process)."""
+    backend: str  # "memory" or "mongo"
+    published: int
+    received: int
+    dropped: int
+
+
+class WebSocketStats(BaseModel):
+    """WebSocket fan-out counters (per process)."""
+    connections: int
+    subscription_groups: int  # distinct subscription filters in use
+    queued: int  # messages waiting in client send queues
+    max_queue: int
+    broadcasts: int
+    sent: int
+    dropped_clients: int  # disconnected for overflowing their queue or failing a send
+    event_bus: EventBusStats
+
+
+class AnalysisBatchingStats(BaseModel):
+    """Micro-batching counters and per-batch LLM latency (per process)."""
+    enabled: bool
+    window_ms: float
+    max_items: int
+    batches: int
+    items: int
+    fallbacks: int
+    failed_batches: int
+    avg_batch_size: float
+    avg_latency_ms: float
+    last_latency_ms: float
+    max_latency_ms: float
+
+
+class SlackDeliveryStats(BaseModel):
+    """Slack outbound queue depth and delivery counters (per process)."""
+    configured: bool
+    queue_depth: int
+    queue_max: int
+    enqueued: int
+    delivered: int
+    failed: int
+    dropped: int
+    retries: int
+    avg_delivery_latency_ms: float
+    last_delivery_latency_ms: float
+    max_delivery_latency_ms: float
+
+
+class QueryPlanReport(BaseModel):
+    """explain() summary for one registered query shape."""
+    name: str
+    collection: str
+    kind: str  # find, count or aggregate
+    stages: List[str]
+    indexes_used: List[str]
+    collscan: bool
+
+
 class PromptConfig(BaseModel):
     """Configuration for AI prompt tuning."""
     bias_words: List[str] = []
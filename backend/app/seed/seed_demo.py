@@ -3,17 +3,18 @@ Phase 2: Demo data seeding script.
 Seeds the database with sample feedback for testing and demonstration.
 """
 import asyncio
-import os
+import logging
 import sys
 from pathlib import Path
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.db import connect_to_mongo, close_mongo_connection, get_feedbacks_collection
-from app.schemas import FeedbackCreate, OverrideCreate
-from app.services import create_feedback, apply_override
-import logging
+from app.db import connect_to_mongo, close_mongo_connection, get_feedbacks_collection  # noqa: E402
+from app.schemas import FeedbackCreate, OverrideCreate  # noqa: E402
+from app.services import create_feedback, apply_override  # noqa: E402
+from app.worker import AnalysisWorker  # noqa: E402
+from app.integrations import slack_notifier  # noqa: E402
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -94,6 +95,9 @@ async def seed_demo_data():
 
     logger.info(f"Created {len(created_feedbacks)} demo feedbacks")
 
+    # Analyze the queued feedbacks (including retries) before applying overrides
+    await AnalysisWorker().run(stop_when_idle=True)
+
     # Apply a demo override to demonstrate the feature
     if created_feedbacks:
         # Override the sentiment of the first feedback
@@ -110,7 +114,8 @@ async def seed_demo_data():
         except Exception as e:
             logger.error(f"Failed to apply demo override: {e}")
 
-    # Close connection
+    # Deliver queued Slack alerts and close connection
+    await slack_notifier.stop()
     await close_mongo_connection()
 
     logger.info("Demo data seeding completed!")
@@ -0,0 +1,341 @@
+"""
+Daily sentiment rollup.
+
+The `sentiment_daily` collection holds one small document per UTC day:
+
+    {
+        "_id": "2025-01-15",
+        "positive": 12, "neutral": 8, "negative": 5,
+        "categories": {"billing": {"positive": 2, "negative": 4}, ...}
+    }
+
+Documents are updated with $inc whenever a feedback's sentiment or
+category changes (see counters.record_feedback_change), so the sentiment
+trend endpoint reads one document per day instead of grouping raw
+feedbacks. Build or rebuild the rollup from existing data with:
+
+    python -m app.sentiment_rollup                  # backfill all history
+    python -m app.sentiment_rollup --days 365       # backfill the last year
+
+A full-history backfill writes the "built:sentiment_daily" marker (in
+metrics_counters, so it never shows up as a day). Until it exists the trend
+is aggregated from feedbacks, and the API runs the backfill in the
+background at startup (ensure_sentiment_rollup_built).
+
+Like a counters repair, the backfill takes an exclusive build claim and
+corrects days with $inc instead of overwriting them, so deltas written
+while it runs (most often to today) are kept.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from .build_claims import build_claim
+from .db import (
+    connect_to_mongo,
+    close_mongo_connection,
+    get_database,
+    get_feedbacks_collection,
+    get_metrics_counters_collection,
+    get_sentiment_daily_collection,
+)
+from .metrics import compute_sentiment_trend, invalidate_metrics_cache
+from .realtime import manager
+from .schemas import SentimentTrend
+from .utils import setup_logging
+from .versions import record_writes
+
+logger = logging.getLogger(__name__)
+
+SENTIMENTS = ("positive", "neutral", "negative")
+DATE_FORMAT = "%Y-%m-%d"
+# Marker document (kind "marker") written once all history has been backfilled
+BUILT_ID = "built:sentiment_daily"
+
+SentimentDeltas = Dict[str, Dict[str, int]]
+
+
+def category_field(category: str) -> str:
+    """Make a category usable as a field name ('.' and '$' are reserved)."""
+    return category.replace(".", "_").replace("$", "_")
+
+
+def _contribute(doc: dict, sign: int, deltas: SentimentDeltas):
+    """Add (sign=1) or remove (sign=-1) one feedback document's counts."""
+    analysis = doc.get("analysis") or {}
+    sentiment = analysis.get("sentiment")
+    created_at = doc.get("created_at")
+    if sentiment not in SENTIMENTS or created_at is None:
+        return
+
+    day = deltas[created_at.strftime(DATE_FORMAT)]
+    day[sentiment] += sign
+
+    category = analysis.get("category")
+    if category:
+        day[f"categories.{category_field(category)}.{sentiment}"] += sign
+
+
+def sentiment_deltas(before: Optional[dict], after: Optional[dict]) -> SentimentDeltas:
+    """
+    Compute the per-day $inc deltas for a feedback document changing from before to after.
+
+    Either side may be None (document created / deleted).
+    """
+    deltas: SentimentDeltas = defaultdict(lambda: defaultdict(int))
+
+    if before is not None:
+        _contribute(before, -1, deltas)
+    if after is not None:
+        _contribute(after, 1, deltas)
+
+    return {
+        date: {field: value for field, value in fields.items() if value}
+        for date, fields in deltas.items()
+        if any(fields.values())
+    }
+
+
+async def apply_sentiment_deltas(deltas: SentimentDeltas):
+    """
+    Apply per-day deltas with a single bulk_write of upserting $inc updates.
+
+    Failures are logged rather than raised; re-run the backfill to repair.
+    """
+    if not deltas or get_database() is None:
+        return
+
+    operations = [
+        UpdateOne({"_id": date}, {"$inc": fields}, upsert=True)
+        for date, fields in deltas.items()
+    ]
+
+    try:
+        await get_sentiment_daily_collection().bulk_write(operations, ordered=False)
+    except PyMongoError as e:
+        logger.error(f"Failed to update sentiment rollup: {e}")
+
+
+async def read_sentiment_trend(days: int = 7) -> List[SentimentTrend]:
+    """
+    Read the daily sentiment trend for the last N days from the rollup.
+
+    Falls back to the aggregation (compute_sentiment_trend) until the
+    rollup has been backfilled (BUILT_ID marker), since before that it only
+    holds days written since deploy.
+
+    Args:
+        days: Number of days to look back
+
+    Returns:
+        List of SentimentTrend objects for days with analyzed feedback
+    """
+    if not await get_metrics_counters_collection().find_one({"_id": BUILT_ID}):
+        logger.warning("Sentiment rollup not built, computing trend from feedbacks (run python -m app.sentiment_rollup)")
+        return await compute_sentiment_trend(days=days)
+
+    collection = get_sentiment_daily_collection()
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=days)
+
+    docs = await collection.find(
+        {"_id": {"$gte": start_date.strftime(DATE_FORMAT), "$lte": end_date.strftime(DATE_FORMAT)}},
+        {"categories": 0},
+    ).sort("_id", 1).to_list(length=None)
+
+    trends = [
+        SentimentTrend(
+            date=doc["_id"],
+            positive=doc.get("positive", 0),
+            neutral=doc.get("neutral", 0),
+            negative=doc.get("negative", 0),
+        )
+        for doc in docs
+        if any(doc.get(sentiment, 0) for sentiment in SENTIMENTS)
+    ]
+
+    logger.info(f"Sentiment trend read for {days} days: {len(trends)} data points")
+
+    return trends
+
+
+async def _rollup_range(start: datetime, end: datetime) -> SentimentDeltas:
+    """Aggregate feedbacks created in [start, end) into dotted count fields by day."""
+    pipeline = [
+        {
+            "$match": {
+                "created_at": {"$gte": start, "$lt": end},
+                "analysis.sentiment": {"$in": list(SENTIMENTS)},
+            }
+        },
+        {
+            "$group": {
+                "_id": {
+                    "date": {"$dateToString": {"format": DATE_FORMAT, "date": "$created_at"}},
+                    "sentiment": "$analysis.sentiment",
+                    "category": "$analysis.category",
+                },
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+
+    days: SentimentDeltas = defaultdict(lambda: defaultdict(int))
+    async for group in get_feedbacks_collection().aggregate(pipeline):
+        key = group["_id"]
+        day = days[key["date"]]
+        day[key["sentiment"]] += group["count"]
+        if key.get("category"):
+            day[f"categories.{category_field(key['category'])}.{key['sentiment']}"] += group["count"]
+
+    return {date: dict(fields) for date, fields in days.items()}
+
+
+def _stored_counts(doc: dict) -> Dict[str, int]:
+    """Flatten a stored day document into dotted count fields."""
+    counts = {sentiment: doc.get(sentiment, 0) for sentiment in SENTIMENTS}
+    for category, sentiments in (doc.get("categories") or {}).items():
+        for sentiment, count in sentiments.items():
+            counts[f"categories.{category}.{sentiment}"] = count
+    return counts
+
+
+async def backfill_sentiment_rollup(days: Optional[int] = None, chunk_days: int = 30) -> int:
+    """
+    Rebuild rollup documents from the feedbacks collection.
+
+    History is processed in chunks of chunk_days so each aggregation stays
+    small. Each day in a chunk is corrected with $inc by the difference
+    between the recount and what is stored (days with no analyzed feedback
+    left go to zero), so the backfill is idempotent, repairs drift and keeps
+    deltas written while it runs. A full-history backfill marks the rollup
+    as built. Nothing is written if another process holds the build claim.
+
+    Args:
+        days: Only rebuild the last N days (default: all history)
+        chunk_days: Number of days aggregated per query
+
+    Returns:
+        Number of day documents corrected
+    """
+    async with build_claim("sentiment_daily") as claimed:
+        if not claimed:
+            logger.warning("Sentiment rollup is being built by another process, not backfilling")
+            return 0
+        return await _backfill(days, chunk_days)
+
+
+async def _backfill(days: Optional[int], chunk_days: int) -> int:
+    end = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    if days is not None:
+        start = end - timedelta(days=days + 1)
+    else:
+        oldest = await get_feedbacks_collection().find_one({}, {"created_at": 1}, sort=[("created_at", 1)])
+        if oldest is None:
+            logger.info("No feedback to backfill")
+            await _mark_built()
+            return 0
+        start = oldest["created_at"].replace(hour=0, minute=0, second=0, microsecond=0)
+
+    collection = get_sentiment_daily_collection()
+    written = 0
+    chunk_start = start
+
+    while chunk_start < end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+        expected = await _rollup_range(chunk_start, chunk_end)
+        # Read right after the recount, so deltas written since are part of the stored side
+        stored = {
+            doc["_id"]: _stored_counts(doc)
+            async for doc in collection.find(
+                {"_id": {"$gte": chunk_start.strftime(DATE_FORMAT), "$lt": chunk_end.strftime(DATE_FORMAT)}}
+            )
+        }
+
+        operations = []
+        for date in sorted(set(expected) | set(stored)):
+            want, have = expected.get(date, {}), stored.get(date, {})
+            corrections = {
+                field: want.get(field, 0) - have.get(field, 0)
+                for field in set(want) | set(have)
+                if want.get(field, 0) != have.get(field, 0)
+            }
+            if corrections:
+                operations.append(UpdateOne({"_id": date}, {"$inc": corrections}, upsert=True))
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+            written += len(operations)
+
+        logger.info(
+            f"Sentiment rollup backfilled {chunk_start:%Y-%m-%d}..{chunk_end:%Y-%m-%d}: "
+            f"{len(expected)} days, {len(operations)} corrected"
+        )
+        chunk_start = chunk_end
+
+    if days is None:
+        await _mark_built()
+    record_writes("sentiment_daily")
+    return written
+
+
+async def _mark_built():
+    await get_metrics_counters_collection().replace_one(
+        {"_id": BUILT_ID}, {"kind": "marker", "built_at": datetime.utcnow()}, upsert=True
+    )
+
+
+async def ensure_sentiment_rollup_built() -> bool:
+    """
+    Backfill all history unless the BUILT_ID marker exists (startup of an
+    existing deployment) or another process is backfilling.
+
+    Returns:
+        True if the rollup was built
+    """
+    if await get_metrics_counters_collection().find_one({"_id": BUILT_ID}):
+        return False
+    logger.info("Sentiment rollup not built yet, backfilling it from feedbacks")
+    written = await backfill_sentiment_rollup()
+    if not await get_metrics_counters_collection().find_one({"_id": BUILT_ID}):
+        # Another process holds the build claim
+        return False
+    invalidate_metrics_cache()
+    logger.info(f"Built sentiment rollup ({written} days corrected)")
+    return True
+
+
+async def main(days: Optional[int] = None, chunk_days: int = 30):
+    setup_logging()
+    await connect_to_mongo()
+    try:
+        written = await backfill_sentiment_rollup(days=days, chunk_days=chunk_days)
+        print(f"Corrected {written} sentiment_daily documents")
+    finally:
+        # Deliver the write-version bump so API processes stop serving cached metrics
+        await manager.bus.stop()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill the daily sentiment rollup from feedbacks")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=None,
+        help="Only rebuild the last N days (default: all history)"
+    )
+    parser.add_argument(
+        "--chunk-days",
+        type=int,
+        default=30,
+        help="Days aggregated per query (default: 30)"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(days=args.days, chunk_days=args.chunk_days))
@@ -1,47 +1,110 @@
+import os
 import logging
-from datetime import datetime
-from typing import Optional, Dict, Any
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple, Union
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from .db import get_feedbacks_collection
+from .cache import TTLCache
+from .categories import category_filter, normalize_category
+from .counters import record_feedback_change, record_feedback_changes
+from .metrics import invalidate_metrics_cache
+from .metrics_updates import metrics_updates
 from .models import feedback_to_dict, feedback_from_dict, serialize_feedback
-from .schemas import FeedbackCreate, FeedbackDB, FeedbackAnalysis, OverrideCreate
-from .ai_agent import analyze_message
-from .integrations import send_slack_notification
+from .schemas import FeedbackCreate, FeedbackDB, FeedbackSummary, FeedbackAnalysis, OverrideCreate
+from .versions import record_writes, write_versions
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# List totals: filtered counts are cached briefly and dropped on writes
+FEEDBACK_COUNT_CACHE_TTL_SECONDS = float(os.getenv("FEEDBACK_COUNT_CACHE_TTL_SECONDS", "10"))
+_count_cache = TTLCache(max_entries=256, ttl_seconds=FEEDBACK_COUNT_CACHE_TTL_SECONDS)
+
+# Change feed: how far behind "now" a watermark is held, so writes that commit
+# late (or come from a process whose clock is slightly behind) are not skipped
+FEEDBACK_CHANGES_SETTLE_SECONDS = float(os.getenv("FEEDBACK_CHANGES_SETTLE_SECONDS", "5"))
+
+# Sorts before every real ObjectId; pairs with a bare timestamp in a watermark
+MIN_OBJECT_ID = ObjectId("0" * 24)
+
+
+def invalidate_feedback_counts():
+    """Drop cached list totals after feedback is created, analyzed or overridden."""
+    _count_cache.clear()
+
+
+def _invalidate_counts_on_remote_writes(collections: List[str]):
+    if "feedbacks" in collections:
+        invalidate_feedback_counts()
+
+
+write_versions.on_remote_writes(_invalidate_counts_on_remote_writes)
+
+
+async def count_feedbacks(query: Dict[str, Any]) -> int:
+    """
+    Count feedbacks matching a list filter.
+
+    Without a filter the collection metadata count is used
+    (estimated_document_count); filtered counts are cached for
+    FEEDBACK_COUNT_CACHE_TTL_SECONDS, keyed by the filter.
+    """
+    collection = get_feedbacks_collection()
+
+    if not query:
+        return await collection.estimated_document_count()
+
+    key = repr(sorted(query.items()))
+    total = _count_cache.get(key)
+    if total is None:
+        total = await collection.count_documents(query)
+        _count_cache.set(key, total)
+    return total
+
+
+# Fields read for view="summary" list pages (see schemas.FeedbackSummary)
+SUMMARY_PROJECTION = {
+    "customer_name": 1,
+    "email": 1,
+    "created_at": 1,
+    "analysis.sentiment": 1,
+    "analysis.urgency_level": 1,
+    "analysis.category": 1,
+    "analysis.summary": 1,
+    "agent_success": 1,
+    "analysis_status": 1,
+}
+
 
 async def create_feedback(
     feedback_data: FeedbackCreate,
 ) -> FeedbackDB:
     """
-    Create a new feedback entry with AI analysis.
+    Create a new feedback entry queued for AI analysis.
+
+    The document is saved with analysis_status "pending" and returned
+    immediately; the analysis itself is run by the analysis worker
+    (see app.worker), which also sends the Slack alert on completion.
 
     Args:
         feedback_data: Validated feedback input
 
     Returns:
-        FeedbackDB: Saved feedback with analysis
+        FeedbackDB: Saved feedback awaiting analysis
     """
     request_id = str(uuid.uuid4())[:8]
 
     logger.info(f"[{request_id}] Creating feedback for {feedback_data.email}")
 
-    # Run AI analysis
-    analysis, error = await analyze_message(feedback_data.message, request_id)
-
-    # Phase 2: Set agent_success based on whether analysis succeeded
-    agent_success = analysis is not None
-
     # Prepare document
     doc_data = {
         "customer_name": feedback_data.customer_name,
         "email": feedback_data.email,
         "message": feedback_data.message,
-        "analysis": analysis.model_dump() if analysis else None,
-        "analysis_error": error,
-        "agent_success": agent_success,  # Phase 2
+        "analysis_status": "pending",
     }
 
     doc = feedback_from_dict(doc_data)
@@ -50,46 +113,103 @@ async def create_feedback(
     collection = get_feedbacks_collection()
     result = await collection.insert_one(doc)
 
-    # Retrieve and return
-    saved_doc = await collection.find_one({"_id": result.inserted_id})
-    feedback_dict = feedback_to_dict(saved_doc)
+    # The inserted document is exactly what was written; no need to read it back
+    doc["_id"] = result.inserted_id
+    feedback_dict = feedback_to_dict(doc)
 
     feedback_obj = FeedbackDB(**feedback_dict)
 
-    logger.info(f"[{request_id}] Feedback saved with ID: {feedback_dict['id']}")
+    invalidate_feedback_counts()
+    invalidate_metrics_cache()
+    record_writes("feedbacks")
+    metrics_updates.add(received=1)
 
-    # Phase 2: Send Slack notification for high urgency
-    if agent_success and analysis.urgency_level == "high":
-        logger.info(f"[{request_id}] Sending Slack notification for high urgency feedback")
-        send_slack_notification(feedback_obj)
+    logger.info(f"[{request_id}] Feedback saved with ID: {feedback_dict['id']}, queued for analysis")
 
     return feedback_obj
 
 
-async def get_feedbacks(
-    limit: int = 50,
-    skip: int = 0,
+async def create_feedback_batch(
+    feedbacks: List[FeedbackCreate],
+) -> List[tuple[Optional[FeedbackDB], Optional[str]]]:
+    """
+    Create many feedback entries with a single insert_many.
+
+    All documents are queued for analysis like create_feedback. The insert is
+    unordered, so one failing document does not stop the rest.
+
+    Args:
+        feedbacks: Validated feedback inputs
+
+    Returns:
+        list: (FeedbackDB or None, error_message or None) per input, in order
+    """
+    request_id = str(uuid.uuid4())[:8]
+
+    logger.info(f"[{request_id}] Creating batch of {len(feedbacks)} feedbacks")
+
+    docs = [
+        feedback_from_dict({
+            "customer_name": feedback_data.customer_name,
+            "email": feedback_data.email,
+            "message": feedback_data.message,
+            "analysis_status": "pending",
+        })
+        for feedback_data in feedbacks
+    ]
+
+    collection = get_feedbacks_collection()
+    write_errors: Dict[int, str] = {}
+
+    try:
+        # insert_many sets _id on each document in place
+        await collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            write_errors[error["index"]] = error.get("errmsg", "Insert failed")
+        logger.warning(f"[{request_id}] {len(write_errors)} of {len(docs)} batch inserts failed")
+
+    invalidate_feedback_counts()
+    invalidate_metrics_cache()
+    record_writes("feedbacks")
+    metrics_updates.add(received=len(docs) - len(write_errors))
+
+    results: List[tuple[Optional[FeedbackDB], Optional[str]]] = []
+    for index, doc in enumerate(docs):
+        if index in write_errors:
+            results.append((None, write_errors[index]))
+        else:
+            results.append((FeedbackDB(**feedback_to_dict(doc)), None))
+
+    logger.info(f"[{request_id}] Batch saved: {len(docs) - len(write_errors)} queued for analysis")
+
+    return results
+
+
+def build_feedback_query(
     urgency: Optional[str] = None,
     category: Optional[str] = None,
     sentiment: Optional[str] = None,
     unresolved_only: bool = False,
-) -> tuple[list[FeedbackDB], int]:
+    category_match: str = "exact",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Dict[str, Any]:
     """
-    Get feedbacks with optional filters.
+    Build the MongoDB filter shared by the list and export endpoints.
 
-    Returns:
-        tuple: (list of feedbacks, total count)
+    category is compared with the normalized analysis.category_key (see
+    app.categories), exactly or by prefix depending on category_match.
+    created_from is inclusive and created_to exclusive.
     """
-    collection = get_feedbacks_collection()
-
-    # Build filter query
     query: Dict[str, Any] = {}
 
     if urgency:
         query["analysis.urgency_level"] = urgency
 
     if category:
-        query["analysis.category"] = {"$regex": category, "$options": "i"}
+        # Normalized key, matched exactly or by anchored prefix (indexed)
+        query["analysis.category_key"] = category_filter(category, category_match)
 
     if sentiment:
         query["analysis.sentiment"] = sentiment
@@ -99,17 +219,242 @@ async def get_feedbacks(
         # For now, we'll just filter out null analysis as a proxy
         query["analysis"] = {"$ne": None}
 
-    # Get total count
-    total = await collection.count_documents(query)
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+
+    return query
+
+
+async def get_feedback_documents(
+    limit: int = 50,
+    skip: int = 0,
+    urgency: Optional[str] = None,
+    category: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    unresolved_only: bool = False,
+    after: Optional[Tuple[datetime, ObjectId]] = None,
+    with_total: bool = True,
+    category_match: str = "exact",
+    view: str = "full",
+) -> tuple[list[dict], Optional[int]]:
+    """
+    Get raw feedback documents with optional filters, newest first.
+
+    Pages are ordered by (created_at, _id) descending. When after (a decoded
+    cursor, see models.decode_cursor) is given, the page starts right after
+    that row using an index range scan and skip is ignored. Filters are
+    built by build_feedback_query.
+
+    view="summary" pushes SUMMARY_PROJECTION down to MongoDB, skipping
+    messages and override history.
+
+    Returns:
+        tuple: (list of documents, total count or None if with_total is False)
+    """
+    collection = get_feedbacks_collection()
+
+    query = build_feedback_query(
+        urgency=urgency,
+        category=category,
+        sentiment=sentiment,
+        unresolved_only=unresolved_only,
+        category_match=category_match,
+    )
+
+    # Get total count (cheap or cached, see count_feedbacks)
+    total = await count_feedbacks(query) if with_total else None
+
+    # Keyset pagination: rows strictly after the cursor in (created_at, _id) order
+    page_query = dict(query)
+    if after:
+        after_created_at, after_id = after
+        page_query["$or"] = [
+            {"created_at": {"$lt": after_created_at}},
+            {"created_at": after_created_at, "_id": {"$lt": after_id}},
+        ]
+        skip = 0
 
     # Get feedbacks
-    cursor = collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
-    feedbacks = await cursor.to_list(length=limit)
+    find_cursor = (
+        collection.find(page_query, SUMMARY_PROJECTION if view == "summary" else None)
+        .sort([("created_at", -1), ("_id", -1)])
+        .skip(skip)
+        .limit(limit)
+    )
+    feedbacks = await find_cursor.to_list(length=limit)
+
+    return feedbacks, total
+
+
+async def get_feedbacks(
+    limit: int = 50,
+    skip: int = 0,
+    urgency: Optional[str] = None,
+    category: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    unresolved_only: bool = False,
+    after: Optional[Tuple[datetime, ObjectId]] = None,
+    with_total: bool = True,
+    category_match: str = "exact",
+    view: str = "full",
+) -> tuple[list[Union[FeedbackDB, FeedbackSummary]], Optional[int]]:
+    """
+    Get feedbacks as validated models (see get_feedback_documents).
+
+    Returns:
+        tuple: (FeedbackDB, or FeedbackSummary for view="summary", rows;
+        total count or None if with_total is False)
+    """
+    feedbacks, total = await get_feedback_documents(
+        limit=limit,
+        skip=skip,
+        urgency=urgency,
+        category=category,
+        sentiment=sentiment,
+        unresolved_only=unresolved_only,
+        after=after,
+        with_total=with_total,
+        category_match=category_match,
+        view=view,
+    )
+
+    model = FeedbackSummary if view == "summary" else FeedbackDB
+    return [model(**feedback_to_dict(f)) for f in feedbacks], total
+
+
+async def iter_feedback_documents(query: Dict[str, Any], batch_size: int = 1000) -> AsyncIterator[dict]:
+    """
+    Stream every document matching query, newest first.
+
+    The cursor fetches batch_size documents per getMore, so memory stays
+    bounded by one batch however many documents match. The cursor is
+    closed if the consumer stops early (e.g. a client disconnects).
+    """
+    collection = get_feedbacks_collection()
+    cursor = collection.find(query).sort([("created_at", -1), ("_id", -1)]).batch_size(batch_size)
+    try:
+        async for doc in cursor:
+            yield doc
+    finally:
+        await cursor.close()
+
+
+def current_changes_watermark() -> Tuple[datetime, ObjectId]:
+    """Watermark to start following changes from (now, less the settle window)."""
+    return datetime.utcnow() - timedelta(seconds=FEEDBACK_CHANGES_SETTLE_SECONDS), MIN_OBJECT_ID
+
+
+async def get_feedback_changes(
+    since: Tuple[datetime, ObjectId],
+    limit: int = 500,
+) -> tuple[list[dict], Tuple[datetime, ObjectId], bool]:
+    """
+    Get feedback documents created or modified after a watermark.
+
+    Rows strictly after since in (updated_at, _id) order are returned oldest
+    change first, an index range scan whose cost follows the number of
+    changes rather than the collection size. Documents last written before
+    updated_at was tracked are never returned; they have not changed since.
+
+    The new watermark is the last row returned, but never later than
+    FEEDBACK_CHANGES_SETTLE_SECONDS behind now (nor before since): recent
+    rows are then returned again on the next call rather than risking a
+    late-committing write being skipped. Clients upsert rows by id, so
+    repeats are harmless. A page that reaches into the settle window reports
+    no more changes, so clients wait for their next poll instead of paging
+    over the same rows.
+
+    Args:
+        since: (updated_at, _id) watermark (see models.decode_cursor)
+        limit: Maximum number of rows
+
+    Returns:
+        tuple: (documents, new watermark, whether more changes are waiting)
+    """
+    collection = get_feedbacks_collection()
+    since_updated_at, since_id = since
+
+    query = {
+        "$or": [
+            {"updated_at": {"$gt": since_updated_at}},
+            {"updated_at": since_updated_at, "_id": {"$gt": since_id}},
+        ]
+    }
+    find_cursor = collection.find(query).sort([("updated_at", 1), ("_id", 1)]).limit(limit + 1)
+    docs = await find_cursor.to_list(length=limit + 1)
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    last = (docs[-1]["updated_at"], docs[-1]["_id"]) if docs else since
+    watermark = max(since, min(last, current_changes_watermark()))
+    # Rows past a held-back watermark are unsettled, and so is everything after them
+    has_more = has_more and watermark == last
+
+    return docs, watermark, has_more
+
 
-    # Convert to response format
-    feedback_list = [FeedbackDB(**feedback_to_dict(f)) for f in feedbacks]
+async def search_feedbacks(
+    q: str,
+    limit: int = 50,
+    urgency: Optional[str] = None,
+    category: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    after: Optional[Tuple[float, ObjectId]] = None,
+) -> List[Tuple[FeedbackDB, float]]:
+    """
+    Full-text search over message, summary and recommended action.
+
+    Uses the feedback_text index (see app.indexes). Results are ranked by
+    text score, then _id, both descending; when after (a decoded search
+    cursor, see models.decode_search_cursor) is given, the page starts right
+    after that row.
+
+    Returns:
+        list: (feedback, text score) pairs
+    """
+    collection = get_feedbacks_collection()
+
+    query: Dict[str, Any] = {"$text": {"$search": q}}
+
+    if urgency:
+        query["analysis.urgency_level"] = urgency
+
+    if category:
+        query["analysis.category_key"] = category_filter(category)
+
+    if sentiment:
+        query["analysis.sentiment"] = sentiment
+
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": query},
+        {"$addFields": {"_score": {"$meta": "textScore"}}},
+    ]
 
-    return feedback_list, total
+    if after is not None:
+        after_score, after_id = after
+        pipeline.append({"$match": {"$or": [
+            {"_score": {"$lt": after_score}},
+            {"_score": after_score, "_id": {"$lt": after_id}},
+        ]}})
+
+    pipeline += [
+        {"$sort": {"_score": -1, "_id": -1}},
+        {"$limit": limit},
+    ]
+
+    docs = await collection.aggregate(pipeline).to_list(length=limit)
+
+    results = []
+    for doc in docs:
+        score = doc.pop("_score")
+        results.append((FeedbackDB(**feedback_to_dict(doc)), score))
+
+    return results
 
 
 async def get_feedback_by_id(feedback_id: str) -> Optional[FeedbackDB]:
@@ -126,6 +471,92 @@ async def get_feedback_by_id(feedback_id: str) -> Optional[FeedbackDB]:
     return None
 
 
+def before_override(updated: dict) -> dict:
+    """
+    Reconstruct the document as it was before its latest override.
+
+    The after-image carries everything needed: the last override record
+    holds the field and its old value.
+    """
+    override = updated["overrides"][-1]
+    before = {**updated, "overrides": updated["overrides"][:-1]}
+
+    if isinstance(updated.get("analysis"), dict):
+        before["analysis"] = {**updated["analysis"], override["field"]: override.get("old_value")}
+
+    return before
+
+
+def override_update(override_data: OverrideCreate, overridden_at: datetime) -> List[Dict[str, Any]]:
+    """
+    Build the aggregation-pipeline update that applies one override.
+
+    The old value is read server-side, the override record is appended and
+    the analysis field is set to the new value (when there is an analysis),
+    keeping category_key in step with category. updated_at is set to
+    overridden_at.
+    """
+    field = override_data.field
+
+    # User-supplied values are wrapped in $literal so they are never
+    # interpreted as field paths or operators
+    override_record = {
+        "field": {"$literal": field},
+        "old_value": {"$toString": f"$analysis.{field}"},
+        "new_value": {"$literal": override_data.new_value},
+        "reason": {"$literal": override_data.reason},
+        "overridden_by": {"$literal": override_data.overridden_by},
+        "overridden_at": {"$literal": overridden_at},
+    }
+
+    analysis_changes: Dict[str, Any] = {field: {"$literal": override_data.new_value}}
+    if field == "category":
+        analysis_changes["category_key"] = {"$literal": normalize_category(override_data.new_value)}
+
+    return [
+        {
+            "$set": {
+                "overrides": {
+                    "$concatArrays": [{"$ifNull": ["$overrides", []]}, [override_record]]
+                },
+                "updated_at": {"$literal": overridden_at},
+                "analysis": {
+                    "$cond": [
+                        {"$eq": [{"$type": "$analysis"}, "object"]},
+                        {"$mergeObjects": ["$analysis", analysis_changes]},
+                        "$analysis",
+                    ]
+                },
+            }
+        }
+    ]
+
+
+def apply_override_locally(doc: dict, override_data: OverrideCreate, overridden_at: datetime) -> dict:
+    """Return the after-image override_update would produce for doc, without touching doc."""
+    analysis = doc.get("analysis")
+    old_value = analysis.get(override_data.field) if isinstance(analysis, dict) else None
+
+    after = {
+        **doc,
+        "overrides": list(doc.get("overrides") or []) + [{
+            "field": override_data.field,
+            "old_value": str(old_value) if old_value is not None else None,
+            "new_value": override_data.new_value,
+            "reason": override_data.reason,
+            "overridden_by": override_data.overridden_by,
+            "overridden_at": overridden_at,
+        }],
+        "updated_at": overridden_at,
+    }
+    if isinstance(analysis, dict):
+        after["analysis"] = {**analysis, override_data.field: override_data.new_value}
+        if override_data.field == "category":
+            after["analysis"]["category_key"] = normalize_category(override_data.new_value)
+
+    return after
+
+
 async def apply_override(
     feedback_id: str,
     override_data: OverrideCreate
@@ -133,6 +564,9 @@ async def apply_override(
     """
     Phase 2: Apply human override to AI analysis field.
 
+    The override is applied with a single atomic find_one_and_update using
+    the pipeline update from override_update, returning the after-image.
+
     Args:
         feedback_id: ID of the feedback to override
         override_data: Override details (field, new_value, reason, overridden_by)
@@ -141,56 +575,30 @@ async def apply_override(
         Updated FeedbackDB or None if feedback not found
     """
     collection = get_feedbacks_collection()
+    field = override_data.field
 
     try:
-        # Get current feedback
-        feedback = await collection.find_one({"_id": ObjectId(feedback_id)})
-        if not feedback:
-            logger.warning(f"Feedback {feedback_id} not found for override")
-            return None
-
-        # Get old value from analysis
-        old_value = None
-        if feedback.get("analysis"):
-            old_value = feedback["analysis"].get(override_data.field)
-
-        # Create override record
-        override_record = {
-            "field": override_data.field,
-            "old_value": str(old_value) if old_value is not None else None,
-            "new_value": override_data.new_value,
-            "reason": override_data.reason,
-            "overridden_by": override_data.overridden_by,
-            "overridden_at": datetime.utcnow(),
-        }
-
-        # Update feedback: modify analysis field and append override record
-        update_operations = {
-            "$push": {"overrides": override_record}
-        }
-
-        # Also update the analysis field itself with the new value
-        if feedback.get("analysis"):
-            update_operations["$set"] = {
-                f"analysis.{override_data.field}": override_data.new_value
-            }
-
-        result = await collection.update_one(
+        updated_feedback = await collection.find_one_and_update(
             {"_id": ObjectId(feedback_id)},
-            update_operations
+            override_update(override_data, datetime.utcnow()),
+            return_document=ReturnDocument.AFTER,
         )
 
-        if result.modified_count == 0:
-            logger.warning(f"Failed to apply override to feedback {feedback_id}")
+        if not updated_feedback:
+            logger.warning(f"Feedback {feedback_id} not found for override")
             return None
 
-        # Retrieve and return updated feedback
-        updated_feedback = await collection.find_one({"_id": ObjectId(feedback_id)})
+        old_value = updated_feedback["overrides"][-1].get("old_value")
+
+        invalidate_feedback_counts()
+        record_writes("feedbacks")
+        await record_feedback_change(before_override(updated_feedback), updated_feedback)
+        invalidate_metrics_cache()
         feedback_dict = feedback_to_dict(updated_feedback)
 
         logger.info(
             f"Override applied to feedback {feedback_id}: "
-            f"{override_data.field} changed from '{old_value}' to '{override_data.new_value}' "
+            f"{field} changed from '{old_value}' to '{override_data.new_value}' "
             f"by {override_data.overridden_by}"
         )
 
@@ -199,3 +607,172 @@ async def apply_override(
     except Exception as e:
         logger.error(f"Error applying override to feedback {feedback_id}: {e}", exc_info=True)
         return None
+
+
+def override_target_query(filters: Dict[str, str]) -> Dict[str, Any]:
+    """Query matching feedback whose current analysis matches filters (category by its normalized key)."""
+    query: Dict[str, Any] = {f"analysis.{field}": value for field, value in filters.items() if field != "category"}
+    if "category" in filters:
+        query["analysis.category_key"] = category_filter(filters["category"])
+    return query
+
+
+async def find_override_targets(filters: Dict[str, str], limit: int) -> List[str]:
+    """
+    Find IDs of feedback whose current analysis matches filters exactly
+    (category by its normalized key).
+
+    Args:
+        filters: analysis field -> value (category, urgency_level, sentiment)
+        limit: Maximum number of IDs to return
+
+    Returns:
+        Matching feedback IDs, newest first
+    """
+    collection = get_feedbacks_collection()
+    cursor = collection.find(override_target_query(filters), {"_id": 1}).sort([("created_at", -1), ("_id", -1)]).limit(limit)
+    return [str(doc["_id"]) async for doc in cursor]
+
+
+async def apply_override_batch(
+    overrides: List[Tuple[str, OverrideCreate]],
+    filters: Optional[Dict[str, str]] = None,
+) -> List[Optional[str]]:
+    """
+    Apply many overrides with one find and one bulk_write.
+
+    Each override uses the same pipeline update as apply_override, so old
+    values are captured server-side and audit records are appended. Writes
+    are ordered, so several overrides of the same feedback apply in sequence.
+    Counters and caches are updated once for the whole batch.
+
+    Counter deltas are computed from the documents read up front, so each
+    write is conditional on the document still being in that state (same
+    analysis and number of overrides) and, in filter mode, on still matching
+    the filter. Writes that no longer match are reported as not applied.
+
+    Args:
+        overrides: (feedback_id, override) pairs
+        filters: The filter the targets were selected by (see find_override_targets)
+
+    Returns:
+        list: None for each applied override, or an error message, in input order
+    """
+    request_id = str(uuid.uuid4())[:8]
+    collection = get_feedbacks_collection()
+    errors: List[Optional[str]] = [None] * len(overrides)
+    selection = override_target_query(filters) if filters else {}
+    not_found = "Feedback no longer matches the filter" if filters else "Feedback not found"
+
+    object_ids: Dict[int, ObjectId] = {}
+    for index, (feedback_id, _) in enumerate(overrides):
+        try:
+            object_ids[index] = ObjectId(feedback_id)
+        except (InvalidId, TypeError):
+            errors[index] = "Invalid feedback ID"
+
+    # Current documents, for counter deltas and not-found reporting
+    current: Dict[ObjectId, dict] = {}
+    if object_ids:
+        cursor = collection.find({"_id": {"$in": list(set(object_ids.values()))}, **selection})
+        current = {doc["_id"]: doc async for doc in cursor}
+
+    # MongoDB stores milliseconds; truncate so audit records read back compare equal
+    now = datetime.utcnow()
+    overridden_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    operations: List[UpdateOne] = []
+    op_indexes: List[int] = []
+    changes: List[Tuple[dict, dict]] = []
+
+    for index, (_, override_data) in enumerate(overrides):
+        if errors[index] is not None:
+            continue
+        oid = object_ids[index]
+        if oid not in current:
+            errors[index] = not_found
+            continue
+
+        before = current[oid]
+        operations.append(UpdateOne(
+            {"_id": oid, **selection, **override_state_filter(before)},
+            override_update(override_data, overridden_at),
+        ))
+        op_indexes.append(index)
+
+        after = apply_override_locally(before, override_data, overridden_at)
+        changes.append((before, after))
+        current[oid] = after
+
+    executed = len(operations)
+    if operations:
+        try:
+            result = await collection.bulk_write(operations, ordered=True)
+            matched = result.matched_count
+        except BulkWriteError as e:
+            # Ordered writes stop at the first error
+            write_errors = e.details.get("writeErrors", [])
+            executed = min((error["index"] for error in write_errors), default=0)
+            matched = e.details.get("nMatched", 0)
+            for error in write_errors:
+                errors[op_indexes[error["index"]]] = error.get("errmsg", "Override failed")
+            for op_index in range(executed, len(operations)):
+                if errors[op_indexes[op_index]] is None:
+                    errors[op_indexes[op_index]] = "Not applied: an earlier override in the batch failed"
+            logger.warning(f"[{request_id}] Bulk override stopped after {executed} of {len(operations)} writes")
+
+        applied_ops = list(range(executed))
+        if matched < executed:
+            # Some documents changed since they were read; find which writes landed
+            applied_ops = await _landed_overrides(changes[:executed])
+            for op_index in set(range(executed)) - set(applied_ops):
+                errors[op_indexes[op_index]] = "Feedback changed since it was read, not applied"
+            logger.warning(f"[{request_id}] Bulk override: {executed - len(applied_ops)} writes skipped by concurrent changes")
+
+        if applied_ops:
+            invalidate_feedback_counts()
+            record_writes("feedbacks")
+            await record_feedback_changes([changes[op_index] for op_index in applied_ops])
+            invalidate_metrics_cache()
+
+    failed = sum(error is not None for error in errors)
+    logger.info(f"[{request_id}] Bulk override: {len(overrides) - failed} applied, {failed} failed")
+
+    return errors
+
+
+def override_state_filter(doc: dict) -> Dict[str, Any]:
+    """
+    Filter matching doc only while its analysis and overrides are unchanged.
+
+    Overrides are append-only, so their count identifies the audit trail.
+    """
+    count = len(doc.get("overrides") or [])
+    return {
+        "analysis": doc.get("analysis"),
+        "overrides": {"$size": count} if count else {"$in": [None, []]},
+    }
+
+
+# Audit record fields identifying one override write
+AUDIT_KEYS = ("field", "new_value", "reason", "overridden_by", "overridden_at")
+
+
+async def _landed_overrides(changes: List[Tuple[dict, dict]]) -> List[int]:
+    """
+    Positions in changes whose conditional write was applied.
+
+    A write matched only if the document had exactly the before-image's
+    overrides, so it landed iff its audit record sits right after them.
+    """
+    object_ids = list({before["_id"] for before, _ in changes})
+    cursor = get_feedbacks_collection().find({"_id": {"$in": object_ids}}, {"overrides": 1})
+    trails = {doc["_id"]: doc.get("overrides") or [] async for doc in cursor}
+
+    landed = []
+    for position, (before, after) in enumerate(changes):
+        trail = trails.get(before["_id"], [])
+        at = len(before.get("overrides") or [])
+        record = after["overrides"][-1]
+        if len(trail) > at and all(trail[at].get(key) == record[key] for key in AUDIT_KEYS):
+            landed.append(position)
+    return landed
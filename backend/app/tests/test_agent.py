@@ -67,3 +67,88 @@ async def test_analyze_message_unexpected_error():
         assert analysis is None
         assert error is not None
         assert "unexpected error" in error.lower()
+
+
+@pytest.mark.asyncio
+async def test_analyze_message_cache_hit_on_duplicate():
+    """Test that whitespace/case variants of a message reuse the cached analysis."""
+    from ..analysis_cache import clear_memory_cache
+
+    mock_analysis = FeedbackAnalysis(
+        sentiment="negative",
+        urgency_level="medium",
+        category="shipping",
+        summary="Order has not arrived",
+        recommended_action="Check tracking with the carrier"
+    )
+
+    mock_result = MagicMock()
+    mock_result.output = mock_analysis
+
+    clear_memory_cache()
+
+    with patch('app.ai_agent.agent.run', new_callable=AsyncMock) as mock_run:
+        mock_run.return_value = mock_result
+
+        first, _ = await analyze_message("Where is my order?", request_id="cache-1")
+        second, error = await analyze_message("  where is   MY order? ", request_id="cache-2")
+
+        assert mock_run.call_count == 1
+        assert error is None
+        assert second == first
+
+
+@pytest.mark.asyncio
+async def test_batcher_fans_out_and_falls_back_on_invalid_item():
+    """Test that one batched call serves several callers and invalid items are retried alone."""
+    import asyncio
+    from ..ai_agent import AnalysisBatcher
+    from ..schemas import BatchAnalysisItem
+
+    batch_result = MagicMock()
+    batch_result.output = [
+        BatchAnalysisItem(
+            index=0,
+            sentiment="positive",
+            urgency_level="low",
+            category="product",
+            summary="Customer likes the app",
+            recommended_action="Thank the customer"
+        ),
+        BatchAnalysisItem(
+            index=1,
+            sentiment="negative",
+            urgency_level="critical",  # Not a valid urgency level
+            category="billing",
+            summary="Customer was overcharged",
+            recommended_action="Refund the difference"
+        ),
+    ]
+
+    fallback_result = MagicMock()
+    fallback_result.output = FeedbackAnalysis(
+        sentiment="negative",
+        urgency_level="high",
+        category="billing",
+        summary="Customer was overcharged",
+        recommended_action="Refund the difference"
+    )
+
+    with patch('app.ai_agent.batch_agent.run', new_callable=AsyncMock) as mock_batch_run, \
+            patch('app.ai_agent.agent.run', new_callable=AsyncMock) as mock_run:
+        mock_batch_run.return_value = batch_result
+        mock_run.return_value = fallback_result
+
+        batcher = AnalysisBatcher(window_ms=10, max_items=20)
+        (first, _), (second, error) = await asyncio.gather(
+            batcher.submit("Love the app", "b-1"),
+            batcher.submit("You overcharged me", "b-2"),
+        )
+
+        assert mock_batch_run.call_count == 1
+        assert mock_run.call_count == 1
+        assert first.category == "product"
+        assert second.urgency_level == "high"
+        assert error is None
+        assert batcher.stats()["batches"] == 1
+        assert batcher.stats()["fallbacks"] == 1
@@ -1,9 +1,13 @@
+import json
+import asyncio
 import pytest
 from httpx import AsyncClient
 from unittest.mock import patch, AsyncMock
 from ..main import app
-from ..schemas import FeedbackAnalysis, FeedbackDB
+from ..schemas import FeedbackAnalysis, FeedbackDB, FeedbackResponse
+from ..models import feedback_to_dict
 from datetime import datetime
+from bson import ObjectId
 
 
 @pytest.mark.asyncio
@@ -25,7 +29,7 @@ async def test_create_feedback_success():
     )
 
     with patch('app.api.routes_feedback.create_feedback', new_callable=AsyncMock) as mock_create:
-        with patch('app.api.routes_feedback.manager.broadcast', new_callable=AsyncMock):
+        with patch('app.api.routes_feedback.manager.publish'):
             mock_create.return_value = mock_feedback
 
             async with AsyncClient(app=app, base_url="http://test") as client:
@@ -38,7 +42,7 @@ async def test_create_feedback_success():
                     }
                 )
 
-            assert response.status_code == 201
+            assert response.status_code == 202
             data = response.json()
             assert data["customer_name"] == "John Doe"
             assert data["email"] == "john@example.com"
@@ -65,23 +69,28 @@ async def test_create_feedback_validation_error():
 async def test_list_feedbacks():
     """Test listing feedbacks with filters."""
     mock_feedbacks = [
-        FeedbackDB(
-            id="507f1f77bcf86cd799439011",
-            customer_name="Jane Smith",
-            email="jane@example.com",
-            message="Billing issue",
-            created_at=datetime.utcnow(),
-            analysis=FeedbackAnalysis(
-                sentiment="negative",
-                urgency_level="high",
-                category="billing",
-                summary="Customer has billing problem",
-                recommended_action="Contact immediately"
-            )
-        )
+        {
+            "_id": ObjectId("507f1f77bcf86cd799439011"),
+            "customer_name": "Jane Smith",
+            "email": "jane@example.com",
+            "message": "Billing issue",
+            "created_at": datetime.utcnow(),
+            "analysis": {
+                "sentiment": "negative",
+                "urgency_level": "high",
+                "category": "billing",
+                "category_key": "billing",
+                "summary": "Customer has billing problem",
+                "recommended_action": "Contact immediately",
+            },
+            "agent_success": True,
+            "overrides": [],
+            "analysis_status": "completed",
+            "analysis_attempts": 1,
+        }
     ]
 
-    with patch('app.api.routes_feedback.get_feedbacks', new_callable=AsyncMock) as mock_get:
+    with patch('app.api.routes_feedback.get_feedback_documents', new_callable=AsyncMock) as mock_get:
         mock_get.return_value = (mock_feedbacks, 1)
 
         async with AsyncClient(app=app, base_url="http://test") as client:
@@ -92,6 +101,9 @@ async def test_list_feedbacks():
         assert data["total"] == 1
         assert len(data["feedbacks"]) == 1
         assert data["feedbacks"][0]["analysis"]["urgency_level"] == "high"
+        # Response matches the validated model exactly; internal fields are not exposed
+        expected = FeedbackResponse(**feedback_to_dict(dict(mock_feedbacks[0]))).model_dump(mode="json")
+        assert data["feedbacks"][0] == expected
 
 
 @pytest.mark.asyncio
@@ -133,3 +145,619 @@ async def test_health_endpoint():
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_create_feedback_batch_partial_success():
+    """Test batch ingestion reports per-item results and broadcasts once."""
+    saved = FeedbackDB(
+        id="507f1f77bcf86cd799439012",
+        customer_name="Ann Lee",
+        email="ann@example.com",
+        message="Export is broken",
+        created_at=datetime.utcnow(),
+        analysis_status="pending",
+    )
+
+    with patch('app.api.routes_feedback.create_feedback_batch', new_callable=AsyncMock) as mock_batch:
+        with patch('app.api.routes_feedback.manager.publish_batch') as mock_publish:
+            mock_batch.return_value = [(saved, None)]
+
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/feedback/batch",
+                    json={
+                        "items": [
+                            {"customer_name": "Ann Lee", "email": "ann@example.com", "message": "Export is broken"},
+                            {"customer_name": "", "email": "not-an-email", "message": "Hi"},
+                        ]
+                    }
+                )
+
+            assert response.status_code == 202
+            data = response.json()
+            assert data["accepted"] == 1
+            assert data["failed"] == 1
+            assert data["results"][0] == {"index": 0, "success": True, "id": saved.id, "error": None}
+            assert data["results"][1]["success"] is False
+            assert "email" in data["results"][1]["error"]
+            mock_publish.assert_called_once()
+            assert mock_publish.call_args.args[0] == "feedbacks:new_batch"
+
+
+@pytest.mark.asyncio
+async def test_list_feedbacks_keyset_cursor():
+    """Test that a full page returns a next_cursor that is passed back to the service."""
+    from ..models import decode_cursor
+
+    created_at = datetime(2025, 1, 15, 10, 30)
+    mock_feedbacks = [
+        {
+            "_id": ObjectId("507f1f77bcf86cd799439013"),
+            "customer_name": "Kim Park",
+            "email": "kim@example.com",
+            "message": "App is slow",
+            "created_at": created_at,
+            "analysis": None,
+            "overrides": [],
+        }
+    ]
+
+    with patch('app.api.routes_feedback.get_feedback_documents', new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = (mock_feedbacks, 5)
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.get("/api/feedback?limit=1")
+            next_cursor = first.json()["next_cursor"]
+            await client.get(f"/api/feedback?limit=1&cursor={next_cursor}")
+            invalid = await client.get("/api/feedback?limit=1&cursor=not-a-cursor")
+
+    assert decode_cursor(next_cursor) == (created_at, ObjectId("507f1f77bcf86cd799439013"))
+    assert mock_get.await_args_list[0].kwargs["after"] is None
+    assert mock_get.await_args_list[1].kwargs["after"] == decode_cursor(next_cursor)
+    assert mock_get.await_count == 2
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_count_feedbacks_uses_estimate_and_cache():
+    """Test unfiltered totals use the metadata count and filtered totals are cached until a write."""
+    from unittest.mock import MagicMock
+    from ..services import count_feedbacks, invalidate_feedback_counts
+
+    collection = MagicMock()
+    collection.estimated_document_count = AsyncMock(return_value=1000)
+    collection.count_documents = AsyncMock(return_value=42)
+
+    invalidate_feedback_counts()
+
+    with patch('app.services.get_feedbacks_collection', return_value=collection):
+        assert await count_feedbacks({}) == 1000
+        assert await count_feedbacks({"analysis.urgency_level": "high"}) == 42
+        assert await count_feedbacks({"analysis.urgency_level": "high"}) == 42
+        assert collection.count_documents.await_count == 1
+
+        invalidate_feedback_counts()
+        await count_feedbacks({"analysis.urgency_level": "high"})
+        assert collection.count_documents.await_count == 2
+
+    collection.estimated_document_count.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_apply_override_single_round_trip():
+    """Test overrides are applied with one find_one_and_update and counters see the prior state."""
+    from unittest.mock import MagicMock
+    from ..schemas import OverrideCreate
+    from ..services import apply_override
+
+    feedback_id = ObjectId()
+    after = {
+        "_id": feedback_id,
+        "customer_name": "John Doe",
+        "email": "john@example.com",
+        "message": "I was charged twice this month",
+        "created_at": datetime(2024, 1, 15, 9, 30),
+        "analysis": {
+            "sentiment": "negative",
+            "urgency_level": "high",
+            "category": "technical",
+            "summary": "Double charge",
+            "recommended_action": "Refund",
+        },
+        "agent_success": True,
+        "overrides": [{
+            "field": "category",
+            "old_value": "billing",
+            "new_value": "technical",
+            "reason": "Miscategorized",
+            "overridden_by": "reviewer@example.com",
+            "overridden_at": datetime(2024, 1, 15, 10, 0),
+        }],
+    }
+    collection = MagicMock()
+    collection.find_one_and_update = AsyncMock(return_value=after)
+    collection.find_one = AsyncMock()
+    collection.update_one = AsyncMock()
+
+    override = OverrideCreate(
+        field="category", new_value="technical", reason="Miscategorized", overridden_by="reviewer@example.com"
+    )
+
+    with patch('app.services.get_feedbacks_collection', return_value=collection), \
+         patch('app.services.record_feedback_change', new_callable=AsyncMock) as mock_record:
+        result = await apply_override(str(feedback_id), override)
+
+    collection.find_one_and_update.assert_awaited_once()
+    collection.find_one.assert_not_awaited()
+    collection.update_one.assert_not_awaited()
+    assert result.analysis.category == "technical"
+
+    before, _ = mock_record.await_args.args
+    assert before["analysis"]["category"] == "billing"
+    assert before["overrides"] == []
+
+
+@pytest.mark.asyncio
+async def test_apply_override_batch_skips_concurrently_changed_feedback():
+    """Test batch writes are conditional on the state read and only landed writes reach the counters."""
+    from unittest.mock import MagicMock
+    from ..schemas import OverrideCreate
+    from ..services import apply_override_batch
+
+    def feedback(category):
+        return {
+            "_id": ObjectId(),
+            "created_at": datetime(2024, 1, 15, 9, 30),
+            "agent_success": True,
+            "analysis": {"sentiment": "negative", "urgency_level": "high", "category": category},
+            "overrides": [],
+        }
+
+    docs = [feedback("technical"), feedback("technical")]
+    override = OverrideCreate(
+        field="category", new_value="billing", reason="Miscategorized", overridden_by="reviewer@example.com"
+    )
+
+    def find(query, projection=None):
+        async def cursor():
+            if projection is None:
+                for doc in docs:
+                    yield doc
+            else:
+                # Re-read after the write: only the first document was still "technical"
+                yield {"_id": docs[0]["_id"], "overrides": [written_record()]}
+                yield {"_id": docs[1]["_id"], "overrides": [{"field": "urgency_level"}]}
+        return cursor()
+
+    def written_record():
+        update = collection.bulk_write.await_args.args[0][0]._doc[0]["$set"]
+        return {
+            "field": "category", "new_value": "billing", "reason": "Miscategorized",
+            "overridden_by": "reviewer@example.com", "overridden_at": update["updated_at"]["$literal"],
+        }
+
+    collection = MagicMock()
+    collection.find = MagicMock(side_effect=find)
+    collection.bulk_write = AsyncMock(return_value=MagicMock(matched_count=1))
+
+    with patch('app.services.get_feedbacks_collection', return_value=collection), \
+         patch('app.services.record_feedback_changes', new_callable=AsyncMock) as mock_record:
+        errors = await apply_override_batch(
+            [(str(doc["_id"]), override) for doc in docs], filters={"category": "technical"}
+        )
+
+    assert errors == [None, "Feedback changed since it was read, not applied"]
+    operations = collection.bulk_write.await_args.args[0]
+    assert operations[0]._filter == {
+        "_id": docs[0]["_id"],
+        "analysis.category_key": "technical",
+        "analysis": docs[0]["analysis"],
+        "overrides": {"$in": [None, []]},
+    }
+    (before, after), = mock_record.await_args.args[0]
+    assert before["_id"] == docs[0]["_id"]
+    assert after["analysis"]["category"] == "billing"
+
+
+@pytest.mark.asyncio
+async def test_override_batch_by_filter():
+    """Test a filter plus one override is applied as one batch with a single compact broadcast."""
+    override = {
+        "field": "category",
+        "new_value": "billing",
+        "reason": "Charges were miscategorized",
+        "overridden_by": "reviewer@example.com",
+    }
+    target_ids = ["507f1f77bcf86cd799439021", "507f1f77bcf86cd799439022"]
+
+    with patch('app.api.routes_overrides.find_override_targets', new_callable=AsyncMock) as mock_find, \
+         patch('app.api.routes_overrides.apply_override_batch', new_callable=AsyncMock) as mock_apply, \
+         patch('app.api.routes_overrides.manager.broadcast') as mock_broadcast:
+        mock_find.return_value = target_ids
+        mock_apply.return_value = [None, "Feedback not found"]
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.post(
+                "/api/feedback/overrides/batch",
+                json={"filter": {"category": "technical"}, "override": override},
+            )
+            invalid = await client.post(
+                "/api/feedback/overrides/batch",
+                json={"filter": {}, "override": override},
+            )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["applied"] == 1
+    assert data["failed"] == 1
+    assert mock_find.await_args.args[0] == {"category": "technical"}
+    mock_apply.assert_awaited_once()
+    mock_broadcast.assert_called_once_with({
+        "type": "feedbacks:overridden",
+        "data": [{"id": target_ids[0], "field": "category", "new_value": "billing"}],
+    })
+    assert invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_search_feedbacks_ranked_with_cursor():
+    """Test search returns a score-based next_cursor that is passed back to the service."""
+    from ..models import decode_search_cursor
+
+    results = [
+        (
+            FeedbackDB(
+                id=f"507f1f77bcf86cd7994390{30 + i}",
+                customer_name="Jane Smith",
+                email="jane@example.com",
+                message="Error E1234 when exporting",
+                created_at=datetime(2025, 1, 15, 10, 30),
+            ),
+            3.5 - i,
+        )
+        for i in range(2)
+    ]
+
+    with patch('app.api.routes_feedback.search_feedbacks', new_callable=AsyncMock) as mock_search:
+        mock_search.return_value = results
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.get("/api/feedback/search?q=E1234&limit=2&urgency=high")
+            cursor = first.json()["next_cursor"]
+            await client.get(f"/api/feedback/search?q=E1234&limit=2&cursor={cursor}")
+            invalid = await client.get("/api/feedback/search?q=E1234&cursor=bogus")
+
+    assert first.status_code == 200
+    assert [f["id"] for f in first.json()["feedbacks"]] == [results[0][0].id, results[1][0].id]
+    assert decode_search_cursor(cursor) == (2.5, ObjectId(results[1][0].id))
+    assert mock_search.await_args_list[0].kwargs["urgency"] == "high"
+    assert mock_search.await_args_list[1].kwargs["after"] == (2.5, ObjectId(results[1][0].id))
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_feedbacks_summary_view():
+    """Test view=summary pushes a projection down and returns slim rows."""
+    from unittest.mock import MagicMock
+    from ..services import SUMMARY_PROJECTION
+
+    doc = {
+        "_id": ObjectId("507f1f77bcf86cd799439041"),
+        "customer_name": "Jane Smith",
+        "email": "jane@example.com",
+        "created_at": datetime(2025, 1, 15, 10, 30),
+        "analysis": {"sentiment": "negative", "urgency_level": "high", "category": "billing", "summary": "Double charge"},
+        "agent_success": True,
+        "analysis_status": "completed",
+    }
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.skip.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=[doc])
+    collection = MagicMock()
+    collection.find = MagicMock(return_value=cursor)
+
+    with patch('app.services.get_feedbacks_collection', return_value=collection):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/feedback?view=summary&with_total=false")
+
+    assert response.status_code == 200
+    assert collection.find.call_args.args[1] == SUMMARY_PROJECTION
+    row = response.json()["feedbacks"][0]
+    assert row["id"] == "507f1f77bcf86cd799439041"
+    assert row["analysis"]["category"] == "billing"
+    assert "message" not in row
+    assert "overrides" not in row
+
+
+@pytest.mark.asyncio
+async def test_export_feedbacks_streams_ndjson_and_gzip_csv():
+    """Test the export endpoint streams NDJSON and gzipped CSV with filters applied."""
+    import csv
+    import gzip
+    import io
+    import json
+
+    docs = [
+        {
+            "_id": ObjectId(f"507f1f77bcf86cd7994390{i:02d}"),
+            "customer_name": "Jane Smith",
+            "email": "jane@example.com",
+            "message": f"Message {i}, with a comma",
+            "created_at": datetime(2025, 1, 15, 10, i),
+            "analysis": {
+                "sentiment": "negative",
+                "urgency_level": "high",
+                "category": "billing",
+                "category_key": "billing",
+                "summary": "Double charge",
+                "recommended_action": "Refund",
+            },
+            "agent_success": True,
+            "overrides": [],
+            "analysis_status": "completed",
+        }
+        for i in range(3)
+    ]
+    queries = []
+
+    async def fake_iter(query, batch_size=1000):
+        queries.append(query)
+        for doc in docs:
+            yield doc
+
+    with patch('app.api.routes_feedback.iter_feedback_documents', new=fake_iter):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            ndjson = await client.get("/api/feedback/export?urgency=high&created_from=2025-01-01T00:00:00")
+            gz = await client.get("/api/feedback/export?format=csv&gzip=true")
+            invalid = await client.get(
+                "/api/feedback/export?created_from=2025-02-01T00:00:00&created_to=2025-01-01T00:00:00"
+            )
+            # One bound with a timezone, one without (taken as UTC)
+            mixed = await client.get(
+                "/api/feedback/export?created_from=2024-01-01T02:00:00%2B02:00&created_to=2024-02-01T00:00:00"
+            )
+
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [line["id"] for line in lines] == [str(doc["_id"]) for doc in docs]
+    assert "category_key" not in lines[0]["analysis"]
+    assert queries[0] == {"analysis.urgency_level": "high", "created_at": {"$gte": datetime(2025, 1, 1)}}
+
+    assert gz.status_code == 200
+    assert gz.headers["content-disposition"] == 'attachment; filename="feedback.csv.gz"'
+    rows = list(csv.reader(io.StringIO(gzip.decompress(gz.content).decode("utf-8"))))
+    assert rows[0][:3] == ["id", "created_at", "customer_name"]
+    assert len(rows) == 4
+    assert rows[1][4] == "Message 0, with a comma"
+
+    assert invalid.status_code == 400
+
+    assert mixed.status_code == 200
+    assert queries[-1] == {"created_at": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 2, 1)}}
+
+
+@pytest.mark.asyncio
+async def test_feedback_changes_pages_by_watermark():
+    """Test the changes feed pages on (updated_at, _id) and holds a caught-up watermark back."""
+    from unittest.mock import MagicMock
+    from ..models import decode_cursor
+    from ..services import MIN_OBJECT_ID
+
+    old = datetime(2025, 1, 15, 10, 0)
+    recent = datetime.utcnow()
+    docs = [
+        {
+            "_id": ObjectId(f"507f1f77bcf86cd7994390{i:02d}"),
+            "customer_name": "Jane Smith",
+            "email": "jane@example.com",
+            "message": "Charged twice",
+            "created_at": old,
+            "updated_at": updated_at,
+            "analysis": None,
+            "overrides": [],
+            "analysis_status": "pending",
+        }
+        for i, updated_at in enumerate([old, old, recent])
+    ]
+    pages = [docs[:3], docs[2:], docs[2:] * 2]
+    collection = MagicMock()
+    collection.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(side_effect=pages)
+
+    with patch('app.services.get_feedbacks_collection', return_value=collection):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.get("/api/feedback/changes?since=2025-01-01T00:00:00Z&limit=2")
+            second = await client.get(f"/api/feedback/changes?since={first.json()['watermark']}&limit=2")
+            busy = await client.get(f"/api/feedback/changes?since={first.json()['watermark']}&limit=1")
+            start = await client.get("/api/feedback/changes")
+            invalid = await client.get("/api/feedback/changes?since=yesterday")
+
+    assert first.status_code == 200
+    assert [row["id"] for row in first.json()["feedbacks"]] == [str(doc["_id"]) for doc in docs[:2]]
+    assert first.json()["has_more"] is True
+    assert decode_cursor(first.json()["watermark"]) == (old, docs[1]["_id"])
+
+    # Caught up: the recent row is returned, but the watermark stays behind it
+    assert [row["id"] for row in second.json()["feedbacks"]] == [str(docs[2]["_id"])]
+    assert second.json()["has_more"] is False
+    watermark_at, watermark_id = decode_cursor(second.json()["watermark"])
+    assert old < watermark_at < recent
+    assert watermark_id == MIN_OBJECT_ID
+
+    # A full page ending inside the settle window is held back too, and does not ask for more
+    assert busy.json()["has_more"] is False
+    assert old < decode_cursor(busy.json()["watermark"])[0] < recent
+
+    first_query = collection.find.call_args_list[0].args[0]
+    assert first_query["$or"][0] == {"updated_at": {"$gt": datetime(2025, 1, 1)}}
+    assert collection.find.return_value.sort.call_args.args[0] == [("updated_at", 1), ("_id", 1)]
+
+    assert start.json()["feedbacks"] == []
+    assert collection.find.call_count == 3
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_feedbacks_conditional_get_and_compression():
+    """Test list ETags answer revalidation with 304 until a write, and large bodies are compressed."""
+    from ..versions import record_writes
+
+    mock_feedbacks = [
+        {
+            "_id": ObjectId(f"507f1f77bcf86cd7994390{i:02d}"),
+            "customer_name": "Jane Smith",
+            "email": "jane@example.com",
+            "message": "I was charged twice this month and support has not replied",
+            "created_at": datetime(2025, 1, 15, 10, i),
+            "analysis": None,
+            "overrides": [],
+            "analysis_status": "pending",
+        }
+        for i in range(20)
+    ]
+
+    with patch('app.api.routes_feedback.get_feedback_documents', new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = (mock_feedbacks, 20)
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            first = await client.get("/api/feedback?limit=20", headers={"Accept-Encoding": "br"})
+            etag = first.headers["etag"]
+            revalidated = await client.get("/api/feedback?limit=20", headers={"If-None-Match": etag})
+            other_query = await client.get("/api/feedback?limit=10", headers={"If-None-Match": etag})
+
+            record_writes("feedbacks")
+            after_write = await client.get(
+                "/api/feedback?limit=20", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"}
+            )
+
+    assert first.status_code == 200
+    assert etag.startswith('W/"')
+    assert first.headers["content-encoding"] == "br"
+    assert len(first.json()["feedbacks"]) == 20
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert other_query.status_code == 200
+
+    assert after_write.status_code == 200
+    assert after_write.headers["etag"] != etag
+    assert after_write.headers["content-encoding"] == "gzip"
+    assert mock_get.await_count == 3
+
+
+class FakeWebSocket:
+    """Minimal WebSocket double; stalled clients never complete a send."""
+
+    def __init__(self, stalled: bool = False):
+        self.stalled = stalled
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+@pytest.mark.asyncio
+async def test_broadcast_drops_slow_client_without_blocking_others():
+    """Test broadcast enqueues without awaiting and disconnects a client whose queue overflows."""
+    from ..realtime import ConnectionManager
+
+    manager = ConnectionManager(max_queue=2, send_timeout=5)
+    fast = [FakeWebSocket(), FakeWebSocket()]
+    slow = FakeWebSocket(stalled=True)
+    for websocket in fast + [slow]:
+        await manager.connect(websocket)
+
+    # The stalled sender holds message 0; messages 1-2 fill its queue and 3 overflows
+    for i in range(4):
+        manager.broadcast({"type": "feedbacks:new", "data": {"n": i}})
+        await asyncio.sleep(0.01)
+
+    assert [json.loads(text)["data"]["n"] for text in fast[0].sent] == [0, 1, 2, 3]
+    assert fast[1].sent == fast[0].sent
+    assert slow not in manager.active_connections
+    assert slow.closed_with == 1013
+    stats = manager.stats()
+    assert stats["connections"] == 2
+    assert stats["dropped_clients"] == 1
+
+    await manager.shutdown()
+    assert manager.active_connections == {}
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_only_matching_subscription_groups():
+    """Test feedback events reach unfiltered clients and subscribers whose filter matches."""
+    from ..realtime import ConnectionManager, subscription_key
+    from ..schemas import FeedbackSubscription
+
+    manager = ConnectionManager(max_queue=10, send_timeout=5)
+    everything, on_call, on_call_2, low = FakeWebSocket(), FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    for websocket in (everything, on_call, on_call_2, low):
+        await manager.connect(websocket)
+    for websocket in (on_call, on_call_2):
+        manager.subscribe(websocket, subscription_key(FeedbackSubscription(urgency=["high"], category=[" Billing "])))
+    manager.subscribe(low, subscription_key(FeedbackSubscription(urgency=["low"])))
+    assert manager.stats()["subscription_groups"] == 3
+
+    def feedback(n, urgency=None, category=None):
+        analysis = {"urgency_level": urgency, "sentiment": "negative", "category": category} if urgency else None
+        return {"id": str(n), "analysis": analysis}
+
+    manager.publish("feedbacks:new", feedback(0))
+    # "Payment" normalizes to the billing key through the default aliases
+    manager.publish("feedbacks:updated", feedback(1, "high", "Payment"))
+    manager.publish_batch(
+        "feedbacks:new_batch", [feedback(2, "high", "billing"), feedback(3, "low", "billing"), feedback(4)]
+    )
+    await asyncio.sleep(0.01)
+
+    def received(websocket):
+        return [(m["type"], [f["id"] for f in m["data"]] if isinstance(m["data"], list) else m["data"]["id"])
+                for m in map(json.loads, websocket.sent)]
+
+    assert received(everything) == [
+        ("feedbacks:new", "0"), ("feedbacks:updated", "1"), ("feedbacks:new_batch", ["2", "3", "4"])
+    ]
+    assert received(on_call) == [("feedbacks:updated", "1"), ("feedbacks:new_batch", ["2"])]
+    assert received(on_call_2) == received(on_call)
+    assert received(low) == [("feedbacks:new_batch", ["3"])]
+
+    manager.disconnect(low)
+    assert manager.stats()["subscription_groups"] == 2
+    await manager.shutdown()
+
+
+def test_websocket_subscribe_handshake():
+    """Test the subscribe message is acknowledged, validated and heartbeats still work."""
+    from fastapi.testclient import TestClient
+    from ..realtime import manager
+
+    client = TestClient(app)
+    with client.websocket_connect("/api/ws/feedbacks") as websocket:
+        websocket.send_text(json.dumps({"type": "subscribe", "urgency": ["high"], "category": ["billing"]}))
+        ack = websocket.receive_json()
+        assert ack == {
+            "type": "subscribed",
+            "filter": {"urgency": ["high"], "sentiment": None, "category": ["billing"]},
+        }
+        connection = next(iter(manager.active_connections.values()))
+        assert connection.filter_key == (frozenset({"high"}), None, frozenset({"billing"}))
+
+        websocket.send_text(json.dumps({"type": "subscribe", "urgency": ["urgent"]}))
+        assert websocket.receive_json()["type"] == "error"
+
+        websocket.send_text("ping")
+        assert websocket.receive_json() == {"type": "pong"}
@@ -0,0 +1,31 @@
+from unittest.mock import patch
+from ..cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that the oldest unused entry is evicted when full."""
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_expires_entries():
+    """Test that entries are dropped once their TTL has passed."""
+    cache = TTLCache(max_entries=10, ttl_seconds=5)
+
+    with patch('app.cache.time.monotonic', return_value=100.0):
+        cache.set("a", 1)
+
+    with patch('app.cache.time.monotonic', return_value=106.0):
+        assert cache.get("a") is None
+
+    assert cache.expirations == 1
+    assert cache.stats()["misses"] == 1
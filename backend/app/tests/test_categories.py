@@ -0,0 +1,35 @@
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from ..categories import normalize_category, category_filter
+from ..services import get_feedbacks
+
+
+def test_normalize_category():
+    """Test category keys are trimmed, lowercased, whitespace-collapsed and alias-mapped."""
+    assert normalize_category("  Billing ") == "billing"
+    assert normalize_category("Technical   Issue") == "technical"
+    assert normalize_category("Mobile App") == "mobile app"
+    assert normalize_category("   ") is None
+    assert category_filter("Bug Report") == "bug"
+    assert category_filter("Tech.", match="prefix") == {"$regex": r"^tech\."}
+
+
+@pytest.mark.asyncio
+async def test_get_feedbacks_filters_on_category_key():
+    """Test the list filter queries the indexed category_key instead of a regex on category."""
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.skip.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=[])
+    collection = MagicMock()
+    collection.find = MagicMock(return_value=cursor)
+
+    with patch('app.services.get_feedbacks_collection', return_value=collection):
+        await get_feedbacks(category=" Billing Issue", with_total=False)
+        await get_feedbacks(category="bill", category_match="prefix", with_total=False)
+
+    exact_query = collection.find.call_args_list[0].args[0]
+    prefix_query = collection.find.call_args_list[1].args[0]
+    assert exact_query == {"analysis.category_key": "billing"}
+    assert prefix_query == {"analysis.category_key": {"$regex": "^bill"}}
@@ -0,0 +1,150 @@
+import json
+import asyncio
+import pytest
+from unittest.mock import patch
+from ..events import MongoChangeStreamEventBus
+from ..realtime import ConnectionManager
+from .test_api import FakeWebSocket
+
+
+class FakeChangeStream:
+    """Async context manager / iterator over inserts, like a Motor change stream."""
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        change = await self.queue.get()
+        self.resume_token = {"_data": change["_id"]}
+        return change
+
+
+class FakeEventsCollection:
+    """realtime_events stand-in: every open change stream sees every insert once."""
+
+    def __init__(self):
+        self.streams = []
+        self.inserted = 0
+
+    async def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            self.inserted += 1
+            for stream in self.streams:
+                stream.put_nowait({"_id": self.inserted, "operationType": "insert", "fullDocument": doc})
+
+    def watch(self, pipeline, resume_after=None):
+        queue = asyncio.Queue()
+        self.streams.append(queue)
+        return FakeChangeStream(queue)
+
+
+@pytest.mark.asyncio
+async def test_mongo_event_bus_fans_out_across_processes_exactly_once():
+    """Test events published in one process reach every process's clients exactly once."""
+    collection = FakeEventsCollection()
+
+    with patch('app.events.get_realtime_events_collection', return_value=collection):
+        # Two API processes and a standalone worker that only publishes
+        api_1 = ConnectionManager(bus=MongoChangeStreamEventBus())
+        api_2 = ConnectionManager(bus=MongoChangeStreamEventBus())
+        worker_bus = MongoChangeStreamEventBus()
+        await api_1.start()
+        await api_2.start()
+        await asyncio.wait_for(api_1.bus.watching.wait(), 1)
+        await asyncio.wait_for(api_2.bus.watching.wait(), 1)
+
+        client_1, client_2 = FakeWebSocket(), FakeWebSocket()
+        await api_1.connect(client_1)
+        await api_2.connect(client_2)
+
+        api_1.publish("feedbacks:new", {"id": "1", "analysis": None})
+        worker_bus.publish({"scope": "feedback", "type": "feedbacks:updated", "data": {"id": "1", "analysis": None}})
+        api_2.broadcast({"type": "feedbacks:overridden", "data": [{"id": "1"}]})
+
+        await worker_bus.stop()
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            if len(client_1.sent) == 3 and len(client_2.sent) == 3:
+                break
+
+        await api_1.shutdown()
+        await api_2.shutdown()
+
+    expected = ["feedbacks:new", "feedbacks:updated", "feedbacks:overridden"]
+    assert sorted(json.loads(text)["type"] for text in client_1.sent) == sorted(expected)
+    assert sorted(json.loads(text)["type"] for text in client_2.sent) == sorted(expected)
+    assert collection.inserted == 3
+    assert api_1.bus.stats()["received"] == 3
+
+
+@pytest.mark.asyncio
+async def test_mongo_event_bus_restarts_publisher_without_losing_queued_events():
+    """Test a crashed publish task is restarted on the same queue."""
+    collection = FakeEventsCollection()
+    calls = []
+
+    def events_collection():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("not connected")
+        return collection
+
+    with patch('app.events.get_realtime_events_collection', side_effect=events_collection):
+        bus = MongoChangeStreamEventBus()
+        bus.publish({"scope": "feedback", "type": "feedbacks:new"})
+        await asyncio.sleep(0.01)
+        assert bus._publisher.done()
+
+        # Queued while the publisher was down
+        bus._queue.put_nowait({"event": {"scope": "feedback", "type": "feedbacks:updated"}})
+        bus.publish({"scope": "feedback", "type": "feedbacks:overridden"})
+        await bus.stop()
+
+    assert collection.inserted == 2
+
+
+@pytest.mark.asyncio
+async def test_mongo_event_bus_reopens_from_now_when_resume_fails():
+    """Test a non-resumable change stream error drops the resume token instead of retrying it forever."""
+    from pymongo.errors import OperationFailure
+
+    collection = FakeEventsCollection()
+    watch = collection.watch
+    resumed_from = []
+
+    def watch_or_fail(pipeline, resume_after=None):
+        resumed_from.append(resume_after)
+        if resume_after is not None:
+            raise OperationFailure("Resume of change stream was not possible", code=286)
+        return watch(pipeline)
+
+    collection.watch = watch_or_fail
+
+    with patch('app.events.get_realtime_events_collection', return_value=collection):
+        api = ConnectionManager(bus=MongoChangeStreamEventBus(retry_seconds=10))
+        api.bus._resume_token = {"_data": "expired"}
+        await api.start()
+        await asyncio.wait_for(api.bus.watching.wait(), 1)
+
+        client = FakeWebSocket()
+        await api.connect(client)
+        api.publish("feedbacks:new", {"id": "1", "analysis": None})
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            if client.sent:
+                break
+
+        await api.shutdown()
+
+    assert resumed_from == [{"_data": "expired"}, None]
+    assert [json.loads(text)["type"] for text in client.sent] == ["feedbacks:new"]
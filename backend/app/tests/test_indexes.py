@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from ..indexes import QueryShape, explain_query_shape
+
+
+@pytest.mark.asyncio
+async def test_explain_flags_collscan():
+    """Test that a COLLSCAN in the winning plan is flagged (rejected plans ignored)."""
+    explain = {
+        "queryPlanner": {
+            "winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}},
+            "rejectedPlans": [{"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "x"}}],
+        }
+    }
+    database = MagicMock()
+    database.command = AsyncMock(return_value=explain)
+
+    with patch('app.indexes.get_database', return_value=database):
+        report = await explain_query_shape(
+            QueryShape("list_recent", "feedbacks", "find", sort=[("created_at", -1)])
+        )
+
+    assert report["collscan"] is True
+    assert report["stages"] == ["SORT", "COLLSCAN"]
+    assert report["indexes_used"] == []
+
+
+@pytest.mark.asyncio
+async def test_explain_reports_index_scan():
+    """Test that index names used by the winning plan are reported."""
+    explain = {
+        "queryPlanner": {
+            "winningPlan": {
+                "stage": "FETCH",
+                "inputStage": {"stage": "IXSCAN", "indexName": "urgency_created_at"},
+            },
+        }
+    }
+    database = MagicMock()
+    database.command = AsyncMock(return_value=explain)
+
+    with patch('app.indexes.get_database', return_value=database):
+        report = await explain_query_shape(
+            QueryShape("count_by_urgency", "feedbacks", "count", filter={"analysis.urgency_level": "high"})
+        )
+
+    assert report["collscan"] is False
+    assert report["indexes_used"] == ["urgency_created_at"]
+    assert database.command.await_args.args[1] == {
+        "count": "feedbacks", "query": {"analysis.urgency_level": "high"}
+    }
@@ -0,0 +1,84 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ..integrations import SlackNotifier, parse_retry_after
+
+
+class StubWebhookHandler(BaseHTTPRequestHandler):
+    """Responds with the next queued status code and records request bodies."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.received.append(json.loads(body))
+        status, headers = self.server.responses.pop(0) if self.server.responses else (200, {})
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_webhook():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubWebhookHandler)
+    server.received = []
+    server.responses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_slack_notifier_retries_rate_limited_delivery(stub_webhook):
+    """Test that a 429 with Retry-After is retried and then delivered."""
+    stub_webhook.responses = [(429, {"Retry-After": "0"}), (503, {}), (200, {})]
+    url = f"http://127.0.0.1:{stub_webhook.server_address[1]}/hook"
+    notifier = SlackNotifier(url, backoff_base=0.01)
+
+    assert notifier.enqueue({"text": "hello"}, "test message")
+    await notifier.flush()
+
+    stats = notifier.stats()
+    await notifier.stop()
+
+    assert len(stub_webhook.received) == 3
+    assert stub_webhook.received[-1] == {"text": "hello"}
+    assert stats["delivered"] == 1
+    assert stats["retries"] == 2
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slack_notifier_does_not_retry_client_errors(stub_webhook):
+    """Test that a 4xx other than 429 fails without retrying."""
+    stub_webhook.responses = [(400, {})]
+    url = f"http://127.0.0.1:{stub_webhook.server_address[1]}/hook"
+    notifier = SlackNotifier(url, backoff_base=0.01)
+
+    notifier.enqueue({"text": "bad"}, "test message")
+    await notifier.flush()
+    stats = notifier.stats()
+    await notifier.stop()
+
+    assert len(stub_webhook.received) == 1
+    assert stats["failed"] == 1
+    assert stats["retries"] == 0
+
+
+def test_slack_notifier_skips_when_not_configured():
+    """Test that nothing is queued without a webhook URL."""
+    assert SlackNotifier(None).enqueue({"text": "hello"}) is False
+
+
+def test_parse_retry_after():
+    """Test Retry-After parsing for seconds and invalid values."""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
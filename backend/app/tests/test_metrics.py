@@ -0,0 +1,509 @@
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import patch, AsyncMock, MagicMock
+from ..metrics import compute_accuracy, cached_metric, invalidate_metrics_cache
+from ..counters import BUILT_ID, apply_counter_deltas, counter_deltas, read_accuracy
+from ..sentiment_rollup import (
+    BUILT_ID as ROLLUP_BUILT_ID,
+    backfill_sentiment_rollup,
+    read_sentiment_trend,
+    sentiment_deltas,
+)
+
+
+def mock_aggregate_collection(results):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=results)
+    collection = MagicMock()
+    collection.aggregate = MagicMock(return_value=cursor)
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_compute_accuracy_single_aggregation():
+    """Test overall and per-category accuracy from one $group result."""
+    collection = mock_aggregate_collection([
+        {"_id": "billing", "processed": 10, "overridden": 2},
+        {"_id": "technical", "processed": 5, "overridden": 0},
+        {"_id": None, "processed": 5, "overridden": 1},  # failed analyses have no category
+    ])
+
+    with patch('app.metrics.get_feedbacks_collection', return_value=collection):
+        accuracy = await compute_accuracy()
+
+    collection.aggregate.assert_called_once()
+    assert accuracy.total_processed == 20
+    assert accuracy.total_overridden == 3
+    assert accuracy.overall_accuracy == pytest.approx(0.85)
+    assert accuracy.by_category == {"billing": pytest.approx(0.8), "technical": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_compute_accuracy_empty_collection():
+    """Test accuracy defaults to 1.0 with nothing processed."""
+    with patch('app.metrics.get_feedbacks_collection', return_value=mock_aggregate_collection([])):
+        accuracy = await compute_accuracy()
+
+    assert accuracy.total_processed == 0
+    assert accuracy.overall_accuracy == 1.0
+    assert accuracy.by_category == {}
+
+
+def test_counter_deltas_for_analysis_and_override():
+    """Test counter deltas for analysis completion and a category override."""
+    created_at = datetime(2024, 1, 15, 9, 30)
+    pending = {"created_at": created_at, "agent_success": None, "analysis": None, "overrides": []}
+    analyzed = {
+        "created_at": created_at,
+        "agent_success": True,
+        "analysis": {"category": "billing", "urgency_level": "high", "sentiment": "negative"},
+        "overrides": [],
+    }
+    overridden = {
+        **analyzed,
+        "analysis": {**analyzed["analysis"], "category": "technical"},
+        "overrides": [{"field": "category"}],
+    }
+
+    assert counter_deltas(pending, analyzed) == {
+        "global": {"processed": 1, "urgency.high": 1},
+        "category:billing": {"processed": 1},
+    }
+    assert counter_deltas(analyzed, overridden) == {
+        "global": {"overridden": 1},
+        "category:billing": {"processed": -1},
+        "category:technical": {"processed": 1, "overridden": 1},
+    }
+
+
+def test_sentiment_deltas_for_analysis_and_override():
+    """Test rollup deltas move a day's sentiment between categories on a category override."""
+    created_at = datetime(2024, 1, 15, 9, 30)
+    pending = {"created_at": created_at, "agent_success": None, "analysis": None, "overrides": []}
+    analyzed = {
+        "created_at": created_at,
+        "agent_success": True,
+        "analysis": {"category": "billing", "urgency_level": "high", "sentiment": "negative"},
+        "overrides": [],
+    }
+    overridden = {**analyzed, "analysis": {**analyzed["analysis"], "category": "technical"}}
+
+    assert sentiment_deltas(pending, analyzed) == {
+        "2024-01-15": {"negative": 1, "categories.billing.negative": 1},
+    }
+    assert sentiment_deltas(analyzed, overridden) == {
+        "2024-01-15": {"categories.billing.negative": -1, "categories.technical.negative": 1},
+    }
+    assert sentiment_deltas(analyzed, analyzed) == {}
+
+
+@pytest.mark.asyncio
+async def test_read_sentiment_trend_uses_rollup_only_once_built():
+    """Test the trend is aggregated from feedbacks until the rollup is backfilled, even if days exist."""
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    cursor = MagicMock()
+    cursor.sort.return_value.to_list = AsyncMock(return_value=[
+        {"_id": today, "positive": 2, "neutral": 0, "negative": 1},
+        {"_id": "2000-01-01", "positive": 0, "neutral": 0, "negative": 0},
+    ])
+    rollup = MagicMock()
+    rollup.find = MagicMock(return_value=cursor)
+    markers = MagicMock()
+    markers.find_one = AsyncMock(return_value=None)
+
+    with patch('app.sentiment_rollup.get_sentiment_daily_collection', return_value=rollup), \
+         patch('app.sentiment_rollup.get_metrics_counters_collection', return_value=markers), \
+         patch('app.sentiment_rollup.compute_sentiment_trend', new_callable=AsyncMock) as mock_compute:
+        mock_compute.return_value = ["aggregated"]
+
+        # One day written since deploy, history not backfilled yet
+        assert await read_sentiment_trend(days=7) == ["aggregated"]
+        rollup.find.assert_not_called()
+
+        markers.find_one.return_value = {"_id": ROLLUP_BUILT_ID, "kind": "marker"}
+        trends = await read_sentiment_trend(days=7)
+
+    mock_compute.assert_awaited_once_with(days=7)
+    markers.find_one.assert_awaited_with({"_id": ROLLUP_BUILT_ID})
+    # Days with no sentiment left are skipped
+    assert [(t.date, t.positive, t.negative) for t in trends] == [(today, 2, 1)]
+
+
+@pytest.mark.asyncio
+async def test_backfill_sentiment_rollup_corrects_days_and_marks_full_history_built():
+    """Test the backfill corrects days by $inc, keeping concurrent deltas, and only a full run sets the marker."""
+    groups = [
+        {"_id": {"date": "2025-01-14", "sentiment": "negative", "category": "billing"}, "count": 3},
+        {"_id": {"date": "2025-01-14", "sentiment": "positive", "category": "bug.report"}, "count": 1},
+        {"_id": {"date": "2025-01-15", "sentiment": "neutral", "category": None}, "count": 2},
+    ]
+
+    async def aggregate(pipeline):
+        created_at = pipeline[0]["$match"]["created_at"]
+        for group in groups:
+            if created_at["$gte"].strftime("%Y-%m-%d") <= group["_id"]["date"] < created_at["$lt"].strftime("%Y-%m-%d"):
+                yield group
+
+    feedbacks = MagicMock()
+    feedbacks.aggregate = aggregate
+    feedbacks.find_one = AsyncMock(return_value={"created_at": datetime(2025, 1, 13, 8, 0)})
+
+    rollup = FakeCountersCollection()
+    rollup.docs = {
+        "2025-01-13": {"_id": "2025-01-13", "negative": 1},  # no analyzed feedback left that day
+        "2025-01-14": {"_id": "2025-01-14", "positive": 1, "negative": 2, "categories": {"billing": {"negative": 2}}},
+    }
+    # A delta recorded by the worker after the backfill read the stored days
+    rollup.after_find = lambda: rollup.docs.setdefault("2025-01-15", {"_id": "2025-01-15"}).update(neutral=1)
+    markers = FakeCountersCollection()
+
+    with patch('app.sentiment_rollup.get_feedbacks_collection', return_value=feedbacks), \
+         patch('app.sentiment_rollup.get_sentiment_daily_collection', return_value=rollup), \
+         patch('app.sentiment_rollup.get_metrics_counters_collection', return_value=markers), \
+         patch('app.build_claims.get_metrics_counters_collection', return_value=markers):
+        written = await backfill_sentiment_rollup(chunk_days=100000)
+        assert ROLLUP_BUILT_ID in markers.docs
+
+        del markers.docs[ROLLUP_BUILT_ID]
+        rollup.after_find = None
+        await backfill_sentiment_rollup(days=7, chunk_days=100000)
+        assert ROLLUP_BUILT_ID not in markers.docs
+
+        # Another process is backfilling
+        markers.docs["building:sentiment_daily"] = {
+            "_id": "building:sentiment_daily", "kind": "marker", "owner": "other", "expires_at": datetime(2100, 1, 1)
+        }
+        assert await backfill_sentiment_rollup(chunk_days=100000) == 0
+        assert ROLLUP_BUILT_ID not in markers.docs
+
+    assert written == 3
+    assert rollup.docs["2025-01-13"]["negative"] == 0
+    assert rollup.docs["2025-01-14"] == {
+        "_id": "2025-01-14", "positive": 1, "negative": 3,
+        "categories": {"billing": {"negative": 3}, "bug_report": {"positive": 1}},
+    }
+    assert rollup.docs["2025-01-15"]["neutral"] == 3
+    assert [doc_id for doc_id in markers.docs if doc_id.startswith("building:")] == ["building:sentiment_daily"]
+
+
+@pytest.mark.asyncio
+async def test_read_accuracy_from_counters():
+    """Test accuracy is built from counter documents without aggregating feedbacks."""
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[
+        {"_id": BUILT_ID, "kind": "marker"},
+        {"_id": "global", "kind": "global", "processed": 20, "overridden": 3},
+        {"_id": "category:billing", "kind": "category", "name": "billing", "processed": 10, "overridden": 2},
+        {"_id": "category:technical", "kind": "category", "name": "technical", "processed": 5, "overridden": 0},
+    ])
+    counters_collection = MagicMock()
+    counters_collection.find = MagicMock(return_value=cursor)
+
+    with patch('app.counters.get_metrics_counters_collection', return_value=counters_collection), \
+         patch('app.counters.compute_accuracy', new_callable=AsyncMock) as mock_compute:
+        accuracy = await read_accuracy()
+
+    mock_compute.assert_not_awaited()
+    assert accuracy.total_processed == 20
+    assert accuracy.overall_accuracy == pytest.approx(0.85)
+    assert accuracy.by_category == {"billing": pytest.approx(0.8), "technical": 1.0}
+
+
+class FakeCursor:
+    """Motor cursor stand-in supporting to_list and async iteration."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield doc
+        return iterate()
+
+
+def matches(doc: dict, query: dict) -> bool:
+    operators = {
+        "$in": lambda value, arg: value in arg,
+        "$ne": lambda value, arg: value != arg,
+        "$lte": lambda value, arg: value is not None and value <= arg,
+        "$gte": lambda value, arg: value is not None and value >= arg,
+        "$lt": lambda value, arg: value is not None and value < arg,
+    }
+    for field, condition in query.items():
+        if isinstance(condition, dict):
+            if not all(operators[op](doc.get(field), arg) for op, arg in condition.items()):
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+class FakeCountersCollection:
+    """metrics_counters / sentiment_daily stand-in supporting the reads and writes counters use."""
+
+    def __init__(self):
+        self.docs = {}
+        # Called after each find, to simulate a concurrent write landing just after a read
+        self.after_find = None
+
+    def find(self, query):
+        cursor = FakeCursor([dict(doc) for doc in self.docs.values() if matches(doc, query)])
+        if self.after_find:
+            self.after_find()
+        return cursor
+
+    async def find_one(self, query):
+        doc = self.docs.get(query["_id"])
+        return doc if doc is not None and matches(doc, query) else None
+
+    async def insert_one(self, doc):
+        from pymongo.errors import DuplicateKeyError
+
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def find_one_and_update(self, query, update):
+        doc = await self.find_one(query)
+        if doc is None:
+            return None
+        before = dict(doc)
+        doc.update(update["$set"])
+        return before
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = {"_id": query["_id"], **doc}
+
+    async def delete_one(self, query):
+        doc = await self.find_one(query)
+        if doc is not None:
+            del self.docs[doc["_id"]]
+
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            counter_id = operation._filter["_id"]
+            doc = self.docs.setdefault(counter_id, {"_id": counter_id, **operation._doc.get("$setOnInsert", {})})
+            for field, value in operation._doc["$inc"].items():
+                target = doc
+                *parents, name = field.split(".")
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[name] = target.get(name, 0) + value
+
+
+@pytest.mark.asyncio
+async def test_build_claim_is_exclusive_until_released_or_expired():
+    """Test only one process holds a build claim, and an expired claim can be taken over."""
+    from ..build_claims import build_claim
+
+    counters = FakeCountersCollection()
+
+    with patch('app.build_claims.get_metrics_counters_collection', return_value=counters):
+        async with build_claim("counters") as first:
+            async with build_claim("counters") as second:
+                assert (first, second) == (True, False)
+        assert "building:counters" not in counters.docs
+
+        # Left behind by a crashed process
+        counters.docs["building:counters"] = {
+            "_id": "building:counters", "kind": "marker", "owner": "dead", "expires_at": datetime(2000, 1, 1)
+        }
+        async with build_claim("counters") as taken_over:
+            assert taken_over
+        assert "building:counters" not in counters.docs
+
+
+@pytest.mark.asyncio
+async def test_counters_repair_corrects_without_overwriting_concurrent_deltas():
+    """Test a repair corrects counters by $inc under a build claim, keeping deltas written meanwhile."""
+    from ..counters import ensure_counters_built
+
+    async def aggregate(pipeline):
+        if pipeline[1]["$group"]["_id"] == "$analysis.category":
+            yield {"_id": "billing", "processed": 10, "overridden": 2}
+        else:
+            yield {"_id": "high", "count": 4}
+
+    feedbacks = MagicMock()
+    feedbacks.aggregate = aggregate
+    counters = FakeCountersCollection()
+    counters.docs = {
+        "global": {"_id": "global", "kind": "global", "processed": 3},
+        "category:old": {"_id": "category:old", "kind": "category", "name": "old", "processed": 1},
+    }
+
+    def concurrent_delta():
+        counters.docs["global"]["processed"] += 1
+
+    with patch('app.counters.get_feedbacks_collection', return_value=feedbacks), \
+         patch('app.counters.get_metrics_counters_collection', return_value=counters), \
+         patch('app.build_claims.get_metrics_counters_collection', return_value=counters):
+        # Another replica is building
+        counters.docs["building:counters"] = {
+            "_id": "building:counters", "kind": "marker", "owner": "other", "expires_at": datetime(2100, 1, 1)
+        }
+        assert await ensure_counters_built() is False
+        assert BUILT_ID not in counters.docs
+        del counters.docs["building:counters"]
+
+        counters.after_find = concurrent_delta
+        assert await ensure_counters_built() is True
+
+    assert counters.docs["global"]["processed"] == 11
+    assert counters.docs["global"]["overridden"] == 2
+    assert counters.docs["global"]["urgency"] == {"high": 4}
+    assert counters.docs["category:billing"]["processed"] == 10
+    assert counters.docs["category:old"]["processed"] == 0
+    assert BUILT_ID in counters.docs
+    assert "building:counters" not in counters.docs
+    invalidate_metrics_cache()
+
+
+@pytest.mark.asyncio
+async def test_counters_fall_back_to_feedbacks_until_built():
+    """Test a delta applied before the counters are built does not replace the full totals."""
+    from httpx import AsyncClient
+    from ..main import app
+
+    # Existing deployment: 15 analyzed feedbacks, counters never built
+    feedbacks = mock_aggregate_collection([
+        {"_id": "billing", "processed": 10, "overridden": 2},
+        {"_id": "technical", "processed": 5, "overridden": 0},
+    ])
+    feedbacks.count_documents = AsyncMock(
+        side_effect=lambda query: {"low": 4, "medium": 6, "high": 5}[query["analysis.urgency_level"]]
+    )
+    counters = FakeCountersCollection()
+
+    with patch('app.metrics.get_feedbacks_collection', return_value=feedbacks), \
+         patch('app.counters.get_metrics_counters_collection', return_value=counters), \
+         patch('app.counters.get_database', return_value=MagicMock()):
+        # First analysis completed after deploy
+        await apply_counter_deltas({"global": {"processed": 1, "urgency.high": 1}, "category:billing": {"processed": 1}})
+        invalidate_metrics_cache()
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            accuracy = (await client.get("/api/metrics/accuracy")).json()
+            urgency = (await client.get("/api/metrics/urgency-breakdown")).json()
+
+        assert accuracy["total_processed"] == 15
+        assert accuracy["total_overridden"] == 2
+        assert urgency == {"low": 4, "medium": 6, "high": 5, "total": 15}
+
+        # Once built, the counters are trusted
+        counters.docs[BUILT_ID] = {"_id": BUILT_ID, "kind": "marker"}
+        assert (await read_accuracy()).total_processed == 1
+
+    invalidate_metrics_cache()
+
+
+@pytest.mark.asyncio
+async def test_cached_metric_single_flight_and_invalidation():
+    """Test concurrent misses share one computation and invalidation forces a recompute."""
+    invalidate_metrics_cache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        value = {"value": calls}
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(*[cached_metric(("test", 1), compute) for _ in range(5)])
+    assert calls == 1
+    assert all(result == {"value": 1} for result in results)
+
+    # Served from cache
+    assert await cached_metric(("test", 1), compute) == {"value": 1}
+    assert calls == 1
+
+    invalidate_metrics_cache()
+    assert await cached_metric(("test", 1), compute) == {"value": 2}
+    assert calls == 2
+
+    # A miss after an invalidation does not join the computation started before it
+    invalidate_metrics_cache()
+    stale = asyncio.ensure_future(cached_metric(("test", 1), compute))
+    await asyncio.sleep(0)
+    invalidate_metrics_cache()
+    fresh = await cached_metric(("test", 1), compute)
+    assert (await stale, fresh) == ({"value": 3}, {"value": 4})
+    assert await cached_metric(("test", 1), compute) == {"value": 4}
+    assert calls == 4
+
+
+@pytest.mark.asyncio
+async def test_remote_writes_bump_versions_and_drop_cached_metrics():
+    """Test a counters write reported by another process changes the ETag and drops cached metrics."""
+    from ..realtime import manager
+    from ..versions import write_versions
+
+    invalidate_metrics_cache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return {"value": calls}
+
+    await cached_metric(("test", 2), compute)
+    before = write_versions.get("metrics_counters")
+
+    # Events from this process are already applied locally
+    manager.dispatch({"scope": "writes", "origin": write_versions.epoch, "collections": ["metrics_counters"]})
+    assert write_versions.get("metrics_counters") == before
+
+    manager.dispatch({"scope": "writes", "origin": "worker-1", "collections": ["metrics_counters"]})
+    assert write_versions.get("metrics_counters") != before
+    assert await cached_metric(("test", 2), compute) == {"value": 2}
+
+
+@pytest.mark.asyncio
+async def test_metrics_updates_coalesced_per_interval():
+    """Test metrics deltas are summed into at most one frame per interval."""
+    from ..metrics_updates import MetricsUpdateCoalescer
+
+    frames = []
+    coalescer = MetricsUpdateCoalescer(interval=0.05, emit=frames.append)
+
+    created_at = datetime(2024, 1, 15, 9, 30)
+    pending = {"created_at": created_at, "agent_success": None, "analysis": None, "overrides": []}
+    analyzed = {
+        "created_at": created_at,
+        "agent_success": True,
+        "analysis": {"category": "billing", "urgency_level": "high", "sentiment": "negative"},
+        "overrides": [],
+    }
+    overridden = {**analyzed, "analysis": {**analyzed["analysis"], "urgency_level": "low"}, "overrides": [{}]}
+
+    coalescer.add(received=2)
+    coalescer.add(counter_deltas=counter_deltas(pending, analyzed), sentiment_deltas=sentiment_deltas(pending, analyzed))
+    await asyncio.sleep(0.01)
+    assert len(frames) == 1
+    assert frames[0] == {
+        "received": 2,
+        "processed": 1,
+        "urgency": {"high": 1},
+        "sentiment": {"negative": 1},
+        "categories": {"billing": {"processed": 1}},
+        "sentiment_trend": {"2024-01-15": {"negative": 1}},
+    }
+
+    # Within the interval: held back, then sent as one frame
+    coalescer.add(counter_deltas=counter_deltas(analyzed, overridden))
+    coalescer.add(received=1)
+    await asyncio.sleep(0.01)
+    assert len(frames) == 1
+    await asyncio.sleep(0.06)
+    assert frames[1] == {
+        "received": 1,
+        "overridden": 1,
+        "urgency": {"high": -1, "low": 1},
+        "categories": {"billing": {"overridden": 1}},
+    }
@@ -0,0 +1,153 @@
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+from bson import ObjectId
+from datetime import datetime
+from ..worker import AnalysisWorker
+from ..schemas import FeedbackAnalysis
+
+
+def make_leased_doc(attempts: int = 1) -> dict:
+    return {
+        "_id": ObjectId("507f1f77bcf86cd799439011"),
+        "customer_name": "John Doe",
+        "email": "john@example.com",
+        "message": "I was charged twice!",
+        "created_at": datetime.utcnow(),
+        "analysis": None,
+        "analysis_error": None,
+        "agent_success": None,
+        "overrides": [],
+        "analysis_status": "processing",
+        "analysis_attempts": attempts,
+        "lease_owner": "test-worker",
+    }
+
+
+@pytest.mark.asyncio
+async def test_worker_completes_leased_feedback():
+    """Test that a leased feedback is analyzed, saved and reported."""
+    analysis = FeedbackAnalysis(
+        sentiment="negative",
+        urgency_level="medium",
+        category="billing",
+        summary="Customer was double charged",
+        recommended_action="Refund the duplicate charge"
+    )
+    completed = {
+        **make_leased_doc(),
+        "analysis": analysis.model_dump(),
+        "agent_success": True,
+        "analysis_status": "completed",
+    }
+    on_complete = AsyncMock()
+
+    with patch('app.worker.lease_next', new_callable=AsyncMock) as mock_lease, \
+            patch('app.worker.has_queued_feedback', new_callable=AsyncMock, return_value=False), \
+            patch('app.worker.complete_lease', new_callable=AsyncMock) as mock_complete, \
+            patch('app.worker.analyze_message', new_callable=AsyncMock) as mock_analyze:
+        mock_lease.side_effect = [make_leased_doc(), None, None]
+        mock_analyze.return_value = (analysis, None)
+        mock_complete.return_value = completed
+
+        worker = AnalysisWorker(on_complete=on_complete, worker_id="test-worker")
+        await worker.run(stop_when_idle=True)
+
+        mock_complete.assert_awaited_once()
+        on_complete.assert_awaited_once()
+        feedback = on_complete.await_args.args[0]
+        assert feedback.analysis_status == "completed"
+        assert feedback.analysis.category == "billing"
+
+
+@pytest.mark.asyncio
+async def test_worker_releases_failed_analysis_for_retry():
+    """Test that a failed analysis is returned to the queue while attempts remain."""
+    on_complete = AsyncMock()
+
+    with patch('app.worker.lease_next', new_callable=AsyncMock) as mock_lease, \
+            patch('app.worker.has_queued_feedback', new_callable=AsyncMock, return_value=False), \
+            patch('app.worker.complete_lease', new_callable=AsyncMock) as mock_complete, \
+            patch('app.worker.release_lease', new_callable=AsyncMock) as mock_release, \
+            patch('app.worker.analyze_message', new_callable=AsyncMock) as mock_analyze:
+        mock_lease.side_effect = [make_leased_doc(attempts=1), None, None]
+        mock_analyze.return_value = (None, "Unexpected error: timeout")
+
+        worker = AnalysisWorker(on_complete=on_complete, worker_id="test-worker")
+        await worker.run(stop_when_idle=True)
+
+        mock_release.assert_awaited_once()
+        mock_complete.assert_not_awaited()
+        on_complete.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_worker_stop_when_idle_waits_for_delayed_retries():
+    """Test stop_when_idle keeps polling until a released retry has been analyzed."""
+    analysis = FeedbackAnalysis(
+        sentiment="negative",
+        urgency_level="medium",
+        category="billing",
+        summary="Customer was double charged",
+        recommended_action="Refund the duplicate charge"
+    )
+    completed = {**make_leased_doc(attempts=2), "analysis": analysis.model_dump(), "analysis_status": "completed"}
+
+    with patch('app.worker.lease_next', new_callable=AsyncMock) as mock_lease, \
+            patch('app.worker.has_queued_feedback', new_callable=AsyncMock) as mock_queued, \
+            patch('app.worker.complete_lease', new_callable=AsyncMock) as mock_complete, \
+            patch('app.worker.release_lease', new_callable=AsyncMock) as mock_release, \
+            patch('app.worker.analyze_message', new_callable=AsyncMock) as mock_analyze, \
+            patch('app.worker.WORKER_POLL_INTERVAL', 0):
+        # The retry is not leasable until its delay has passed
+        mock_lease.side_effect = [make_leased_doc(attempts=1), None, None, make_leased_doc(attempts=2), None, None]
+        mock_queued.side_effect = [True, False]
+        mock_analyze.side_effect = [(None, "Unexpected error: timeout"), (analysis, None)]
+        mock_complete.return_value = completed
+
+        worker = AnalysisWorker(worker_id="test-worker")
+        await worker.run(stop_when_idle=True)
+
+        mock_release.assert_awaited_once()
+        mock_complete.assert_awaited_once()
+        assert mock_queued.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_times_out_analysis_before_lease_expires():
+    """Test an analysis outlasting its time limit is released for a retry instead of running past the lease."""
+    async def slow_analysis(message, request_id):
+        await asyncio.sleep(10)
+
+    with patch('app.worker.lease_next', new_callable=AsyncMock) as mock_lease, \
+            patch('app.worker.has_queued_feedback', new_callable=AsyncMock, return_value=False), \
+            patch('app.worker.complete_lease', new_callable=AsyncMock) as mock_complete, \
+            patch('app.worker.release_lease', new_callable=AsyncMock) as mock_release, \
+            patch('app.worker.analyze_message', new=slow_analysis):
+        mock_lease.side_effect = [make_leased_doc(attempts=1), None, None]
+
+        worker = AnalysisWorker(worker_id="test-worker", analysis_timeout=0.05)
+        await asyncio.wait_for(worker.run(stop_when_idle=True), timeout=1)
+
+        mock_release.assert_awaited_once()
+        assert "timed out" in mock_release.await_args.args[2]
+        mock_complete.assert_not_awaited()
+
+    # The timeout is always kept shorter than the lease
+    assert AnalysisWorker(worker_id="test-worker", analysis_timeout=10_000).analysis_timeout < 10_000
+
+
+@pytest.mark.asyncio
+async def test_worker_does_not_lease_after_stop_requested():
+    """Test a worker stopped while waiting for a free slot leases nothing more."""
+    with patch('app.worker.lease_next', new_callable=AsyncMock) as mock_lease:
+        worker = AnalysisWorker(concurrency=1, worker_id="test-worker")
+        await worker._semaphore.acquire()
+        runner = asyncio.create_task(worker.run())
+        await asyncio.sleep(0)
+
+        worker.request_stop()
+        worker._semaphore.release()
+        await asyncio.wait_for(runner, timeout=1)
+
+    mock_lease.assert_not_awaited()
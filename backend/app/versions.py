@@ -0,0 +1,116 @@
+"""
+Per-collection write versions and conditional GET (weak ETag) helpers.
+
+Every write bumps the version of the collections it changed (record_writes):
+feedback creation, analysis progress and overrides bump "feedbacks", and
+counter / rollup updates bump "metrics_counters" / "sentiment_daily". GET
+endpoints derive a weak ETag from the versions of what they read plus the
+request path and query, so a revalidation (If-None-Match) of unchanged data
+is answered with 304 from memory, without querying MongoDB or serializing
+anything. The ETags are weak because the same data may be sent gzip or
+brotli encoded.
+
+Versions are counted in process memory. Each process picks a random epoch
+that is part of every version, so ETags issued by another process or before
+a restart never match by accident. record_writes() also publishes the bump
+on the event bus (see app.events); other processes bump their own versions
+and run the on_remote_writes callbacks, which drop their cached list totals
+and metrics.
+"""
+import uuid
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from fastapi import Request, Response
+from .realtime import manager
+
+logger = logging.getLogger(__name__)
+
+RemoteWritesCallback = Callable[[List[str]], None]
+
+
+class WriteVersions:
+    """Monotonic per-collection write counters for this process."""
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._remote_callbacks: List[RemoteWritesCallback] = []
+
+    def get(self, *collections: str) -> str:
+        """Combined version of collections, e.g. "3f2a9c1e:17"."""
+        return ":".join([self.epoch, *(str(self._versions[c]) for c in collections)])
+
+    def bump(self, collections: Iterable[str]):
+        for collection in collections:
+            self._versions[collection] += 1
+
+    def on_remote_writes(self, callback: RemoteWritesCallback):
+        """Run callback(collections) when another process reports writes."""
+        self._remote_callbacks.append(callback)
+
+    def handle_event(self, event: Dict[str, Any]):
+        """Apply a "writes" event from the bus (events from this process are skipped)."""
+        if event.get("origin") == self.epoch:
+            return
+        collections = event["collections"]
+        self.bump(collections)
+        for callback in self._remote_callbacks:
+            try:
+                callback(collections)
+            except Exception as e:
+                logger.error(f"Error handling remote writes to {collections}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"epoch": self.epoch, "versions": dict(self._versions)}
+
+
+# Shared versions for this process
+write_versions = WriteVersions()
+manager.on_event("writes", write_versions.handle_event)
+
+
+def record_writes(*collections: str):
+    """Bump collection versions here and in every other process."""
+    write_versions.bump(collections)
+    manager.bus.publish({"scope": "writes", "origin": write_versions.epoch, "collections": list(collections)})
+
+
+def resource_etag(request: Request, *collections: str, extra: str = "") -> str:
+    """
+    Weak ETag for a GET of data read from collections.
+
+    Compute it before reading the data: a write that lands in between then
+    leaves the ETag older than the body, which only costs a 200 next time.
+
+    Args:
+        request: The request (path and query parameters are part of the tag)
+        collections: Collections the response is built from
+        extra: Anything else the response depends on (e.g. the current date)
+    """
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    source = f"{write_versions.get(*collections)}|{request.url.path}|{query}|{extra}"
+    return f'W/"{hashlib.blake2b(source.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """Headers for a response carrying an ETag (revalidated on every use)."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the request's If-None-Match matches etag, else None."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=etag_headers(etag))
+    return None
@@ -0,0 +1,348 @@
+"""
+Analysis worker: drains the feedback analysis queue.
+
+POST /api/feedback saves feedback with analysis_status "pending" and returns
+immediately. Workers lease pending documents from MongoDB with an atomic
+find_one_and_update, run the AI analysis and write the result back.
+
+A lease that is not completed before it expires (crashed worker, lost node)
+becomes leasable again, and results are only written by the current lease
+owner, so any number of worker processes can drain the same collection
+without double-processing. Each analysis is cut off after
+WORKER_ANALYSIS_TIMEOUT_SECONDS, shorter than the lease, so a slow LLM call
+is retried by this worker rather than re-leased by another while it runs.
+
+Run standalone with:
+    python -m app.worker
+"""
+import os
+import uuid
+import signal
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from .db import connect_to_mongo, close_mongo_connection, get_feedbacks_collection
+from .ai_agent import ANALYSIS_BATCH_MAX_ITEMS, ANALYSIS_BATCHING_ENABLED, analyze_message
+from .integrations import send_slack_notification, slack_notifier
+from .models import feedback_to_dict
+from .categories import analysis_document
+from .indexes import ensure_indexes
+from .services import invalidate_feedback_counts
+from .counters import record_feedback_change
+from .metrics import invalidate_metrics_cache
+from .metrics_updates import metrics_updates
+from .realtime import manager, publish_analysis_complete
+from .schemas import FeedbackAnalysis, FeedbackDB
+from .utils import setup_logging
+from .versions import record_writes
+
+logger = logging.getLogger(__name__)
+
+# Worker configuration
+# With LLM micro-batching, enough analyses must be in flight to fill a batch
+WORKER_CONCURRENCY = int(
+    os.getenv("WORKER_CONCURRENCY", str(ANALYSIS_BATCH_MAX_ITEMS if ANALYSIS_BATCHING_ENABLED else 4))
+)
+WORKER_LEASE_SECONDS = int(os.getenv("WORKER_LEASE_SECONDS", "120"))
+WORKER_MAX_ATTEMPTS = int(os.getenv("WORKER_MAX_ATTEMPTS", "3"))
+WORKER_RETRY_DELAY_SECONDS = int(os.getenv("WORKER_RETRY_DELAY_SECONDS", "10"))
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1.0"))
+# Analyses are abandoned (and retried) before the lease could expire and another worker re-lease the document
+WORKER_ANALYSIS_TIMEOUT_SECONDS = float(
+    os.getenv("WORKER_ANALYSIS_TIMEOUT_SECONDS", str(WORKER_LEASE_SECONDS * 0.75))
+)
+
+CompletionCallback = Callable[[FeedbackDB], Awaitable[None]]
+
+
+def make_worker_id() -> str:
+    """Build a worker ID that is unique across processes and nodes."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+async def lease_next(worker_id: str, lease_seconds: int = WORKER_LEASE_SECONDS) -> Optional[dict]:
+    """
+    Atomically lease the oldest available feedback awaiting analysis.
+
+    Pending documents are available once lease_expires_at has passed (it is
+    set to created_at on insert and pushed back on retry). Processing
+    documents whose lease has expired are reclaimed.
+
+    Returns:
+        The leased document, or None if the queue is empty
+    """
+    collection = get_feedbacks_collection()
+    now = datetime.utcnow()
+
+    return await collection.find_one_and_update(
+        {
+            "analysis_status": {"$in": ["pending", "processing"]},
+            "lease_expires_at": {"$lte": now},
+        },
+        {
+            "$set": {
+                "analysis_status": "processing",
+                "lease_owner": worker_id,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "updated_at": now,
+            },
+            "$inc": {"analysis_attempts": 1},
+        },
+        sort=[("lease_expires_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def has_queued_feedback() -> bool:
+    """Whether any feedback is still pending (including delayed retries) or processing."""
+    collection = get_feedbacks_collection()
+    doc = await collection.find_one({"analysis_status": {"$in": ["pending", "processing"]}}, {"_id": 1})
+    return doc is not None
+
+
+async def complete_lease(
+    feedback_id: ObjectId,
+    worker_id: str,
+    analysis: Optional[FeedbackAnalysis],
+    error: Optional[str],
+) -> Optional[dict]:
+    """
+    Write the analysis result, provided this worker still holds the lease.
+
+    Returns:
+        The updated document, or None if the lease was lost
+    """
+    collection = get_feedbacks_collection()
+
+    return await collection.find_one_and_update(
+        {"_id": feedback_id, "lease_owner": worker_id, "analysis_status": "processing"},
+        {
+            "$set": {
+                "analysis": analysis_document(analysis) if analysis else None,
+                "analysis_error": error,
+                "agent_success": analysis is not None,
+                "analysis_status": "completed" if analysis else "failed",
+                "updated_at": datetime.utcnow(),
+            },
+            "$unset": {"lease_owner": "", "lease_expires_at": ""},
+        },
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def release_lease(
+    feedback_id: ObjectId,
+    worker_id: str,
+    error: Optional[str],
+    delay_seconds: int = WORKER_RETRY_DELAY_SECONDS,
+) -> bool:
+    """Return a leased document to the queue so it is retried after a delay."""
+    collection = get_feedbacks_collection()
+
+    now = datetime.utcnow()
+
+    result = await collection.update_one(
+        {"_id": feedback_id, "lease_owner": worker_id, "analysis_status": "processing"},
+        {
+            "$set": {
+                "analysis_status": "pending",
+                "analysis_error": error,
+                "lease_expires_at": now + timedelta(seconds=delay_seconds),
+                "updated_at": now,
+            },
+            "$unset": {"lease_owner": ""},
+        },
+    )
+    return result.modified_count == 1
+
+
+class AnalysisWorker:
+    """Leases queued feedback and analyzes it with bounded concurrency."""
+
+    def __init__(
+        self,
+        concurrency: int = WORKER_CONCURRENCY,
+        on_complete: Optional[CompletionCallback] = None,
+        worker_id: Optional[str] = None,
+        analysis_timeout: float = WORKER_ANALYSIS_TIMEOUT_SECONDS,
+    ):
+        self.worker_id = worker_id or make_worker_id()
+        self.concurrency = concurrency
+        if ANALYSIS_BATCHING_ENABLED and concurrency < ANALYSIS_BATCH_MAX_ITEMS:
+            logger.warning(
+                f"Worker concurrency {concurrency} is below ANALYSIS_BATCH_MAX_ITEMS={ANALYSIS_BATCH_MAX_ITEMS}, "
+                f"LLM batches will hold at most {concurrency} messages"
+            )
+        if analysis_timeout >= WORKER_LEASE_SECONDS:
+            logger.warning(
+                f"Analysis timeout {analysis_timeout}s is not shorter than the {WORKER_LEASE_SECONDS}s lease, "
+                f"using {WORKER_LEASE_SECONDS * 0.75}s"
+            )
+            analysis_timeout = WORKER_LEASE_SECONDS * 0.75
+        self.analysis_timeout = analysis_timeout
+        self.on_complete = on_complete
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    async def run(self, stop_when_idle: bool = False):
+        """
+        Lease and process documents until stopped.
+
+        Args:
+            stop_when_idle: Return once no feedback is pending or processing
+                instead of polling, waiting out retry delays and other
+                workers' leases (e.g. when seeding)
+        """
+        logger.info(f"Analysis worker {self.worker_id} started (concurrency={self.concurrency})")
+
+        while not self._stopping.is_set():
+            await self._semaphore.acquire()
+            if self._stopping.is_set():
+                # Stop requested while waiting for a free slot
+                self._semaphore.release()
+                break
+
+            try:
+                doc = await lease_next(self.worker_id)
+            except Exception as e:
+                self._semaphore.release()
+                logger.error(f"Worker {self.worker_id} failed to lease feedback: {e}")
+                await self._idle()
+                continue
+
+            if doc is None:
+                self._semaphore.release()
+                if stop_when_idle:
+                    if self._tasks:
+                        # A failed analysis may be released for a retry
+                        await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+                        continue
+                    if not await has_queued_feedback():
+                        break
+                await self._idle()
+                continue
+
+            # The row now shows as processing
+            record_writes("feedbacks")
+
+            task = asyncio.create_task(self._process(doc))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        # Let in-flight analyses finish so their leases are not left to expire
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        logger.info(f"Analysis worker {self.worker_id} stopped")
+
+    async def _idle(self):
+        """Sleep for the poll interval, waking early if a stop is requested."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=WORKER_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _process(self, doc: dict):
+        """Analyze one leased document and record the outcome."""
+        feedback_id = doc["_id"]
+        request_id = str(feedback_id)[-8:]
+        attempts = doc.get("analysis_attempts", 1)
+
+        try:
+            if attempts > WORKER_MAX_ATTEMPTS:
+                # Leases kept expiring (e.g. workers crashing mid-analysis); give up
+                analysis = None
+                error = f"Analysis abandoned after {WORKER_MAX_ATTEMPTS} attempts"
+            else:
+                try:
+                    analysis, error = await asyncio.wait_for(
+                        analyze_message(doc["message"], request_id), timeout=self.analysis_timeout
+                    )
+                except asyncio.TimeoutError:
+                    analysis, error = None, f"Analysis timed out after {self.analysis_timeout:.0f}s"
+
+                if analysis is None and attempts < WORKER_MAX_ATTEMPTS:
+                    logger.warning(
+                        f"[{request_id}] Analysis attempt {attempts}/{WORKER_MAX_ATTEMPTS} failed, "
+                        f"retrying in {WORKER_RETRY_DELAY_SECONDS}s: {error}"
+                    )
+                    if await release_lease(feedback_id, self.worker_id, error):
+                        record_writes("feedbacks")
+                    return
+
+            saved = await complete_lease(feedback_id, self.worker_id, analysis, error)
+            if saved is None:
+                logger.warning(f"[{request_id}] Lease lost before completion, discarding result")
+                return
+
+            # Analysis fields feed the urgency/sentiment/category list filters
+            invalidate_feedback_counts()
+            record_writes("feedbacks")
+            await record_feedback_change(doc, saved)
+            invalidate_metrics_cache()
+
+            feedback = FeedbackDB(**feedback_to_dict(saved))
+            logger.info(f"[{request_id}] Analysis {feedback.analysis_status} for feedback {feedback.id}")
+
+            await notify_analysis_complete(feedback)
+
+            if self.on_complete:
+                await self.on_complete(feedback)
+
+        except Exception as e:
+            logger.error(f"[{request_id}] Error processing feedback {feedback_id}: {e}", exc_info=True)
+        finally:
+            self._semaphore.release()
+
+    def start(self):
+        """Run the worker as a background task on the current event loop."""
+        self._runner = asyncio.create_task(self.run())
+
+    def request_stop(self):
+        """Ask the worker to stop leasing new documents."""
+        self._stopping.set()
+
+    async def stop(self):
+        """Stop the worker and wait for in-flight analyses to finish."""
+        self.request_stop()
+        if self._runner:
+            await self._runner
+
+
+async def notify_analysis_complete(feedback: FeedbackDB):
+    """Phase 2: Send Slack notification for high urgency feedback."""
+    if feedback.agent_success and feedback.analysis.urgency_level == "high":
+        logger.info(f"Sending Slack notification for high urgency feedback {feedback.id}")
+        send_slack_notification(feedback)
+
+
+async def main():
+    """Run a standalone analysis worker until SIGINT/SIGTERM."""
+    setup_logging()
+    await connect_to_mongo()
+    await ensure_indexes()
+
+    # Completions reach API processes' WebSocket clients through the event bus
+    worker = AnalysisWorker(on_complete=publish_analysis_complete)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.request_stop)
+
+    try:
+        await worker.run()
+    finally:
+        metrics_updates.flush()
+        await manager.bus.stop()
+        await slack_notifier.stop()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
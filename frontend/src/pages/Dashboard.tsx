@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { Header } from '../components/Header';
 import { Filters } from '../components/Filters';
 import { TicketTable } from '../components/TicketTable';
@@ -6,6 +6,7 @@ import { TicketDetail } from '../components/TicketDetail';
 import { Charts } from '../components/Charts';
 import { feedbackApi } from '../services/api';
 import { feedbackWebSocket } from '../services/websocket';
+import type { OverrideChange } from '../services/websocket';
 import type { Feedback, FeedbackFilters } from '../types';
 
 export const Dashboard: React.FC = () => {
@@ -15,6 +16,11 @@ export const Dashboard: React.FC = () => {
   const [selectedFeedback, setSelectedFeedback] = useState<Feedback | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  // Changes feed position; events missed while the WebSocket was down are fetched from here
+  const watermark = useRef<string | null>(null);
+  // Current filters for the reconnect handler, which is registered once
+  const activeFilters = useRef<FeedbackFilters>(filters);
+  activeFilters.current = filters;
 
   const categories = Array.from(
     new Set(
@@ -28,6 +34,13 @@ export const Dashboard: React.FC = () => {
     try {
       setLoading(true);
       setError(null);
+      // Taken before the page loads, so changes made meanwhile are caught up on reconnect
+      try {
+        watermark.current = (await feedbackApi.changes()).watermark;
+      } catch (err) {
+        console.error('Error reading changes watermark:', err);
+        watermark.current = null;
+      }
       const response = await feedbackApi.list(filters, 100, 0);
       setFeedbacks(response.feedbacks);
       setFilteredFeedbacks(response.feedbacks);
@@ -46,17 +59,88 @@ export const Dashboard: React.FC = () => {
   useEffect(() => {
     feedbackWebSocket.connect();
 
+    // New feedback is prepended; updates (e.g. completed analysis) replace the existing row
+    const upsert = (prev: Feedback[], feedback: Feedback) =>
+      prev.some(f => f.id === feedback.id)
+        ? prev.map(f => (f.id === feedback.id ? feedback : f))
+        : [feedback, ...prev];
+
     const unsubscribe = feedbackWebSocket.subscribe((newFeedback: Feedback) => {
-      setFeedbacks(prev => [newFeedback, ...prev]);
-      setFilteredFeedbacks(prev => [newFeedback, ...prev]);
+      setFeedbacks(prev => upsert(prev, newFeedback));
+      setFilteredFeedbacks(prev => upsert(prev, newFeedback));
     });
 
+    // Bulk overrides arrive as compact field changes applied in place
+    const applyOverrides = (prev: Feedback[], changes: OverrideChange[]) => {
+      const byId = new Map<string, OverrideChange[]>();
+      changes.forEach(change => byId.set(change.id, [...(byId.get(change.id) || []), change]));
+      return prev.map(f => {
+        const fieldChanges = byId.get(f.id);
+        if (!fieldChanges || !f.analysis) return f;
+        const analysis = { ...f.analysis };
+        fieldChanges.forEach(change => {
+          (analysis as Record<string, string>)[change.field] = change.new_value;
+        });
+        return { ...f, analysis };
+      });
+    };
+
+    const unsubscribeOverrides = feedbackWebSocket.subscribeOverrides((changes: OverrideChange[]) => {
+      setFeedbacks(prev => applyOverrides(prev, changes));
+      setFilteredFeedbacks(prev => applyOverrides(prev, changes));
+    });
+
+    // After a reconnect, fetch only what changed while disconnected
+    const catchUp = async () => {
+      if (!watermark.current) return;
+      try {
+        const changed: Feedback[] = [];
+        let hasMore = true;
+        while (hasMore) {
+          const response = await feedbackApi.changes(watermark.current);
+          changed.push(...response.feedbacks);
+          watermark.current = response.watermark;
+          hasMore = response.has_more;
+        }
+        if (changed.length === 0) return;
+
+        // Changed rows may have entered or left a filtered list (categories match
+        // by normalized key on the server), so reload the filtered page instead
+        if (Object.values(activeFilters.current).some(Boolean)) {
+          const response = await feedbackApi.list(activeFilters.current, 100, 0);
+          setFeedbacks(response.feedbacks);
+          setFilteredFeedbacks(response.feedbacks);
+          return;
+        }
+        changed.forEach(feedback => {
+          setFeedbacks(prev => upsert(prev, feedback));
+          setFilteredFeedbacks(prev => upsert(prev, feedback));
+        });
+      } catch (err) {
+        console.error('Error catching up on feedback changes:', err);
+      }
+    };
+
+    const unsubscribeReconnect = feedbackWebSocket.onReconnect(catchUp);
+
     return () => {
       unsubscribe();
+      unsubscribeOverrides();
+      unsubscribeReconnect();
       feedbackWebSocket.disconnect();
     };
   }, []);
 
+  // List rows come from the summary view; load the full record for the detail panel
+  const handleSelectFeedback = async (feedback: Feedback) => {
+    setSelectedFeedback(feedback);
+    try {
+      setSelectedFeedback(await feedbackApi.getById(feedback.id));
+    } catch (err) {
+      console.error('Error loading feedback details:', err);
+    }
+  };
+
   const handleFiltersChange = (newFilters: FeedbackFilters) => {
     setFilters(newFilters);
   };
@@ -88,7 +172,7 @@ export const Dashboard: React.FC = () => {
         ) : (
           <TicketTable
             feedbacks={filteredFeedbacks}
-            onSelectFeedback={setSelectedFeedback}
+            onSelectFeedback={handleSelectFeedback}
           />
         )}
       </div>
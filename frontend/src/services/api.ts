@@ -12,7 +12,14 @@ const api = axios.create({
 
 export interface FeedbackListResponse {
   feedbacks: Feedback[];
-  total: number;
+  total: number | null;
+  next_cursor?: string | null;
+}
+
+export interface FeedbackChangesResponse {
+  feedbacks: Feedback[];
+  watermark: string;
+  has_more: boolean;
 }
 
 export interface CreateFeedbackRequest {
@@ -27,13 +34,25 @@ export const feedbackApi = {
     return response.data;
   },
 
-  list: async (filters: FeedbackFilters = {}, limit = 50, skip = 0): Promise<FeedbackListResponse> => {
+  list: async (
+    filters: FeedbackFilters = {},
+    limit = 50,
+    skip = 0,
+    withTotal = false,
+    view: 'full' | 'summary' = 'summary',
+  ): Promise<FeedbackListResponse> => {
     const params = new URLSearchParams();
     params.append('limit', limit.toString());
     params.append('skip', skip.toString());
+    params.append('with_total', withTotal.toString());
+    params.append('view', view);
 
     if (filters.urgency) params.append('urgency', filters.urgency);
-    if (filters.category) params.append('category', filters.category);
+    if (filters.category) {
+      // The filter box is free text, so match categories by prefix as the user types
+      params.append('category', filters.category);
+      params.append('category_match', 'prefix');
+    }
     if (filters.sentiment) params.append('sentiment', filters.sentiment);
     if (filters.unresolvedOnly) params.append('unresolved_only', 'true');
 
@@ -41,6 +60,30 @@ export const feedbackApi = {
     return response.data;
   },
 
+  search: async (q: string, filters: FeedbackFilters = {}, limit = 50, cursor?: string): Promise<FeedbackListResponse> => {
+    const params = new URLSearchParams();
+    params.append('q', q);
+    params.append('limit', limit.toString());
+
+    if (filters.urgency) params.append('urgency', filters.urgency);
+    if (filters.category) params.append('category', filters.category);
+    if (filters.sentiment) params.append('sentiment', filters.sentiment);
+    if (cursor) params.append('cursor', cursor);
+
+    const response = await api.get<FeedbackListResponse>('/api/feedback/search', { params });
+    return response.data;
+  },
+
+  // Feedback created or modified after a watermark; omit since to get a starting watermark
+  changes: async (since?: string, limit = 500): Promise<FeedbackChangesResponse> => {
+    const params = new URLSearchParams();
+    params.append('limit', limit.toString());
+    if (since) params.append('since', since);
+
+    const response = await api.get<FeedbackChangesResponse>('/api/feedback/changes', { params });
+    return response.data;
+  },
+
   getById: async (id: string): Promise<Feedback> => {
     const response = await api.get<Feedback>(`/api/feedback/${id}`);
     return response.data;
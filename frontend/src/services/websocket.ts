@@ -1,14 +1,52 @@
-import type { Feedback } from '../types';
+import type { Feedback, FeedbackAnalysis, Sentiment, Urgency } from '../types';
 
 const WS_BASE_URL = import.meta.env.VITE_WS_URL || 'ws://localhost:8000';
 
 export type WebSocketMessageHandler = (feedback: Feedback) => void;
 
+// Compact per-feedback change from a bulk override ("feedbacks:overridden")
+export interface OverrideChange {
+  id: string;
+  field: keyof FeedbackAnalysis;
+  new_value: string;
+}
+
+export type OverrideHandler = (changes: OverrideChange[]) => void;
+
+// Coalesced metrics deltas ("metrics:update"); unchanged fields are omitted
+export interface MetricsUpdate {
+  received?: number;
+  processed?: number;
+  overridden?: number;
+  urgency?: Partial<Record<Urgency, number>>;
+  sentiment?: Partial<Record<Sentiment, number>>;
+  categories?: Record<string, { processed?: number; overridden?: number }>;
+  sentiment_trend?: Record<string, Partial<Record<Sentiment, number>>>;
+}
+
+export type MetricsHandler = (update: MetricsUpdate) => void;
+
+// Called when the connection is re-established, to catch up on missed events
+export type ReconnectHandler = () => void;
+
+// Server-side event filter; omitted fields match everything. Filtered
+// subscriptions only receive feedback once it has been analyzed.
+export interface FeedbackSubscription {
+  urgency?: Urgency[];
+  sentiment?: Sentiment[];
+  category?: string[];
+}
+
 export class FeedbackWebSocket {
   private ws: WebSocket | null = null;
   private handlers: WebSocketMessageHandler[] = [];
+  private overrideHandlers: OverrideHandler[] = [];
+  private metricsHandlers: MetricsHandler[] = [];
+  private reconnectHandlers: ReconnectHandler[] = [];
+  private hasConnected = false;
   private reconnectInterval = 3000;
   private reconnectTimer: number | null = null;
+  private subscription: FeedbackSubscription = {};
 
   connect(): void {
     try {
@@ -20,13 +58,30 @@ export class FeedbackWebSocket {
           clearTimeout(this.reconnectTimer);
           this.reconnectTimer = null;
         }
+        // Subscriptions are per connection, so restore the filter after reconnecting
+        if (Object.keys(this.subscription).length > 0) {
+          this.send({ type: 'subscribe', ...this.subscription });
+        }
+        // Events sent while disconnected were missed
+        if (this.hasConnected) {
+          this.reconnectHandlers.forEach(handler => handler());
+        }
+        this.hasConnected = true;
       };
 
       this.ws.onmessage = (event) => {
         try {
           const message = JSON.parse(event.data);
-          if (message.type === 'feedbacks:new' && message.data) {
+          if ((message.type === 'feedbacks:new' || message.type === 'feedbacks:updated') && message.data) {
             this.handlers.forEach(handler => handler(message.data));
+          } else if (message.type === 'feedbacks:new_batch' && Array.isArray(message.data)) {
+            message.data.forEach((feedback: Feedback) => {
+              this.handlers.forEach(handler => handler(feedback));
+            });
+          } else if (message.type === 'feedbacks:overridden' && Array.isArray(message.data)) {
+            this.overrideHandlers.forEach(handler => handler(message.data));
+          } else if (message.type === 'metrics:update' && message.data) {
+            this.metricsHandlers.forEach(handler => handler(message.data));
           }
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
@@ -65,6 +120,7 @@ export class FeedbackWebSocket {
       this.ws.close();
       this.ws = null;
     }
+    this.hasConnected = false;
   }
 
   subscribe(handler: WebSocketMessageHandler): () => void {
@@ -74,6 +130,32 @@ export class FeedbackWebSocket {
     };
   }
 
+  subscribeOverrides(handler: OverrideHandler): () => void {
+    this.overrideHandlers.push(handler);
+    return () => {
+      this.overrideHandlers = this.overrideHandlers.filter(h => h !== handler);
+    };
+  }
+
+  subscribeMetrics(handler: MetricsHandler): () => void {
+    this.metricsHandlers.push(handler);
+    return () => {
+      this.metricsHandlers = this.metricsHandlers.filter(h => h !== handler);
+    };
+  }
+
+  onReconnect(handler: ReconnectHandler): () => void {
+    this.reconnectHandlers.push(handler);
+    return () => {
+      this.reconnectHandlers = this.reconnectHandlers.filter(h => h !== handler);
+    };
+  }
+
+  setSubscription(subscription: FeedbackSubscription): void {
+    this.subscription = subscription;
+    this.send({ type: 'subscribe', ...subscription });
+  }
+
   send(data: unknown): void {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
       this.ws.send(JSON.stringify(data));
@@ -10,6 +10,8 @@ vi.mock('../services/websocket', () => ({
     connect: vi.fn(),
     disconnect: vi.fn(),
     subscribe: vi.fn(() => vi.fn()),
+    subscribeOverrides: vi.fn(() => vi.fn()),
+    onReconnect: vi.fn(() => vi.fn()),
   },
 }));
 
@@ -47,6 +49,11 @@ const mockFeedbacks: Feedback[] = [
 describe('Dashboard', () => {
   beforeEach(() => {
     vi.clearAllMocks();
+    vi.mocked(feedbackApi.changes).mockResolvedValue({
+      feedbacks: [],
+      watermark: 'watermark',
+      has_more: false,
+    });
   });
 
   it('renders dashboard header', async () => {
@@ -6,17 +6,19 @@ export interface FeedbackAnalysis {
   urgency_level: Urgency;
   category: string;
   summary: string;
-  recommended_action: string;
+  recommended_action?: string;  // omitted by the list's summary view
 }
 
 export interface Feedback {
   id: string;
   customer_name: string;
   email: string;
-  message: string;
+  message?: string;  // omitted by the list's summary view; fetch by id for details
   created_at: string;
   analysis: FeedbackAnalysis | null;
   analysis_error?: string;
+  analysis_status?: "pending" | "processing" | "completed" | "failed" | null;
+  updated_at?: string | null;  // full rows only
 }
 
 export interface FeedbackFilters {